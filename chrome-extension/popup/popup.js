@@ -255,7 +255,15 @@ async function runCrew(crewName) {
     }
 
     const apiKey = await loadApiKey();
-    const result = await window.API.callCrewAPI(crewName, focalCompany, competitors, apiKey);
+    // Stream task events so progress shows up while the crew is still running
+    const result = await window.API.callCrewAPI(crewName, focalCompany, competitors, apiKey, ({ event, data }) => {
+      const who = data.scope ? `${data.agent} (${data.scope})` : data.agent;
+      if (event === 'task_started') {
+        showStatus(`${who} is working...`, 'success');
+      } else if (event === 'task_completed') {
+        showStatus(`${who} finished`, 'success');
+      }
+    });
     
     // Generate executive summary using Groq
     if (apiKey && result.summary) {
@@ -3,6 +3,7 @@ const API_CONFIG = {
   comp_analysis: {
     port: 8000,
     endpoint: '/analyze',
+    streamEndpoint: '/analyze/stream',
     name: 'Competitor Intelligence Crew',
     needsFocalCompany: true,
     agents: [
@@ -16,6 +17,7 @@ const API_CONFIG = {
   digital_twin: {
     port: 8001,
     endpoint: '/run',
+    streamEndpoint: '/run/stream',
     name: 'Digital Twin Crew',
     needsFocalCompany: false,
     agents: [
@@ -28,6 +30,7 @@ const API_CONFIG = {
   one_last_time: {
     port: 8003,
     endpoint: '/simulate',
+    streamEndpoint: '/simulate/stream',
     name: 'War Simulation Crew',
     needsFocalCompany: true,
     agents: [
@@ -297,21 +300,12 @@ function handleGroqError(status, errorText) {
 
 // ==================== CREW API CALLS ====================
 
-async function callCrewAPI(crewName, focalCompany, competitors, apiKey = null) {
-  const config = API_CONFIG[crewName];
-  if (!config) {
-    throw new Error(`Unknown crew: ${crewName}`);
-  }
-
-  const url = `http://localhost:${config.port}${config.endpoint}`;
-  
-  let payload;
-
+function buildCrewPayload(crewName, focalCompany, competitors) {
   if (crewName === 'comp_analysis') {
     if (!focalCompany || focalCompany.trim() === '') {
       throw new Error('Focal company is required for Competitor Intelligence');
     }
-    payload = {
+    return {
       our_company: focalCompany,
       competitors: competitors.filter(c => c && c.trim() !== '')
     };
@@ -321,7 +315,7 @@ async function callCrewAPI(crewName, focalCompany, competitors, apiKey = null) {
     if (allCompanies.length === 0) {
       throw new Error('At least one competitor is required for Digital Twin');
     }
-    payload = {
+    return {
       companies: allCompanies
     };
   } 
@@ -332,12 +326,27 @@ async function callCrewAPI(crewName, focalCompany, competitors, apiKey = null) {
     
     const validCompetitors = competitors.filter(c => c && c.trim() !== '');
     
-    payload = {
+    return {
       our_company: focalCompany,
       competitors: validCompetitors,
       market_segment: "India"
     };
   }
+}
+
+// onEvent (optional): called with {event, data} for every server-sent event
+// (task_started / task_completed / ...) so the UI can show each task's output
+// as soon as it finishes. Without it the plain blocking endpoint is used.
+async function callCrewAPI(crewName, focalCompany, competitors, apiKey = null, onEvent = null) {
+  const config = API_CONFIG[crewName];
+  if (!config) {
+    throw new Error(`Unknown crew: ${crewName}`);
+  }
+
+  const streaming = typeof onEvent === 'function' && config.streamEndpoint;
+  const url = `http://localhost:${config.port}${streaming ? config.streamEndpoint : config.endpoint}`;
+  
+  const payload = buildCrewPayload(crewName, focalCompany, competitors);
 
   console.log(`Calling ${crewName} API:`, url, payload, apiKey ? '[Groq key provided]' : '[no Groq key]');
 
@@ -360,7 +369,7 @@ async function callCrewAPI(crewName, focalCompany, competitors, apiKey = null) {
       throw new Error(`API Error: ${response.status} - ${errorText}`);
     }
 
-    const data = await response.json();
+    const data = streaming ? await readCrewEventStream(response, onEvent) : await response.json();
     
     return parseCrewResponse(crewName, data, config);
     
@@ -370,6 +379,41 @@ async function callCrewAPI(crewName, focalCompany, competitors, apiKey = null) {
   }
 }
 
+// Reads a text/event-stream body, forwarding each event to onEvent, and
+// resolves with the run's final response body (the run_finished event).
+async function readCrewEventStream(response, onEvent) {
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    let boundary;
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const frame = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+
+      let event = 'message';
+      const dataLines = [];
+      frame.split('\n').forEach(line => {
+        if (line.startsWith('event:')) event = line.slice(6).trim();
+        else if (line.startsWith('data:')) dataLines.push(line.slice(5).trim());
+      });
+      if (dataLines.length === 0) continue;  // keep-alive comment
+
+      const data = JSON.parse(dataLines.join('\n'));
+      onEvent({ event, data });
+
+      if (event === 'run_finished') return data.result;
+      if (event === 'run_failed') throw new Error(`API Error: ${data.status} - ${data.error}`);
+    }
+  }
+  throw new Error('API Error: stream ended before the run finished');
+}
+
 function parseCrewResponse(crewName, data, config) {
   let summary = '';
   let agents = {};
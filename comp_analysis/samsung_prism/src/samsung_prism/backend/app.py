@@ -1,8 +1,14 @@
 from fastapi import FastAPI, HTTPException, Header
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-import os
-from samsung_prism.crew import SamsungCompetitorIntelligenceCrew
+from typing import Any, Dict, Optional
+from samsung_prism.crew import SAFE_MODEL, SamsungCompetitorIntelligenceCrew, templates
+from prism_common.jobs import get_job_registry
+from prism_common.jobs_api import accepted, async_requested, build_jobs_router
+from prism_common.llm_cache import bypass_llm_cache, no_cache_requested
+from prism_common.run_cache import cached_run
+from prism_common.run_context import RunContext
+from prism_common.streaming import stream_run, watch_crew
 
 app = FastAPI(
     title="Samsung PRISM – Competitor Intelligence API",
@@ -18,6 +24,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Background runs: "Prefer: respond-async" on /analyze, then poll /jobs/{id}
+app.include_router(build_jobs_router())
+
 # -----------------------------
 # Schemas
 # -----------------------------
@@ -29,6 +38,8 @@ class IntelligenceRequest(BaseModel):
 class IntelligenceResponse(BaseModel):
     agent_outputs: dict
     final_output: str
+    # Run cache status: miss / fresh / stale (see prism_common.run_cache)
+    cache: Optional[Dict[str, Any]] = None
 
 
 # -----------------------------
@@ -43,41 +54,57 @@ def health_check():
 # Run Intelligence Analysis
 # -----------------------------
 @app.post("/analyze", response_model=IntelligenceResponse)
-def analyze(payload: IntelligenceRequest, x_groq_api_key: str | None = Header(None, alias="X-Groq-Api-Key")):
+def analyze(
+    payload: IntelligenceRequest,
+    x_groq_api_key: str | None = Header(None, alias="X-Groq-Api-Key"),
+    cache_control: str | None = Header(None, alias="Cache-Control"),
+    prefer: str | None = Header(None, alias="Prefer"),
+):
     if not payload.our_company or not payload.competitors:
         raise HTTPException(
             status_code=400,
             detail="our_company and competitors are required"
         )
 
-    old_key = os.environ.get("GROQ_API_KEY")
-    try:
-        # Temporarily set GROQ_API_KEY if provided by client
-        if x_groq_api_key:
-            os.environ["GROQ_API_KEY"] = x_groq_api_key
-
-        crew_instance = SamsungCompetitorIntelligenceCrew()
-        crew = crew_instance.crew()
-
-        # Kickoff
-        final_result = crew.kickoff(
-            inputs={
-                "our_company": payload.our_company,
-                "competitors": payload.competitors
-            }
+    # Client-provided key is scoped to this request's crew (no os.environ swap)
+    context = RunContext(groq_api_key=x_groq_api_key)
+
+    # "Cache-Control: no-cache" skips cached LLM answers (carried into background jobs too)
+    with bypass_llm_cache(no_cache_requested(cache_control)):
+        if async_requested(prefer):
+            return accepted(get_job_registry().submit("analyze", execute_analysis, payload, context))
+        return execute_analysis(payload, context)
+
+
+@app.post("/analyze/stream")
+def analyze_stream(
+    payload: IntelligenceRequest,
+    x_groq_api_key: str | None = Header(None, alias="X-Groq-Api-Key"),
+    cache_control: str | None = Header(None, alias="Cache-Control"),
+):
+    """Same run as /analyze, streamed as server-sent events (one per task start/completion)."""
+    if not payload.our_company or not payload.competitors:
+        raise HTTPException(
+            status_code=400,
+            detail="our_company and competitors are required"
         )
 
-        # 🔥 COLLECT ALL TASK OUTPUTS
-        agent_outputs = {}
+    context = RunContext(groq_api_key=x_groq_api_key)
+    with bypass_llm_cache(no_cache_requested(cache_control)):
+        return stream_run("analyze", execute_analysis, payload, context)
 
-        for task in crew.tasks:
-            agent_name = task.agent.role
-            agent_outputs[agent_name] = str(task.output)
 
-        return IntelligenceResponse(
-            agent_outputs=agent_outputs,
-            final_output=str(final_result)
+def execute_analysis(payload: IntelligenceRequest, context: RunContext) -> IntelligenceResponse:
+    """Run one competitor-intelligence crew (or reuse a recent run) and build the /analyze response."""
+    try:
+        # Identical requests within the TTL reuse the last run; stale ones refresh in the background
+        body = cached_run(
+            "comp_analysis",
+            {"our_company": payload.our_company, "competitors": payload.competitors, "model": SAFE_MODEL},
+            lambda: run_analysis(payload, context).model_dump(exclude={"cache"}),
+            version=templates.version,
         )
+        return IntelligenceResponse(**body)
 
     except Exception as e:
         msg = str(e)
@@ -87,9 +114,29 @@ def analyze(payload: IntelligenceRequest, x_groq_api_key: str | None = Header(No
             status_code=500,
             detail=msg
         )
-    finally:
-        # Restore previous env var
-        if old_key is None:
-            os.environ.pop("GROQ_API_KEY", None)
-        else:
-            os.environ["GROQ_API_KEY"] = old_key
+
+
+def run_analysis(payload: IntelligenceRequest, context: RunContext) -> IntelligenceResponse:
+    """Kick off the crew and collect every task's output."""
+    crew_instance = SamsungCompetitorIntelligenceCrew(context=context)
+    crew = watch_crew(crew_instance.crew())
+
+    # Kickoff
+    final_result = crew.kickoff(
+        inputs={
+            "our_company": payload.our_company,
+            "competitors": payload.competitors
+        }
+    )
+
+    # 🔥 COLLECT ALL TASK OUTPUTS
+    agent_outputs = {}
+
+    for task in crew.tasks:
+        agent_name = task.agent.role
+        agent_outputs[agent_name] = str(task.output)
+
+    return IntelligenceResponse(
+        agent_outputs=agent_outputs,
+        final_output=str(final_result)
+    )
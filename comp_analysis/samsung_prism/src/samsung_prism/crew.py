@@ -1,25 +1,33 @@
-from crewai import Agent, Crew, Task, Process, LLM
+from crewai import Agent, Crew, Task, Process
 from crewai.project import CrewBase, agent, task, crew
-import yaml
 from pathlib import Path
 import os
+from typing import Optional
+from prism_common.crew_templates import CrewTemplates, use_templates
+from prism_common.dag import parallel_enabled, parallelize
+from prism_common.llm_cache import cached_llm
+from prism_common.run_context import DEFAULT_CONTEXT, RunContext
 
 # --------------------------------------------------
 # PATH SETUP
 # --------------------------------------------------
 BASE_DIR = Path(__file__).parent
 CONFIG_DIR = BASE_DIR / "config"
+templates = CrewTemplates(CONFIG_DIR)
 
 # --------------------------------------------------
 # GROQ API KEY (NO DOTENV)
+# Resolved per run: request key from the RunContext, else GROQ_API_KEY
 # --------------------------------------------------
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-if not GROQ_API_KEY:
-    raise RuntimeError(
-        "❌ GROQ_API_KEY not found. Set it using:\n"
-        "Windows: setx GROQ_API_KEY \"your_key\"\n"
-        "Linux/Mac: export GROQ_API_KEY=\"your_key\""
-    )
+def resolve_groq_api_key(context: RunContext) -> str:
+    api_key = context.api_key_or_env("GROQ_API_KEY")
+    if not api_key:
+        raise RuntimeError(
+            "❌ GROQ_API_KEY not found. Set it using:\n"
+            "Windows: setx GROQ_API_KEY \"your_key\"\n"
+            "Linux/Mac: export GROQ_API_KEY=\"your_key\""
+        )
+    return api_key
 
 # --------------------------------------------------
 # HARD MODEL OVERRIDE (PREVENT 70B EVER BEING USED)
@@ -35,27 +43,39 @@ for k in [
 os.environ["LITELLM_MODEL"] = "groq/llama-3.1-8b-instant"
 
 # --------------------------------------------------
-# SHARED SAFE LLM CONFIG
+# SHARED SAFE LLM CONFIG (responses cached on disk)
 # --------------------------------------------------
-SAFE_LLM = LLM(
-    model="groq/llama-3.1-8b-instant",
-    temperature=0.3,
-    max_tokens=300
-)
+SAFE_MODEL = "groq/llama-3.1-8b-instant"
 
 # --------------------------------------------------
 # CREW
+# config/agents.yaml and config/tasks.yaml are parsed once per process;
+# CrewBase hands each instance its own copy (prism_common.crew_templates)
 # --------------------------------------------------
+@use_templates
 @CrewBase
 class SamsungCompetitorIntelligenceCrew:
     """Competitor Intelligence Crew (All Products, Low Tokens)"""
 
-    def __init__(self):
-        with open(CONFIG_DIR / "agents.yaml", "r") as f:
-            self.agents_config = yaml.safe_load(f)
-
-        with open(CONFIG_DIR / "tasks.yaml", "r") as f:
-            self.tasks_config = yaml.safe_load(f)
+    def __init__(self, context: Optional[RunContext] = None, parallel: Optional[bool] = None):
+        self.context = context or DEFAULT_CONTEXT
+        # Recon tasks run concurrently unless disabled (PRISM_PARALLEL_TASKS=0)
+        self.parallel = parallel_enabled(parallel)
+        api_key = resolve_groq_api_key(self.context)
+
+        # One LLM per crew instance, bound to this run's key
+        self.safe_llm = cached_llm(
+            model=SAFE_MODEL,
+            api_key=api_key,
+            temperature=0.3,
+            max_tokens=300
+        )
+        self.synthesis_llm = cached_llm(
+            model=SAFE_MODEL,
+            api_key=api_key,
+            temperature=0.2,
+            max_tokens=500,
+        )
 
     # ------------------ AGENTS ------------------
 
@@ -63,7 +83,7 @@ class SamsungCompetitorIntelligenceCrew:
     def web_recon_agent(self) -> Agent:
         return Agent(
             config=self.agents_config["web_recon_agent"],
-            llm=SAFE_LLM,
+            llm=self.safe_llm,
             reasoning=False,
             max_iter=1,
             allow_delegation=False,
@@ -73,7 +93,7 @@ class SamsungCompetitorIntelligenceCrew:
     def social_spy_agent(self) -> Agent:
         return Agent(
             config=self.agents_config["social_spy_agent"],
-            llm=SAFE_LLM,
+            llm=self.safe_llm,
             reasoning=False,
             max_iter=1,
             allow_delegation=False,
@@ -83,7 +103,7 @@ class SamsungCompetitorIntelligenceCrew:
     def hiring_talent_agent(self) -> Agent:
         return Agent(
             config=self.agents_config["hiring_talent_agent"],
-            llm=SAFE_LLM,
+            llm=self.safe_llm,
             reasoning=False,
             max_iter=1,
             allow_delegation=False,
@@ -93,7 +113,7 @@ class SamsungCompetitorIntelligenceCrew:
     def patent_rd_agent(self) -> Agent:
         return Agent(
             config=self.agents_config["patent_rd_agent"],
-            llm=SAFE_LLM,
+            llm=self.safe_llm,
             reasoning=False,
             max_iter=1,
             allow_delegation=False,
@@ -103,7 +123,7 @@ class SamsungCompetitorIntelligenceCrew:
     def pricing_tracker_agent(self) -> Agent:
         return Agent(
             config=self.agents_config["pricing_tracker_agent"],
-            llm=SAFE_LLM,
+            llm=self.safe_llm,
             reasoning=False,
             max_iter=1,
             allow_delegation=False,
@@ -113,11 +133,7 @@ class SamsungCompetitorIntelligenceCrew:
     def synthesis_agent(self) -> Agent:
         return Agent(
             config=self.agents_config["synthesis_agent"],
-            llm=LLM(
-                model="groq/llama-3.1-8b-instant",
-                temperature=0.2,
-                max_tokens=500,
-            ),
+            llm=self.synthesis_llm,
             reasoning=False,
             max_iter=1,
             allow_delegation=False,
@@ -183,11 +199,14 @@ class SamsungCompetitorIntelligenceCrew:
 
     @crew
     def crew(self) -> Crew:
+        # Parallel mode: the five recon tasks run at once, the synthesis
+        # starts when all of them are done (dependencies from tasks.yaml)
+        tasks = parallelize(self.tasks) if self.parallel else self.tasks
         return Crew(
             agents=self.agents,
-            tasks=self.tasks,
+            tasks=tasks,
             process=Process.sequential,
             verbose=True,
             memory=False,        # 🔥 prevents context explosion
-            max_rpm=5            # 🔥 slows calls safely
+            # Pacing comes from the shared RPM/TPM limiter in cached_llm
         )
@@ -1,11 +1,22 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Header
 from pydantic import BaseModel
-from typing import List, Dict
-from customer.crew import build_customer_crew
+from typing import Any, List, Dict, Optional
+from customer.crew import build_customer_crew, templates
+from prism_common.jobs import get_job_registry
+from prism_common.jobs_api import accepted, async_requested, build_jobs_router
+from prism_common.llm_cache import bypass_llm_cache, no_cache_requested
+from prism_common.run_cache import cached_run
+from prism_common.run_context import RunContext
+from prism_common.streaming import stream_run, watch_crew
 import concurrent.futures
+import contextvars
+import os
 
 app = FastAPI(title="Customer Intelligence API", version="1.0")
 
+# Background runs: "Prefer: respond-async" on /run, then poll /jobs/{id}
+app.include_router(build_jobs_router())
+
 
 # ---------- Request Schema ----------
 class CustomerRequest(BaseModel):
@@ -17,6 +28,8 @@ class CustomerRequest(BaseModel):
 class AgentResults(BaseModel):
     final_decision: str
     agents: Dict[str, str]
+    # Run cache status: miss / fresh / stale (see prism_common.run_cache)
+    cache: Optional[Dict[str, Any]] = None
 
 
 class CustomerResponse(BaseModel):
@@ -28,9 +41,19 @@ def health():
     return {"status": "Customer Intelligence API running"}
 
 
-# ---------- Run one competitor ----------
-def run_competitor(company, competitor):
-    crew = build_customer_crew(company, competitor)
+# ---------- Run one competitor (a recent run for the same pair is reused) ----------
+def run_competitor(company, competitor, api_key=None):
+    return competitor, cached_run(
+        "customer",
+        {"company": company, "competitors": competitor, "model": os.getenv("MODEL")},
+        lambda: analyze_competitor(company, competitor, api_key),
+        version=templates.version,
+    )
+
+
+def analyze_competitor(company, competitor, api_key=None):
+    # The caller's key only reaches this competitor's crew; os.environ is untouched
+    crew = watch_crew(build_customer_crew(company, competitor, context=RunContext(groq_api_key=api_key)), scope=competitor)
     output = crew.kickoff()
 
     agent_outputs = {}
@@ -40,7 +63,7 @@ def run_competitor(company, competitor):
         for task in output.tasks_output:
             agent_outputs[task.agent] = task.raw
 
-    return competitor, {
+    return {
         "final_decision": output.raw,
         "agents": agent_outputs
     }
@@ -48,12 +71,37 @@ def run_competitor(company, competitor):
 
 # ---------- Parallel Execution ----------
 @app.post("/run", response_model=CustomerResponse)
-def run_customer_intelligence(req: CustomerRequest):
+def run_customer_intelligence(
+    req: CustomerRequest,
+    x_groq_api_key: str | None = Header(None, alias="X-Groq-Api-Key"),
+    cache_control: str | None = Header(None, alias="Cache-Control"),
+    prefer: str | None = Header(None, alias="Prefer"),
+):
+    # "Cache-Control: no-cache" skips cached LLM answers (carried into background jobs too)
+    with bypass_llm_cache(no_cache_requested(cache_control)):
+        if async_requested(prefer):
+            return accepted(get_job_registry().submit("run", execute_customer_intelligence, req, x_groq_api_key))
+        return execute_customer_intelligence(req, x_groq_api_key)
+
+
+@app.post("/run/stream")
+def run_customer_intelligence_stream(
+    req: CustomerRequest,
+    x_groq_api_key: str | None = Header(None, alias="X-Groq-Api-Key"),
+    cache_control: str | None = Header(None, alias="Cache-Control"),
+):
+    """Same run as /run, streamed as server-sent events (task events carry the competitor as "scope")."""
+    with bypass_llm_cache(no_cache_requested(cache_control)):
+        return stream_run("run", execute_customer_intelligence, req, x_groq_api_key)
+
+
+def execute_customer_intelligence(req: CustomerRequest, api_key=None):
     results = {}
 
+    # Each worker gets a copy of the caller's context (cache bypass, job cancellation)
     with concurrent.futures.ThreadPoolExecutor() as executor:
         futures = [
-            executor.submit(run_competitor, req.company, c)
+            executor.submit(contextvars.copy_context().run, run_competitor, req.company, c, api_key)
             for c in req.competitors
         ]
 
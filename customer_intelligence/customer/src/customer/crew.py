@@ -1,60 +1,105 @@
 import os
-import yaml
-from crewai import Crew, Agent, Task, LLM
-from customer.tools.serper_tool import search
+from typing import Optional
+from crewai import Crew, Agent, Task
+from customer.tools.review_index import ReviewSearchTool, configured_index_dir, open_index
+from customer.tools.review_scorer import format_score_table, score_texts
+from customer.tools.serper_tool import search_sections
+from prism_common.crew_templates import CrewTemplates
+from prism_common.llm_cache import cached_llm
+from prism_common.run_context import DEFAULT_CONTEXT, RunContext
+from prism_common.shared_context import SharedContext
 
 BASE_DIR = os.path.dirname(__file__)
 CONFIG_DIR = os.path.join(BASE_DIR, "config")
 
-with open(os.path.join(CONFIG_DIR, "agents.yaml")) as f:
-    agent_cfg = yaml.safe_load(f)
+# Parsed once, read-only; each run builds its agents from its own copy
+templates = CrewTemplates(CONFIG_DIR)
 
-with open(os.path.join(CONFIG_DIR, "tasks.yaml")) as f:
-    task_cfg = yaml.safe_load(f)
+# Live customer-data queries, one shared-context section each
+FEEDBACK_QUERIES = {
+    "reviews": "{competitors} customer reviews trustpilot g2",
+    "complaints": "{competitors} complaints reddit",
+    "switching": "switched from {competitors} why I left",
+    "features": "{competitors} missing features wishlist",
+    "app_reviews": "{competitors} app store play store reviews",
+}
 
-llm = LLM(
-    api_key=os.getenv("GROQ_API_KEY"),
-    model=os.getenv("MODEL")
-)
+REVIEW_INDEX_AGENTS = ("review_miner", "churn_detector", "feature_gap_miner")
 
-agents = {
-    name: Agent(**cfg, llm=llm)
-    for name, cfg in agent_cfg.items()
-}
+def build_agents(context: Optional[RunContext] = None):
+    # Agents are bound to the run's key/model, so each run builds its own
+    context = context or DEFAULT_CONTEXT
+    llm = cached_llm(
+        api_key=context.api_key_or_env("GROQ_API_KEY"),
+        model=context.model_or(env_var="MODEL")
+    )
+
+    # Agents that quote customers can search the local review corpus, if one is indexed
+    index_dir = configured_index_dir()
+
+    return {
+        name: Agent(
+            **templates.agent(name),
+            llm=llm,
+            tools=[ReviewSearchTool(index_dir=index_dir)] if index_dir and name in REVIEW_INDEX_AGENTS else [],
+        )
+        for name in templates.agents
+    }
 
-def build_customer_crew(company: str, competitors: str):
+def build_customer_crew(company: str, competitors: str, context: Optional[RunContext] = None):
 
-    # 🔍 Fetch live customer data
-    market_data = search(f"{competitors} customer reviews complaints reddit trustpilot g2")
+    agents = build_agents(context)
+    task_cfg = templates.tasks
 
-    context = f"""
-    Live customer feedback for competitors {competitors}:
-    {market_data}
-    """
+    # 🔍 Fetch live customer data (targeted queries, fetched concurrently)
+    queries = {name: q.format(competitors=competitors) for name, q in FEEDBACK_QUERIES.items()}
+    results = search_sections(list(queries.values()))
+
+    # Stored once; each task gets the sections listed under its context_sections
+    shared = SharedContext(f"Live customer feedback for competitors {competitors}")
+    for name, query in queries.items():
+        shared.add(name, results.get(query, ""))
+
+    # Sentiment, aspects and complaint themes are scored locally; the LLM narrates
+    snippets = [line for text in results.values() for line in text.splitlines()]
+    shared.add("scores", format_score_table(score_texts(snippets)))
+
+    index_dir = configured_index_dir()
+    if index_dir:
+        shared.add("review_index", (
+            f"A local corpus of {open_index(index_dir).meta['docs']} exported reviews is searchable "
+            "with the Review Index Search tool; back findings with quotes from it."
+        ))
+
+    def describe(task_name: str) -> str:
+        cfg = task_cfg[task_name]
+        return cfg["description"].format(competitors=competitors) + shared.slice(cfg.get("context_sections"))
 
     tasks = [
         Task(
-            description=task_cfg["collect_reviews"]["description"].format(competitors=competitors) + context,
+            description=describe("collect_reviews"),
             expected_output=task_cfg["collect_reviews"]["expected_output"],
             agent=agents["review_miner"],
         ),
         Task(
-            description=task_cfg["detect_churn"]["description"].format(competitors=competitors) + context,
+            description=describe("detect_churn"),
             expected_output=task_cfg["detect_churn"]["expected_output"],
             agent=agents["churn_detector"],
         ),
         Task(
-            description=task_cfg["find_feature_gaps"]["description"].format(competitors=competitors) + context,
+            description=describe("find_feature_gaps"),
             expected_output=task_cfg["find_feature_gaps"]["expected_output"],
             agent=agents["feature_gap_miner"],
         ),
         Task(
-            description=task_cfg["analyze_sentiment"]["description"].format(competitors=competitors) + context,
+            description=describe("analyze_sentiment"),
             expected_output=task_cfg["analyze_sentiment"]["expected_output"],
             agent=agents["sentiment_analyzer"],
         ),
     ]
 
+    shared.report(f"customer[{competitors}]")
+
     return Crew(
         agents=list(agents.values()),
         tasks=tasks,
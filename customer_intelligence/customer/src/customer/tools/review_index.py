@@ -0,0 +1,500 @@
+"""
+REVIEW INDEX
+
+On-disk inverted index over exported review dumps (CSV / JSONL, millions of
+rows). The crew queries it through ReviewSearchTool. Neither building nor
+querying ever holds the corpus in memory.
+
+Build (streaming):
+- rows are read one at a time; each review is tokenised once
+- postings keys are its terms, its competitor ("competitor:<name>") and its
+  aspects ("aspect:<name>", from the review scorer lexicon)
+- every ``chunk_rows`` reviews, the (term, doc, tf) triples are appended to a
+  run file; review text (first MAX_TEXT_CHARS) goes to docs.bin
+- a counting sort then scatters the run file, block by block, into
+  postings.bin / tf.bin, grouped by term with doc ids ascending
+Only the vocabulary stays in memory.
+
+Query: every array is memory-mapped. Scoring is BM25 over the query terms'
+postings, optionally restricted to a competitor and/or an aspect, with top-k
+by argpartition. Typical queries take a few milliseconds.
+
+Index directory: meta.json, terms.json, offsets.bin, postings.bin, tf.bin,
+doc_len.bin, doc_rating.bin, doc_competitor.bin, doc_offsets.bin, docs.bin
+
+CLI:
+    build_review_index build INDEX_DIR reviews.csv more.jsonl [--competitor NAME]
+    build_review_index query INDEX_DIR "battery drain" [--competitor NAME] [--aspect NAME]
+
+Crew: set CUSTOMER_REVIEW_INDEX=INDEX_DIR to give the review agents the tool.
+"""
+
+import argparse
+import csv
+import json
+import math
+import os
+import sys
+from array import array
+from collections import Counter
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Type
+
+import numpy as np
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
+
+from customer.tools.review_scorer import Lexicon, fold, load_lexicon, tokenize
+
+INDEX_ENV = "CUSTOMER_REVIEW_INDEX"
+
+CHUNK_ROWS = 50000          # reviews per run-file flush
+SCATTER_ROWS = 2_000_000    # postings per counting-sort block
+MAX_TEXT_CHARS = 600
+MAX_DOC_LEN = 65535
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+TEXT_FIELDS = ("text", "review", "review_text", "body", "content", "comment")
+COMPETITOR_FIELDS = ("competitor", "company", "brand", "product")
+RATING_FIELDS = ("rating", "stars", "score")
+
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have i if in is it its it's me my of on or "
+    "so that the their them they this to was we were with you your".split()
+)
+
+PAIR_DTYPE = np.dtype([("term", "<u4"), ("doc", "<u4"), ("tf", "<u2")])
+DTYPES = {
+    "offsets": "<i8",
+    "postings": "<u4",
+    "tf": "<u2",
+    "doc_len": "<u2",
+    "doc_rating": "<f4",
+    "doc_competitor": "<u4",
+    "doc_offsets": "<u8",
+}
+
+
+def _path(index_dir: str, name: str) -> str:
+    return os.path.join(index_dir, name if "." in name else f"{name}.bin")
+
+
+def _competitor_key(name: str) -> str:
+    return " ".join(name.lower().split())
+
+
+def _terms(text: str) -> List[str]:
+    return [t for t in tokenize(text) if len(t) > 1 and t not in STOPWORDS]
+
+
+# ============================================================
+# INGESTION
+# ============================================================
+
+def _json_lines(f) -> Iterator[Dict[str, Any]]:
+    for line in f:
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError:
+            continue  # blank or truncated line in a large export
+        if isinstance(row, dict):
+            yield row
+
+
+def iter_reviews(path: str, competitor: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Stream ``{"text", "competitor", "rating"}`` rows from a CSV or JSONL file."""
+    with open(path, newline="", encoding="utf-8", errors="replace") as f:
+        if path.endswith((".jsonl", ".ndjson")):
+            rows: Iterable[Dict[str, Any]] = _json_lines(f)
+        else:
+            csv.field_size_limit(sys.maxsize)
+            rows = csv.DictReader(f)
+
+        for row in rows:
+            row = {str(k).lower(): v for k, v in row.items() if v not in (None, "")}
+            text = next((row[k] for k in TEXT_FIELDS if k in row), None)
+            if not text:
+                continue
+            rating = next((row[k] for k in RATING_FIELDS if k in row), None)
+            try:
+                rating = float(rating) if rating is not None else math.nan
+            except (TypeError, ValueError):
+                rating = math.nan
+            yield {
+                "text": str(text),
+                "competitor": competitor or next((str(row[k]) for k in COMPETITOR_FIELDS if k in row), "unknown"),
+                "rating": rating,
+            }
+
+
+class _IndexWriter:
+    """Appends reviews chunk by chunk; ``close()`` sorts the postings into place."""
+
+    def __init__(self, index_dir: str, lexicon: Lexicon, chunk_rows: int):
+        os.makedirs(index_dir, exist_ok=True)
+        self.index_dir = index_dir
+        self.chunk_rows = chunk_rows
+        self.vocab: Dict[str, int] = {}
+        self.competitors: Dict[str, int] = {}
+        self.competitor_counts: Counter = Counter()
+        self.docs = 0
+        self.total_len = 0
+        self.text_bytes = 0
+
+        # aspect keywords (single words) and phrases (first word -> [(second word, keys)])
+        self.aspect_words: Dict[str, List[str]] = {}
+        self.aspect_phrases: Dict[str, List[tuple]] = {}
+        for term, i in lexicon.vocab.items():
+            names = [f"aspect:{a}" for a, hit in zip(lexicon.aspects, lexicon.aspect_matrix[i]) if hit]
+            if not names:
+                continue
+            first, _, second = term.partition(" ")
+            if second:
+                self.aspect_phrases.setdefault(first, []).append((second, names))
+            else:
+                self.aspect_words[term] = names
+
+        self.files = {
+            name: open(_path(index_dir, name), "wb")
+            for name in ("run.tmp", "docs.bin", "doc_len", "doc_rating", "doc_competitor", "doc_offsets")
+        }
+        np.zeros(1, DTYPES["doc_offsets"]).tofile(self.files["doc_offsets"])
+        self._reset_chunk()
+
+    def _reset_chunk(self) -> None:
+        self.pair_terms = array("I")
+        self.pair_docs = array("I")
+        self.pair_tfs = array("I")
+        self.lens: List[int] = []
+        self.ratings: List[float] = []
+        self.comp_ids: List[int] = []
+        self.ends: List[int] = []
+
+    def add(self, text: str, competitor: str, rating: float) -> None:
+        doc = self.docs
+        raw = tokenize(text)
+        terms = [t for t in raw if len(t) > 1 and t not in STOPWORDS]
+
+        keys = Counter(terms)
+        comp = _competitor_key(competitor)
+        keys[f"competitor:{comp}"] = 1
+        # Aspect keywords are matched like the scorer does, on folded tokens
+        folded = [fold(t) for t in raw]
+        tokens = set(folded)
+        for word in tokens.intersection(self.aspect_words):
+            keys.update(dict.fromkeys(self.aspect_words[word], 1))
+        for first in tokens.intersection(self.aspect_phrases):
+            for i, token in enumerate(folded[:-1]):
+                if token == first:
+                    for second, names in self.aspect_phrases[first]:
+                        if folded[i + 1] == second:
+                            keys.update(dict.fromkeys(names, 1))
+
+        vocab = self.vocab
+        self.pair_terms.extend([vocab.setdefault(k, len(vocab)) for k in keys])
+        self.pair_docs.extend([doc] * len(keys))
+        self.pair_tfs.extend(keys.values())
+
+        if comp not in self.competitors:
+            self.competitors[comp] = len(self.competitors)
+        self.competitor_counts[comp] += 1
+        self.comp_ids.append(self.competitors[comp])
+        self.lens.append(min(len(terms), MAX_DOC_LEN))
+        self.ratings.append(rating)
+
+        data = text[:MAX_TEXT_CHARS].encode("utf-8")
+        self.files["docs.bin"].write(data)
+        self.text_bytes += len(data)
+        self.ends.append(self.text_bytes)
+
+        self.docs += 1
+        self.total_len += len(terms)
+        if len(self.lens) >= self.chunk_rows:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self.lens:
+            return
+        pairs = np.empty(len(self.pair_terms), PAIR_DTYPE)
+        pairs["term"] = self.pair_terms
+        pairs["doc"] = self.pair_docs
+        pairs["tf"] = np.minimum(np.frombuffer(self.pair_tfs, np.uint32), 65535)
+        pairs.tofile(self.files["run.tmp"])
+        np.array(self.lens, DTYPES["doc_len"]).tofile(self.files["doc_len"])
+        np.array(self.ratings, DTYPES["doc_rating"]).tofile(self.files["doc_rating"])
+        np.array(self.comp_ids, DTYPES["doc_competitor"]).tofile(self.files["doc_competitor"])
+        np.array(self.ends, DTYPES["doc_offsets"]).tofile(self.files["doc_offsets"])
+        self._reset_chunk()
+
+    def close(self, sources: Sequence[str]) -> Dict[str, Any]:
+        self._flush()
+        for f in self.files.values():
+            f.close()
+
+        # Renumber terms in sorted order so the term list doubles as a lookup table
+        terms = sorted(self.vocab)
+        rank = np.empty(len(terms), dtype=np.uint32)
+        rank[np.fromiter((self.vocab[t] for t in terms), dtype=np.int64, count=len(terms))] = np.arange(len(terms))
+
+        run_path = _path(self.index_dir, "run.tmp")
+        n_pairs = os.path.getsize(run_path) // PAIR_DTYPE.itemsize
+        runs = np.memmap(run_path, PAIR_DTYPE, "r", shape=(n_pairs,)) if n_pairs else np.empty(0, PAIR_DTYPE)
+
+        df = np.zeros(len(terms), dtype=np.int64)
+        for start in range(0, n_pairs, SCATTER_ROWS):
+            df += np.bincount(rank[runs["term"][start:start + SCATTER_ROWS]], minlength=len(terms))
+        offsets = np.zeros(len(terms) + 1, dtype=DTYPES["offsets"])
+        np.cumsum(df, out=offsets[1:])
+        offsets.tofile(_path(self.index_dir, "offsets"))
+
+        postings = _create(self.index_dir, "postings", n_pairs)
+        tfs = _create(self.index_dir, "tf", n_pairs)
+        fill = offsets[:-1].copy()
+        for start in range(0, n_pairs, SCATTER_ROWS):
+            block = runs[start:start + SCATTER_ROWS]
+            t = rank[block["term"]].astype(np.int64)
+            order = np.argsort(t, kind="stable")  # stable: doc ids stay ascending
+            t = t[order]
+            within = np.arange(len(t)) - np.searchsorted(t, t, side="left")
+            pos = fill[t] + within
+            postings[pos] = block["doc"][order]
+            tfs[pos] = block["tf"][order]
+            fill += np.bincount(t, minlength=len(terms))
+        for arr in (postings, tfs):
+            if isinstance(arr, np.memmap):
+                arr.flush()
+        del runs
+        os.remove(run_path)
+
+        with open(_path(self.index_dir, "terms.json"), "w") as f:
+            json.dump(terms, f)
+        meta = {
+            "docs": self.docs,
+            "terms": len(terms),
+            "postings": int(n_pairs),
+            "avg_len": self.total_len / self.docs if self.docs else 0.0,
+            "competitors": sorted(self.competitors, key=self.competitors.get),
+            "competitor_counts": dict(self.competitor_counts.most_common()),
+            "sources": [os.path.abspath(s) for s in sources],
+        }
+        with open(_path(self.index_dir, "meta.json"), "w") as f:
+            json.dump(meta, f, indent=2)
+        return meta
+
+
+def _create(index_dir: str, name: str, size: int):
+    path = _path(index_dir, name)
+    if not size:
+        open(path, "wb").close()
+        return np.empty(0, DTYPES[name])
+    return np.memmap(path, DTYPES[name], "w+", shape=(size,))
+
+
+def build_index(
+    paths: Sequence[str],
+    index_dir: str,
+    competitor: Optional[str] = None,
+    chunk_rows: int = CHUNK_ROWS,
+    lexicon: Optional[Lexicon] = None,
+) -> Dict[str, Any]:
+    """Stream review files into an index at ``index_dir``; return its metadata."""
+    writer = _IndexWriter(index_dir, lexicon or load_lexicon(), chunk_rows)
+    for path in paths:
+        for review in iter_reviews(path, competitor):
+            writer.add(review["text"], review["competitor"], review["rating"])
+    meta = writer.close(paths)
+    open_index.cache_clear()
+    return meta
+
+
+# ============================================================
+# QUERY
+# ============================================================
+
+class ReviewIndex:
+    """Read-only, memory-mapped view of an index directory."""
+
+    def __init__(self, index_dir: str):
+        self.index_dir = index_dir
+        with open(_path(index_dir, "meta.json")) as f:
+            self.meta = json.load(f)
+        with open(_path(index_dir, "terms.json")) as f:
+            self.term_ids = {t: i for i, t in enumerate(json.load(f))}
+        self.arrays = {name: self._map(name) for name in DTYPES}
+        self.text_bytes = self._map("docs.bin", np.uint8)
+
+    def _map(self, name: str, dtype: Any = None) -> np.ndarray:
+        path = _path(self.index_dir, name)
+        dtype = np.dtype(dtype or DTYPES[name])
+        if os.path.getsize(path) < dtype.itemsize:
+            return np.empty(0, dtype)
+        return np.memmap(path, dtype, "r")
+
+    def postings(self, key: str):
+        """(doc ids, term frequencies) of one postings key; empty if unknown."""
+        tid = self.term_ids.get(key)
+        if tid is None:
+            return np.empty(0, np.uint32), np.empty(0, np.uint16)
+        start, end = self.arrays["offsets"][tid], self.arrays["offsets"][tid + 1]
+        return self.arrays["postings"][start:end], self.arrays["tf"][start:end]
+
+    def text(self, doc: int) -> str:
+        start, end = self.arrays["doc_offsets"][doc], self.arrays["doc_offsets"][doc + 1]
+        return bytes(self.text_bytes[start:end]).decode("utf-8", "replace")
+
+    def search(
+        self,
+        query: str,
+        competitor: Optional[str] = None,
+        aspect: Optional[str] = None,
+        top_k: int = 5,
+    ) -> List[Dict[str, Any]]:
+        """BM25 top-k reviews for ``query``, optionally filtered by competitor / aspect."""
+        if top_k < 1:
+            return []
+        allowed = None
+        for key in ([f"competitor:{_competitor_key(competitor)}"] if competitor else []) + (
+            [f"aspect:{aspect.lower().strip()}"] if aspect else []
+        ):
+            docs = self.postings(key)[0]
+            allowed = docs if allowed is None else np.intersect1d(allowed, docs, assume_unique=True)
+
+        n = self.meta["docs"]
+        doc_len = self.arrays["doc_len"]
+        avg_len = self.meta["avg_len"] or 1.0
+        hit_docs, hit_weights = [], []
+        for term in set(_terms(query)):
+            docs, tf = self.postings(term)
+            if not len(docs):
+                continue
+            idf = math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+            if allowed is not None:
+                idx = np.minimum(np.searchsorted(allowed, docs), max(len(allowed) - 1, 0))
+                keep = allowed[idx] == docs if len(allowed) else np.zeros(len(docs), bool)
+                docs, tf = docs[keep], tf[keep]
+            tf = tf.astype(np.float64)
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_len[docs] / avg_len)
+            hit_docs.append(docs)
+            hit_weights.append(idf * tf * (BM25_K1 + 1) / (tf + norm))
+
+        if hit_docs:
+            docs, inverse = np.unique(np.concatenate(hit_docs), return_inverse=True)
+            scores = np.bincount(inverse, weights=np.concatenate(hit_weights))
+        elif allowed is not None:
+            # Filter-only query: first matching reviews in corpus order
+            docs, scores = allowed[:top_k], np.zeros(min(top_k, len(allowed)))
+        else:
+            return []
+
+        if len(docs) > top_k:
+            # Everything above the k-th score, then the earliest docs tied with it
+            kth = np.partition(scores, -top_k)[-top_k]
+            above = np.flatnonzero(scores > kth)
+            best = np.sort(np.concatenate([above, np.flatnonzero(scores == kth)[:top_k - len(above)]]))
+            docs, scores = docs[best], scores[best]
+        # Best first; ties (and filter-only results) keep corpus order
+        order = np.argsort(-scores, kind="stable")
+
+        competitors = self.meta["competitors"]
+        results = []
+        for i in order:
+            doc = int(docs[i])
+            rating = float(self.arrays["doc_rating"][doc])
+            results.append({
+                "doc": doc,
+                "score": float(scores[i]),
+                "competitor": competitors[self.arrays["doc_competitor"][doc]],
+                "rating": None if math.isnan(rating) else rating,
+                "text": self.text(doc),
+            })
+        return results
+
+
+@lru_cache(maxsize=8)
+def open_index(index_dir: str) -> ReviewIndex:
+    return ReviewIndex(index_dir)
+
+
+def configured_index_dir() -> Optional[str]:
+    """The index named by CUSTOMER_REVIEW_INDEX, if it has been built."""
+    index_dir = os.getenv(INDEX_ENV)
+    if index_dir and os.path.exists(_path(index_dir, "meta.json")):
+        return index_dir
+    return None
+
+
+def format_results(results: List[Dict[str, Any]], max_chars: int = 300) -> str:
+    """Compact text for the agent."""
+    if not results:
+        return "No matching reviews in the local corpus."
+    lines = []
+    for i, r in enumerate(results, 1):
+        rating = f", rating {r['rating']:g}" if r["rating"] is not None else ""
+        text = " ".join(r["text"].split())
+        lines.append(f"{i}. [{r['competitor']}{rating}] {text[:max_chars]}")
+    return "\n".join(lines)
+
+
+# ============================================================
+# TOOL
+# ============================================================
+
+class ReviewSearchInput(BaseModel):
+    """Input schema for ReviewSearchTool."""
+    query: str = Field(..., description="Words to search for, e.g. 'battery drain after update'.")
+    competitor: Optional[str] = Field(None, description="Only reviews of this competitor.")
+    aspect: Optional[str] = Field(
+        None, description="Only reviews tagged with this aspect (price, battery, camera, performance, "
+                          "reliability, software, support, design, connectivity, delivery)."
+    )
+    top_k: int = Field(5, ge=1, le=50, description="Number of reviews to return.")
+
+
+class ReviewSearchTool(BaseTool):
+    name: str = "Review Index Search"
+    description: str = (
+        "Searches the local corpus of exported customer reviews and returns the most relevant ones "
+        "with competitor and rating. Use it to find real quotes for churn reasons, complaints and feature gaps."
+    )
+    args_schema: Type[BaseModel] = ReviewSearchInput
+    index_dir: Optional[str] = None
+
+    def _run(self, query: str, competitor: Optional[str] = None, aspect: Optional[str] = None, top_k: int = 5) -> str:
+        index_dir = self.index_dir or configured_index_dir()
+        if not index_dir:
+            return f"Review Index Search: no review index configured (set {INDEX_ENV})."
+        return format_results(open_index(index_dir).search(query, competitor, aspect, top_k))
+
+
+# ============================================================
+# CLI
+# ============================================================
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Build or query a local review index.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="Stream CSV / JSONL review dumps into an index")
+    build.add_argument("index_dir")
+    build.add_argument("files", nargs="+")
+    build.add_argument("--competitor", help="Competitor of every row (for files without a competitor column)")
+    build.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+
+    query = sub.add_parser("query", help="Top-k reviews for a query")
+    query.add_argument("index_dir")
+    query.add_argument("query")
+    query.add_argument("--competitor")
+    query.add_argument("--aspect")
+    query.add_argument("--top-k", type=int, default=5)
+
+    args = parser.parse_args(argv)
+    if args.command == "build":
+        meta = build_index(args.files, args.index_dir, args.competitor, args.chunk_rows)
+        print(f"Indexed {meta['docs']} reviews, {meta['terms']} terms, {meta['postings']} postings -> {args.index_dir}")
+    else:
+        print(format_results(open_index(args.index_dir).search(args.query, args.competitor, args.aspect, args.top_k)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+"""
+REVIEW SCORER
+
+Local, lexicon-based scoring of customer text: sentiment class, aspect tags
+and complaint-theme counts for thousands of reviews or search snippets in one
+pass. The crew gets a compact table; the LLM only writes the narrative.
+
+Lexicon: config/lexicon.yaml (weighted sentiment terms, frustration markers,
+negators, intensifiers, aspect keywords, complaint themes). Terms may be one
+word or a two-word phrase. Terms and text are matched after minimal suffix
+folding (-ing, -ed, plural -s/-es), so "crashing" and "crashed" hit "crash";
+curly apostrophes count as straight ones ("don’t" negates).
+
+Scoring:
+- texts are tokenised once; every lexicon hit becomes a row in flat arrays
+  (text, term, modifier), so scores and counts are NumPy bincounts
+- a negator within the two preceding tokens flips a term's polarity; an
+  intensifier right before it multiplies it by 1.5
+- class per text: Frustration (a frustration marker and a score <= 0, so
+  "ignored me again" counts without any other negative term), Hate
+  (score <= -1), Love (score >= 1), otherwise Neutral
+- aspects: share of texts mentioning each one and their mean score
+- complaint themes: counted only in negative or frustrated texts
+"""
+
+import os
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import yaml
+
+LEXICON_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "config", "lexicon.yaml")
+
+LABELS = ("Love", "Hate", "Neutral", "Frustration")
+NEGATION_WINDOW = 2
+INTENSIFIER_BOOST = 1.5
+
+_TOKEN = re.compile(r"[a-z0-9']+")
+_APOSTROPHES = str.maketrans({"\u2019": "'", "\u2018": "'", "\u02bc": "'"})
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower().translate(_APOSTROPHES))
+
+
+def fold(token: str) -> str:
+    """Minimal suffix folding: crashing / crashed / crashes -> crash."""
+    for suffix in ("ing", "ed"):
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            return token[: -len(suffix)]
+    if token.endswith("es") and token[:-2].endswith(("sh", "ch", "x", "ss", "z")):
+        return token[:-2]
+    if token.endswith("s") and not token.endswith(("ss", "us", "is")) and len(token) > 3:
+        return token[:-1]
+    return token
+
+
+def term_key(term: str) -> str:
+    """Vocabulary key of a lexicon term or phrase, as matched against folded tokens."""
+    return " ".join(fold(word) for word in tokenize(term))
+
+
+@dataclass(frozen=True)
+class Lexicon:
+    """Lexicon compiled to term ids and per-term lookup arrays."""
+    vocab: Dict[str, int]
+    polarity: np.ndarray        # (terms,) sentiment weight
+    frustration: np.ndarray     # (terms,) bool
+    aspects: Tuple[str, ...]
+    aspect_matrix: np.ndarray   # (terms, aspects) bool
+    themes: Tuple[str, ...]
+    theme_matrix: np.ndarray    # (terms, themes) bool
+    negators: frozenset
+    intensifiers: frozenset
+
+
+def _terms(section: str, values: Iterable[Any]) -> List[str]:
+    """Lexicon terms must be strings: unquoted yes/no/on/off parse as YAML booleans."""
+    values = list(values)
+    bad = [v for v in values if not isinstance(v, str)]
+    if bad:
+        raise ValueError(f"lexicon {section}: non-string terms {bad!r} (quote them in the YAML)")
+    return values
+
+
+def compile_lexicon(cfg: Dict[str, Any]) -> Lexicon:
+    sentiment = cfg.get("sentiment", {})
+    aspects = {name: _terms(f"aspects.{name}", kw) for name, kw in cfg.get("aspects", {}).items()}
+    themes = {name: _terms(f"complaint_themes.{name}", kw) for name, kw in cfg.get("complaint_themes", {}).items()}
+    weights = {**sentiment.get("positive", {}), **sentiment.get("negative", {})}
+    _terms("sentiment weights", weights)
+    frustration = set(_terms("sentiment.frustration", sentiment.get("frustration", [])))
+
+    terms = set(weights) | frustration
+    for keywords in list(aspects.values()) + list(themes.values()):
+        terms.update(keywords)
+    # Inflections of one word (crash, crashes) share a key
+    vocab = {key: i for i, key in enumerate(sorted({term_key(t) for t in terms}))}
+
+    polarity = np.zeros(len(vocab))
+    for term, weight in weights.items():
+        polarity[vocab[term_key(term)]] = weight
+    is_frustration = np.zeros(len(vocab), dtype=bool)
+    is_frustration[[vocab[term_key(t)] for t in frustration]] = True
+
+    def membership(groups: Dict[str, List[str]]) -> np.ndarray:
+        matrix = np.zeros((len(vocab), len(groups)), dtype=bool)
+        for j, keywords in enumerate(groups.values()):
+            matrix[[vocab[term_key(k)] for k in keywords], j] = True
+        return matrix
+
+    return Lexicon(
+        vocab=vocab,
+        polarity=polarity,
+        frustration=is_frustration,
+        aspects=tuple(aspects),
+        aspect_matrix=membership(aspects),
+        themes=tuple(themes),
+        theme_matrix=membership(themes),
+        negators=frozenset(t for n in _terms("sentiment.negators", sentiment.get("negators", [])) for t in tokenize(n)),
+        intensifiers=frozenset(t for n in _terms("sentiment.intensifiers", sentiment.get("intensifiers", [])) for t in tokenize(n)),
+    )
+
+
+@lru_cache(maxsize=None)
+def load_lexicon(path: str = LEXICON_PATH) -> Lexicon:
+    with open(path) as f:
+        return compile_lexicon(yaml.safe_load(f))
+
+
+def _hits(texts: List[str], lexicon: Lexicon):
+    """Flatten lexicon hits of all texts into (text, term, modifier) arrays."""
+    vocab = lexicon.vocab
+    doc_ids, term_ids, modifiers = [], [], []
+    for d, text in enumerate(texts):
+        raw = tokenize(text)
+        tokens = [fold(token) for token in raw]
+        for i, token in enumerate(tokens):
+            candidates = [token]
+            if i + 1 < len(tokens):
+                candidates.append(f"{token} {tokens[i + 1]}")
+            for term in candidates:
+                t = vocab.get(term)
+                if t is None:
+                    continue
+                # Negators and intensifiers match the unfolded tokens
+                before = raw[max(i - NEGATION_WINDOW, 0):i]
+                modifier = -1.0 if lexicon.negators.intersection(before) else 1.0
+                if before and before[-1] in lexicon.intensifiers:
+                    modifier *= INTENSIFIER_BOOST
+                doc_ids.append(d)
+                term_ids.append(t)
+                modifiers.append(modifier)
+    return (
+        np.asarray(doc_ids, dtype=np.int64),
+        np.asarray(term_ids, dtype=np.int64),
+        np.asarray(modifiers, dtype=float),
+    )
+
+
+def score_texts(texts: Iterable[str], lexicon: Optional[Lexicon] = None) -> Dict[str, Any]:
+    """Score all texts in one pass; return per-text arrays and aggregate counts."""
+    lexicon = lexicon or load_lexicon()
+    texts = [t for t in texts if t and t.strip()]
+    n = len(texts)
+    docs, terms, modifiers = _hits(texts, lexicon)
+
+    scores = np.bincount(docs, weights=lexicon.polarity[terms] * modifiers, minlength=n)
+    frustrated = np.bincount(docs, weights=lexicon.frustration[terms], minlength=n) > 0
+
+    labels = np.full(n, LABELS.index("Neutral"))
+    labels[scores >= 1] = LABELS.index("Love")
+    labels[scores <= -1] = LABELS.index("Hate")
+    # Frustration markers carry no weight; a frustrated text that is not positive overall counts
+    labels[frustrated & (scores <= 0)] = LABELS.index("Frustration")
+    negative = (scores < 0) | (labels == LABELS.index("Frustration"))
+
+    def mentions(matrix: np.ndarray) -> np.ndarray:
+        # (texts, groups) bool: does text d hit any keyword of group j
+        hit = np.zeros((n, matrix.shape[1]), dtype=bool)
+        np.logical_or.at(hit, docs, matrix[terms])
+        return hit
+
+    aspect_hits = mentions(lexicon.aspect_matrix)
+    theme_hits = mentions(lexicon.theme_matrix) & negative[:, None]
+    aspect_counts = aspect_hits.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        aspect_mean = (aspect_hits * scores[:, None]).sum(axis=0) / aspect_counts
+        aspect_negative = (aspect_hits & negative[:, None]).sum(axis=0) / aspect_counts
+
+    return {
+        "texts": n,
+        "scores": scores,
+        "labels": [LABELS[i] for i in labels],
+        "label_counts": dict(zip(LABELS, np.bincount(labels, minlength=len(LABELS)).tolist())),
+        "mean_score": float(scores.mean()) if n else 0.0,
+        "aspects": {
+            name: {"mentions": int(c), "mean_score": float(m), "negative_share": float(s)}
+            for name, c, m, s in zip(lexicon.aspects, aspect_counts, aspect_mean, aspect_negative)
+            if c
+        },
+        "themes": {name: int(c) for name, c in zip(lexicon.themes, theme_hits.sum(axis=0)) if c},
+    }
+
+
+def format_score_table(result: Dict[str, Any], top: int = 6) -> str:
+    """Compact markdown table for the prompt."""
+    n = result["texts"]
+    if not n:
+        return "Local sentiment scoring: no customer text to score."
+    counts = result["label_counts"]
+    lines = [
+        f"Local sentiment scoring ({n} texts, mean score {result['mean_score']:+.2f})",
+        "| Love | Hate | Neutral | Frustration |",
+        "|---|---|---|---|",
+        "| " + " | ".join(f"{counts[l]} ({counts[l] / n:.0%})" for l in LABELS) + " |",
+    ]
+    aspects = sorted(result["aspects"].items(), key=lambda kv: -kv[1]["mentions"])[:top]
+    if aspects:
+        lines += ["", "| Aspect | Mentions | Mean score | Negative |", "|---|---|---|---|"]
+        lines += [
+            f"| {name} | {a['mentions']} | {a['mean_score']:+.2f} | {a['negative_share']:.0%} |"
+            for name, a in aspects
+        ]
+    themes = sorted(result["themes"].items(), key=lambda kv: -kv[1])[:top]
+    if themes:
+        lines += ["", "Complaint themes (negative texts): " + ", ".join(f"{name} {c}" for name, c in themes)]
+    return "\n".join(lines)
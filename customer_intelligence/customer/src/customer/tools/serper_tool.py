@@ -1,27 +1,39 @@
 import os
-import requests
+from typing import Dict, List
+from prism_common.dedupe import dedupe_results
+from prism_common.serper import serper_search, serper_search_many
 
 SERPER_API_KEY = os.getenv("SERPER_API_KEY")
 
-def search(query: str) -> str:
-    url = "https://google.serper.dev/search"
-    headers = {
-        "X-API-KEY": SERPER_API_KEY,
-        "Content-Type": "application/json"
-    }
-
-    payload = {"q": query, "num": 5}
-    response = requests.post(url, headers=headers, json=payload, timeout=30)
-    response.raise_for_status()
-
-    data = response.json()
 
+def _to_text(data: dict) -> str:
     # Extract only meaningful text
     results = []
-    for item in data.get("organic", []):
+    for item in dedupe_results(data.get("organic", [])):
         title = item.get("title", "")
         snippet = item.get("snippet", "")
         results.append(f"{title}: {snippet}")
 
     # Return compact text, not JSON
     return "\n".join(results)
+
+
+def search(query: str) -> str:
+    # Shared search cache + pooled keep-alive client with connect/read deadlines
+    data = serper_search(query, SERPER_API_KEY, num=5)
+    return _to_text(data)
+
+
+def search_many(queries: List[str], max_results: int = 15) -> str:
+    # Targeted queries run concurrently; results are merged and deduplicated
+    data = serper_search_many(queries, SERPER_API_KEY, num=5, max_results=max_results)
+    return _to_text(data)
+
+
+def search_sections(queries: List[str], max_results: int = 15) -> Dict[str, str]:
+    # Same merged search, with the text kept apart per query (for per-role context slices)
+    data = serper_search_many(queries, SERPER_API_KEY, num=5, max_results=max_results)
+    by_query: Dict[str, List[dict]] = {}
+    for item in data.get("organic", []):
+        by_query.setdefault(item.get("query", ""), []).append(item)
+    return {query: _to_text({"organic": items}) for query, items in by_query.items()}
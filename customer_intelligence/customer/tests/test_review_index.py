@@ -0,0 +1,32 @@
+import csv
+
+from customer.tools.review_index import build_index, open_index
+
+
+def _build(tmp_path, rows):
+    path = tmp_path / "reviews.csv"
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["competitor", "rating", "text"])
+        writer.writeheader()
+        writer.writerows(rows)
+    index_dir = str(tmp_path / "index")
+    build_index([str(path)], index_dir)
+    return open_index(index_dir)
+
+
+def test_filter_only_query_keeps_corpus_order(tmp_path):
+    index = _build(tmp_path, [
+        {"competitor": "Acme", "rating": 5, "text": "great camera"},
+        {"competitor": "Other", "rating": 1, "text": "battery died"},
+        {"competitor": "Acme", "rating": 3, "text": "screen is fine"},
+        {"competitor": "Other", "rating": 4, "text": "fast shipping"},
+        {"competitor": "Acme", "rating": 2, "text": "slow app"},
+    ])
+    # "the" is a stopword: only the competitor filter selects reviews
+    hits = index.search("the", competitor="acme", top_k=5)
+    assert [hit["doc"] for hit in hits] == [0, 2, 4]
+
+
+def test_tied_scores_keep_corpus_order(tmp_path):
+    index = _build(tmp_path, [{"competitor": "Acme", "rating": 4, "text": "battery ok"}] * 4)
+    assert [hit["doc"] for hit in index.search("battery", top_k=3)] == [0, 1, 2]
@@ -0,0 +1,21 @@
+from customer.tools.review_scorer import fold, score_texts
+
+
+def test_frustration_marker_without_negative_term():
+    result = score_texts(["Battery drain after update, so frustrating", "customer service ignored me"])
+    assert result["labels"] == ["Frustration", "Frustration"]
+    assert result["themes"]["poor support"] == 1
+
+
+def test_positive_text_with_frustration_marker_stays_love():
+    assert score_texts(["still love it, great phone"])["labels"] == ["Love"]
+
+
+def test_curly_apostrophe_negates():
+    straight, curly = score_texts(["I don't love it", "I don’t love it"])["scores"]
+    assert curly == straight < 0
+
+
+def test_suffix_folding():
+    assert fold("crashing") == fold("crashed") == fold("crashes") == "crash"
+    assert score_texts(["the app keeps crashing"])["scores"][0] < 0
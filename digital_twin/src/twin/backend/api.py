@@ -1,9 +1,16 @@
 from fastapi import FastAPI, Header
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import List, Dict
-from twin.crew import build_twin_crew
+from typing import Any, List, Dict, Optional
+from twin.crew import build_twin_crew, kickoff_twin_crew, templates
+from prism_common.jobs import get_job_registry
+from prism_common.jobs_api import accepted, async_requested, build_jobs_router
+from prism_common.llm_cache import bypass_llm_cache, no_cache_requested
+from prism_common.run_cache import cached_run
+from prism_common.run_context import RunContext
+from prism_common.streaming import stream_run, watch_crew
 import concurrent.futures
+import contextvars
 import os
 
 app = FastAPI(title="Digital Twin API", version="1.0")
@@ -17,12 +24,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Background runs: "Prefer: respond-async" on /run, then poll /jobs/{id}
+app.include_router(build_jobs_router())
+
 class TwinRequest(BaseModel):
     companies: List[str]
 
 class AgentResults(BaseModel):
     final_decision: str
     agents: Dict[str, str]
+    # Run cache status: miss / fresh / stale (see prism_common.run_cache)
+    cache: Optional[Dict[str, Any]] = None
 
 class TwinResponse(BaseModel):
     results: Dict[str, AgentResults]
@@ -31,40 +43,67 @@ class TwinResponse(BaseModel):
 def health():
     return {"status": "Digital Twin API running"}
 
-# ---- Run one company ----
+# ---- Run one company (a recent run for the same company is reused) ----
 def run_company(company, api_key=None):
-    # Temporarily set GROQ_API_KEY for this company run if provided
-    old_key = os.environ.get("GROQ_API_KEY")
-    try:
-        if api_key:
-            os.environ["GROQ_API_KEY"] = api_key
-
-        crew = build_twin_crew(company)
-        output = crew.kickoff()
-
-        agent_outputs = {}
-
-        # Extract each agent’s final answer
-        if hasattr(output, "tasks_output"):
-            for task in output.tasks_output:
-                agent_outputs[task.agent] = task.raw
-
-        return company, {
-            "final_decision": output.raw,
-            "agents": agent_outputs
-        }
-    finally:
-        if old_key is None:
-            os.environ.pop("GROQ_API_KEY", None)
-        else:
-            os.environ["GROQ_API_KEY"] = old_key
+    return company, cached_run(
+        "twin",
+        {"company": company, "model": os.getenv("GROQ_MODEL_NAME")},
+        lambda: simulate_company(company, api_key),
+        version=templates.version,
+    )
+
+
+def simulate_company(company, api_key=None):
+    # The caller's key only reaches this company's crew; os.environ is untouched
+    crew = watch_crew(build_twin_crew(company, context=RunContext(groq_api_key=api_key)), scope=company)
+    output = kickoff_twin_crew(crew)
+
+    agent_outputs = {}
+
+    # Extract each agent’s final answer
+    if hasattr(output, "tasks_output"):
+        for task in output.tasks_output:
+            agent_outputs[task.agent] = task.raw
+
+    return {
+        "final_decision": output.raw,
+        "agents": agent_outputs
+    }
 
 @app.post("/run", response_model=TwinResponse)
-def run_twin(req: TwinRequest, x_groq_api_key: str | None = Header(None, alias="X-Groq-Api-Key")):
+def run_twin(
+    req: TwinRequest,
+    x_groq_api_key: str | None = Header(None, alias="X-Groq-Api-Key"),
+    cache_control: str | None = Header(None, alias="Cache-Control"),
+    prefer: str | None = Header(None, alias="Prefer"),
+):
+    # "Cache-Control: no-cache" skips cached LLM answers (carried into background jobs too)
+    with bypass_llm_cache(no_cache_requested(cache_control)):
+        if async_requested(prefer):
+            return accepted(get_job_registry().submit("run", execute_twin, req, x_groq_api_key))
+        return execute_twin(req, x_groq_api_key)
+
+
+@app.post("/run/stream")
+def run_twin_stream(
+    req: TwinRequest,
+    x_groq_api_key: str | None = Header(None, alias="X-Groq-Api-Key"),
+    cache_control: str | None = Header(None, alias="Cache-Control"),
+):
+    """Same run as /run, streamed as server-sent events (task events carry the company as "scope")."""
+    with bypass_llm_cache(no_cache_requested(cache_control)):
+        return stream_run("run", execute_twin, req, x_groq_api_key)
+
+
+def execute_twin(req: TwinRequest, api_key=None):
     results = {}
 
+    # Each worker gets a copy of the caller's context (cache bypass, job cancellation)
     with concurrent.futures.ThreadPoolExecutor() as executor:
-        futures = [executor.submit(run_company, c, x_groq_api_key) for c in req.companies]
+        futures = [
+            executor.submit(contextvars.copy_context().run, run_company, c, api_key)
+            for c in req.companies
+        ]
 
         for future in concurrent.futures.as_completed(futures):
             company, output = future.result()
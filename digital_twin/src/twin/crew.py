@@ -1,8 +1,13 @@
 import os
-import yaml
+from typing import Optional
 from dotenv import load_dotenv
-from crewai import Crew, Agent, Task, LLM
-from twin.tools.serper_tool import search
+from crewai import Crew, Agent, Task
+from twin.tools.serper_tool import compact_sections, search_many
+from prism_common.crew_templates import CrewTemplates
+from prism_common.dag import kickoff_concurrently, parallel_enabled
+from prism_common.llm_cache import cached_llm
+from prism_common.run_context import DEFAULT_CONTEXT, RunContext
+from prism_common.shared_context import SharedContext
 
 # Load environment variables
 load_dotenv()
@@ -10,74 +15,97 @@ load_dotenv()
 BASE_DIR = os.path.dirname(__file__)
 CONFIG_DIR = os.path.join(BASE_DIR, "config")
 
-# ---- Load YAML configs ----
-with open(os.path.join(CONFIG_DIR, "agents.yaml"), "r") as f:
-    agent_cfg = yaml.safe_load(f)
+# ---- YAML configs: parsed once, read-only; each run builds from its own copy ----
+templates = CrewTemplates(CONFIG_DIR)
 
-with open(os.path.join(CONFIG_DIR, "tasks.yaml"), "r") as f:
-    task_cfg = yaml.safe_load(f)
-
-# ---- Validate ENV ----
-def get_llm():
-    api_key = os.getenv("GROQ_API_KEY")
+# ---- Validate ENV (request context wins over env) ----
+def get_llm(context: Optional[RunContext] = None):
+    context = context or DEFAULT_CONTEXT
+    api_key = context.api_key_or_env("GROQ_API_KEY")
     base_url = os.getenv("GROQ_API_BASE")
-    model = os.getenv("GROQ_MODEL_NAME")
+    model = context.model_or(env_var="GROQ_MODEL_NAME")
 
     if not api_key:
         raise RuntimeError("GROQ_API_KEY is not set")
     if not model:
         raise RuntimeError("GROQ_MODEL_NAME is not set")
 
-    return LLM(
+    return cached_llm(
         api_key=api_key,
         base_url=base_url,
         model=model,
     )
 
-def build_twin_crew(company: str) -> Crew:
-    llm = get_llm()
+# ---- Live market queries, one shared-context section each ----
+MARKET_QUERIES = {
+    "roadmap": "{company} product roadmap future plans",
+    "launch": "{company} upcoming launch date leaks",
+    "pricing": "{company} price cut discount pricing strategy",
+    "patents": "{company} patents R&D investment",
+    "competition": "{company} response to competitors strategy",
+}
+
+def build_twin_crew(company: str, context: Optional[RunContext] = None) -> Crew:
+    llm = get_llm(context)
 
-    # ---- Create agents ----
+    # ---- Create agents (fresh per run, nothing shared between runs) ----
     agents = {
-        name: Agent(**cfg, llm=llm)
-        for name, cfg in agent_cfg.items()
+        name: Agent(**templates.agent(name), llm=llm)
+        for name in templates.agents
     }
+    task_cfg = templates.tasks
 
-    # ---- Live market context ----
-    market_data = search(
-        f"{company} product roadmap pricing leaks future plans"
-    )
+    # ---- Live market context (targeted queries, fetched concurrently) ----
+    # Projected to title/snippet/source/date and capped by a token budget, rendered once
+    queries = {name: q.format(company=company) for name, q in MARKET_QUERIES.items()}
+    results = compact_sections(search_many(list(queries.values())))
+
+    # Stored once; each task gets the sections listed under its context_sections
+    shared = SharedContext(f"Live market intelligence for {company}")
+    for name, query in queries.items():
+        shared.add(name, results.get(query, ""))
+    shared.add("general", results.get("", ""))
+
+    def describe(task_name: str) -> str:
+        cfg = task_cfg[task_name]
+        sections = cfg.get("context_sections")
+        return cfg["description"].format(company=company) + shared.slice(
+            None if sections is None else list(sections) + ["general"]
+        )
 
-    context = f"""
-    Live market intelligence for {company}:
-    {market_data}
-    """
-
-    tasks = [
-        Task(
-            description=task_cfg["behavior_task"]["description"].format(company=company) + context,
-            expected_output=task_cfg["behavior_task"]["expected_output"],
-            agent=agents["behavior_modeler"],
-        ),
-        Task(
-            description=task_cfg["roadmap_task"]["description"].format(company=company) + context,
-            expected_output=task_cfg["roadmap_task"]["expected_output"],
-            agent=agents["roadmap_predictor"],
-        ),
-        Task(
-            description=task_cfg["pricing_task"]["description"].format(company=company) + context,
-            expected_output=task_cfg["pricing_task"]["expected_output"],
-            agent=agents["pricing_predictor"],
-        ),
-        Task(
-            description=task_cfg["launch_task"]["description"].format(company=company) + context,
-            expected_output=task_cfg["launch_task"]["expected_output"],
-            agent=agents["launch_engine"],
-        ),
-    ]
+    task_agents = {
+        "behavior_task": "behavior_modeler",
+        "roadmap_task": "roadmap_predictor",
+        "pricing_task": "pricing_predictor",
+        "launch_task": "launch_engine",
+    }
+    tasks = {
+        name: Task(
+            description=describe(name),
+            expected_output=task_cfg[name]["expected_output"],
+            agent=agents[agent],
+        )
+        for name, agent in task_agents.items()
+    }
+    # Tasks listing others under ``context`` get their outputs (e.g. roadmap <- behavior)
+    for name, task in tasks.items():
+        if task_cfg[name].get("context"):
+            task.context = [tasks[dep] for dep in task_cfg[name]["context"]]
+
+    shared.report(f"twin[{company}]")
 
     return Crew(
         agents=list(agents.values()),
-        tasks=tasks,
+        tasks=list(tasks.values()),
         verbose=True,
     )
+
+
+def kickoff_twin_crew(crew: Crew, parallel: Optional[bool] = None):
+    """Run a twin crew. The four tasks share one market context; by default
+    behavior, pricing and launch run at once and roadmap follows the behavior
+    profile it builds on (PRISM_PARALLEL_TASKS=0 or parallel=False runs them
+    in order)."""
+    if parallel_enabled(parallel):
+        return kickoff_concurrently(crew)
+    return crew.kickoff()
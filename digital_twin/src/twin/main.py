@@ -1,4 +1,4 @@
-from twin.crew import build_twin_crew
+from twin.crew import build_twin_crew, kickoff_twin_crew
 
 
 def run():
@@ -13,7 +13,7 @@ def run():
     for company in companies:
         print(f"\n🚀 Running Digital Twin for: {company}")
         crew = build_twin_crew(company)
-        result = crew.kickoff()
+        result = kickoff_twin_crew(crew)
         all_results[company] = result
 
     print("\n================ MULTI-COMPANY DIGITAL TWIN OUTPUT ================\n")
@@ -34,6 +34,6 @@ if __name__ == "__main__":
         for company in companies:
             print(f"\n🚀 Running Digital Twin for: {company}")
             crew = build_twin_crew(company)
-            print(crew.kickoff())
+            print(kickoff_twin_crew(crew))
     else:
         run()
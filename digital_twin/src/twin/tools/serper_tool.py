@@ -1,14 +1,136 @@
 import os
+import re
 import requests
+from typing import Any, Dict, List, NamedTuple, Optional
+from urllib.parse import urlparse
+from prism_common.serper import serper_search, serper_search_many
 
 SERPER_API_KEY = os.getenv("SERPER_API_KEY")
 
+# Prompt budget for rendered search results (~4 characters per token)
+CONTEXT_TOKEN_BUDGET = int(os.getenv("TWIN_CONTEXT_TOKENS", "800"))
+SNIPPET_CHARS = 240
+# " | Site name" / " - Site name" title suffixes repeat the source field
+_TITLE_SUFFIX = re.compile(r"\s+[|\u2013\u2014-]\s+([^|\u2013\u2014-]{1,40})$")
+
 def search(query: str):
-    url = "https://google.serper.dev/search"
-    headers = {
-        "X-API-KEY": SERPER_API_KEY,
-        "Content-Type": "application/json"
-    }
-    payload = {"q": query, "num": 5}
-    response = requests.post(url, headers=headers, json=payload)
-    return response.json()
+    # Shared search cache + pooled keep-alive client with connect/read deadlines
+    try:
+        return serper_search(query, SERPER_API_KEY, num=5)
+    except requests.HTTPError as he:
+        # Keep returning a dict so the crew still builds; errors are never cached
+        return {"error": str(he)}
+
+def search_many(queries: List[str], max_results: int = 15):
+    # Targeted queries run concurrently; results are merged and deduplicated
+    try:
+        return serper_search_many(queries, SERPER_API_KEY, num=5, max_results=max_results)
+    except requests.HTTPError as he:
+        return {"error": str(he)}
+
+
+# ---------- Compact results for prompts ----------
+class SearchRecord(NamedTuple):
+    """The fields of a search hit the twin agents actually use."""
+    title: str
+    snippet: str
+    source: str
+    date: str
+    query: str
+
+
+def _clean(text: Any, limit: Optional[int] = None) -> str:
+    text = " ".join(str(text or "").split())
+    if limit and len(text) > limit:
+        text = text[:limit].rsplit(" ", 1)[0] + "..."
+    return text
+
+
+def _domain(link: Optional[str]) -> str:
+    host = urlparse(link or "").netloc.lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def _alnum(text: str) -> str:
+    return re.sub(r"[^a-z0-9]", "", text.lower())
+
+
+def _strip_site_suffix(title: str, domain: str) -> str:
+    """Drop a trailing " - Site" only when it names the link's site ("The Verge" for theverge.com).
+
+    Content suffixes such as " - Price in India" are kept.
+    """
+    match = _TITLE_SUFFIX.search(title)
+    if not match or not domain:
+        return title
+    labels = domain.split(".")
+    names = set(labels[:-1]) | {"".join(labels), "".join(labels[:-1])}
+    return title[:match.start()] if _alnum(match.group(1)) in names else title
+
+
+def to_records(data: Dict[str, Any]) -> List[SearchRecord]:
+    """Project a Serper response (single or merged) onto SearchRecords.
+
+    Knowledge graph, sitelinks, people-also-ask, related searches and
+    positions are dropped; an answer box is kept as the first record.
+    """
+    records: List[SearchRecord] = []
+    box = data.get("answerBox") or {}
+    if box.get("answer") or box.get("snippet"):
+        records.append(SearchRecord(
+            _clean(box.get("title")), _clean(box.get("answer") or box.get("snippet"), SNIPPET_CHARS),
+            _domain(box.get("link")), "", "",
+        ))
+    for item in data.get("organic") or []:
+        source = _domain(item.get("link"))
+        title = _strip_site_suffix(_clean(item.get("title")), source)
+        snippet = _clean(item.get("snippet"), SNIPPET_CHARS)
+        if title or snippet:
+            records.append(SearchRecord(title, snippet, source, _clean(item.get("date")), item.get("query", "")))
+    return records
+
+
+def render_sections(records: List[SearchRecord], token_budget: int = CONTEXT_TOKEN_BUDGET) -> Dict[str, str]:
+    """Dense text of the records per query, within ``token_budget`` overall.
+
+    Records are taken in the given (rank-interleaved) order until the budget
+    is spent, so every query keeps its best hits. Records without a query
+    (answer box) and the omitted-results note go under "".
+    """
+    budget = token_budget * 4
+    picked: List[SearchRecord] = []
+    for record in records:
+        cost = len(record.title) + len(record.snippet) + len(record.source) + len(record.date) + 10
+        if picked and cost > budget:
+            break
+        picked.append(record)
+        budget -= cost
+
+    groups: Dict[str, List[str]] = {}
+    for r in picked:
+        meta = ", ".join(x for x in (r.source, r.date) if x)
+        groups.setdefault(r.query, []).append(f"- {r.title}: {r.snippet}" + (f" ({meta})" if meta else ""))
+    if len(picked) < len(records):
+        groups.setdefault("", []).append(f"({len(records) - len(picked)} more results omitted)")
+
+    return {query: "\n".join(([f"[{query}]"] if query else []) + hits) for query, hits in groups.items()}
+
+
+def render_records(records: List[SearchRecord], token_budget: int = CONTEXT_TOKEN_BUDGET) -> str:
+    """All sections of ``render_sections`` as one block."""
+    sections = render_sections(records, token_budget)
+    return "\n".join(sections[q] for q in sorted(sections, key=lambda q: q == ""))
+
+
+def compact_sections(data: Dict[str, Any], token_budget: int = CONTEXT_TOKEN_BUDGET) -> Dict[str, str]:
+    """Search response -> prompt-ready text per query (field projection + token budget)."""
+    if data.get("error") and not data.get("organic"):
+        return {"": f"(live search unavailable: {data['error']})"}
+    records = to_records(data)
+    return render_sections(records, token_budget) if records else {"": "(no live search results)"}
+
+
+def compact_results(data: Dict[str, Any], token_budget: int = CONTEXT_TOKEN_BUDGET) -> str:
+    """Search response -> one prompt-ready block."""
+    sections = compact_sections(data, token_budget)
+    return "\n".join(sections[q] for q in sorted(sections, key=lambda q: q == ""))
@@ -0,0 +1,15 @@
+from twin.tools.serper_tool import to_records
+
+
+def _title(title, link):
+    return to_records({"organic": [{"title": title, "link": link, "snippet": "s"}]})[0].title
+
+
+def test_site_name_suffix_is_stripped():
+    assert _title("Galaxy S25 review - The Verge", "https://www.theverge.com/x") == "Galaxy S25 review"
+    assert _title("Galaxy S25 specs | GSMArena.com", "https://www.gsmarena.com/x") == "Galaxy S25 specs"
+
+
+def test_content_suffix_is_kept():
+    assert _title("Galaxy S25 - Price in India", "https://www.gadgets360.com/x") == "Galaxy S25 - Price in India"
+    assert _title("Pixel 9 - Specs and Review", "https://www.theverge.com/x") == "Pixel 9 - Specs and Review"
@@ -1,9 +1,16 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Header
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 import os
 
-from new_crew.crew import OrganizationFeedbackCrew
+from new_crew.crew import MODEL_NAME, OrganizationFeedbackCrew, templates
+from prism_common.key_pool import is_daily_limit
+from prism_common.jobs import get_job_registry
+from prism_common.jobs_api import accepted, async_requested, build_jobs_router
+from prism_common.llm_cache import bypass_llm_cache, no_cache_requested
+from prism_common.run_cache import cached_run
+from prism_common.run_context import RunContext
+from prism_common.streaming import stream_run, watch_crew
 
 app = FastAPI(
     title="Organization Feedback Intelligence API",
@@ -11,6 +18,9 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Background runs: "Prefer: respond-async" on /analyze, then poll /jobs/{id}
+app.include_router(build_jobs_router())
+
 # -------------------------
 # Request / Response Models
 # -------------------------
@@ -30,6 +40,8 @@ class FeedbackResponse(BaseModel):
     company_name: str
     tasks: List[TaskOutput]
     final_result: str
+    # Run cache status: miss / fresh / stale (see prism_common.run_cache)
+    cache: Optional[Dict[str, Any]] = None
 
 
 # -------------------------
@@ -44,7 +56,69 @@ def health_check():
 # Main Endpoint
 # -------------------------
 @app.post("/analyze", response_model=FeedbackResponse)
-def analyze_feedback(payload: FeedbackRequest):
+def analyze_feedback(
+    payload: FeedbackRequest,
+    x_groq_api_key: Optional[str] = Header(None, alias="X-Groq-Api-Key"),
+    cache_control: Optional[str] = Header(None, alias="Cache-Control"),
+    prefer: Optional[str] = Header(None, alias="Prefer"),
+):
+    if not payload.company_name.strip():
+        raise HTTPException(status_code=400, detail="company_name cannot be empty")
+
+    context = RunContext(groq_api_key=x_groq_api_key)
+
+    # "Cache-Control: no-cache" skips cached LLM answers (carried into background jobs too)
+    with bypass_llm_cache(no_cache_requested(cache_control)):
+        if async_requested(prefer):
+            return accepted(get_job_registry().submit("analyze", execute_feedback_analysis, payload, context))
+        return execute_feedback_analysis(payload, context)
+
+
+@app.post("/analyze/stream")
+def analyze_feedback_stream(
+    payload: FeedbackRequest,
+    x_groq_api_key: Optional[str] = Header(None, alias="X-Groq-Api-Key"),
+    cache_control: Optional[str] = Header(None, alias="Cache-Control"),
+):
+    """Same run as /analyze, streamed as server-sent events (one per task start/completion)."""
+    if not payload.company_name.strip():
+        raise HTTPException(status_code=400, detail="company_name cannot be empty")
+
+    context = RunContext(groq_api_key=x_groq_api_key)
+    with bypass_llm_cache(no_cache_requested(cache_control)):
+        return stream_run("analyze", execute_feedback_analysis, payload, context)
+
+
+# Partial results (crew errors) start with this mark and are never cached
+PARTIAL_MARK = "⚠️"
+
+
+def execute_feedback_analysis(payload: FeedbackRequest, context: RunContext) -> FeedbackResponse:
+    """Run the feedback crew (or reuse a recent run) and build the /analyze response."""
+    company_name = payload.company_name.strip()
+    if not company_name:
+        raise HTTPException(status_code=400, detail="company_name cannot be empty")
+
+    # Identical requests within the TTL reuse the last run; stale ones refresh in
+    # the background, and an exhausted daily quota serves the last good result
+    try:
+        body = cached_run(
+            "feedback",
+            {"company": company_name, "model": MODEL_NAME},
+            lambda: analyze_feedback_crew(payload, context).model_dump(exclude={"cache"}),
+            version=templates.version,
+            cacheable=lambda body: not body["final_result"].startswith(PARTIAL_MARK),
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        # Only daily-quota errors get here, when no earlier analysis exists
+        raise HTTPException(status_code=429, detail=str(e))
+    return FeedbackResponse(**body)
+
+
+def analyze_feedback_crew(payload: FeedbackRequest, context: RunContext) -> FeedbackResponse:
+    """Run the feedback crew and build the /analyze response (partial results on failure)."""
     task_outputs = []
     result = None
     error_message = None
@@ -56,8 +130,8 @@ def analyze_feedback(payload: FeedbackRequest):
             raise HTTPException(status_code=400, detail="company_name cannot be empty")
 
         # Initialize crew
-        crew_instance = OrganizationFeedbackCrew()
-        crew = crew_instance.crew()
+        crew_instance = OrganizationFeedbackCrew(context=context)
+        crew = watch_crew(crew_instance.crew())
 
         # Execute crew with error handling
         try:
@@ -65,6 +139,9 @@ def analyze_feedback(payload: FeedbackRequest):
                 inputs={"company_name": company_name}
             )
         except Exception as crew_error:
+            # Out of daily quota: the run cache answers with the last good analysis
+            if is_daily_limit(str(crew_error)):
+                raise
             # Crew execution failed, but we can still try to extract completed tasks
             error_message = f"Crew execution encountered an error: {str(crew_error)}"
             # Continue to try extracting task outputs from completed tasks
@@ -206,7 +283,7 @@ def analyze_feedback(payload: FeedbackRequest):
             return FeedbackResponse(
                 company_name=company_name,
                 tasks=task_outputs,
-                final_result=f"⚠️ {error_message}\n\nPartial results from completed tasks:\n{final_result_str}"
+                final_result=f"{PARTIAL_MARK} {error_message}\n\nPartial results from completed tasks:\n{final_result_str}"
             )
 
         return FeedbackResponse(
@@ -219,13 +296,15 @@ def analyze_feedback(payload: FeedbackRequest):
         # Re-raise HTTP exceptions (like validation errors)
         raise
     except Exception as e:
+        if is_daily_limit(str(e)):
+            raise
         import traceback
         # If we have any task outputs, return them with the error
         if task_outputs:
             return FeedbackResponse(
                 company_name=payload.company_name if hasattr(payload, 'company_name') else "Unknown",
                 tasks=task_outputs,
-                final_result=f"⚠️ Error occurred: {str(e)}\n{traceback.format_exc()}"
+                final_result=f"{PARTIAL_MARK} Error occurred: {str(e)}\n{traceback.format_exc()}"
             )
         # Otherwise, raise HTTP exception
         raise HTTPException(
@@ -1,25 +1,38 @@
-from crewai import Agent, Crew, Process, Task, LLM
+from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task
 import os
+from pathlib import Path
+from typing import Optional
 from .tools.serper_tool import SerperSearchTool
+from prism_common.crew_templates import CrewTemplates, use_templates
+from prism_common.llm_cache import cached_llm
+from prism_common.run_context import DEFAULT_CONTEXT, RunContext
 
 MODEL_NAME = os.getenv("CREW_MODEL", "groq/llama-3.1-8b-instant")
 
+# config/*.yaml parsed once per process; ``templates.version`` keys cached runs
+templates = CrewTemplates(Path(__file__).parent / "config")
+
 # Initialize Serper tool
 serper_tool = SerperSearchTool()
 
+@use_templates
 @CrewBase
 class OrganizationFeedbackCrew:
     """Crew to analyze organization feedback using REAL online data via Serper API"""
 
+    def __init__(self, context: Optional[RunContext] = None):
+        # Request key wins over OPENAI_API_KEY; os.environ is never modified
+        self.context = context or DEFAULT_CONTEXT
+
     @agent
     def feedback_collector(self) -> Agent:
         return Agent(
             config=self.agents_config["feedback_collector"],
-            llm=LLM(
+            llm=cached_llm(
                 model="llama-3.1-8b-instant",
                 api_base="https://api.groq.com/openai/v1",
-                api_key=os.getenv("OPENAI_API_KEY"),
+                api_key=self.context.api_key_or_env("OPENAI_API_KEY"),
                 temperature=0.4
             ),
             tools=[serper_tool],
@@ -34,10 +47,10 @@ class OrganizationFeedbackCrew:
     def industry_analyst(self) -> Agent:
         return Agent(
             config=self.agents_config["industry_analyst"],
-            llm=LLM(
+            llm=cached_llm(
                 model="llama-3.1-8b-instant",
                 api_base="https://api.groq.com/openai/v1",
-                api_key=os.getenv("OPENAI_API_KEY"),
+                api_key=self.context.api_key_or_env("OPENAI_API_KEY"),
                 temperature=0.4
             ),
             tools=[serper_tool],
@@ -51,10 +64,10 @@ class OrganizationFeedbackCrew:
     def insight_synthesizer(self) -> Agent:
         return Agent(
             config=self.agents_config["insight_synthesizer"],
-            llm=LLM(
+            llm=cached_llm(
                 model="llama-3.1-8b-instant",
                 api_base="https://api.groq.com/openai/v1",
-                api_key=os.getenv("OPENAI_API_KEY"),
+                api_key=self.context.api_key_or_env("OPENAI_API_KEY"),
                 temperature=0.5
             ),
             tools=[],  # No tools needed for synthesis
@@ -1,7 +1,14 @@
-from typing import List
+import io
+from typing import List, Optional
 from pydantic import BaseModel, Field
 from crewai.tools import BaseTool, EnvVar
 
+from prism_common.dedupe import NearDuplicateFilter
+
+from .theme_engine import ThemeExtractor
+
+EXAMPLE_CHARS = 160
+
 
 class LocalSummarizerInput(BaseModel):
     raw_text: str = Field(..., description="Raw concatenated search snippets")
@@ -12,60 +19,62 @@ class LocalSummarizer(BaseTool):
     name: str = "Local Summarizer"
     description: str = "Create a concise summary and list of themes from raw search snippets without calling an LLM."
     args_schema: type[BaseModel] = LocalSummarizerInput
+    # Theme lexicon (YAML); None uses FEEDBACK_THEME_LEXICON or config/themes.yaml
+    lexicon_path: Optional[str] = None
 
     def _run(self, raw_text: str, max_items: int = 5) -> str:
         if not raw_text or not raw_text.strip():
             return "No text provided to summarize."
 
-        lines = [l.strip() for l in raw_text.splitlines() if l.strip()]
-
-        # Heuristic: collect titles and snippets
+        # One streaming pass: lexicon themes and TF-IDF terms are extracted line by line
+        extractor = ThemeExtractor(self.lexicon_path)
+        # Near-duplicate snippets (syndicated copies) would inflate theme counts
+        seen = NearDuplicateFilter()
         titles: List[str] = []
-        snippets: List[str] = []
-        for line in lines:
-            if line.lower().startswith("title:"):
-                titles.append(line[6:].strip())
-            elif line.lower().startswith("snippet:"):
-                snippets.append(line[8:].strip())
-            elif line.lower().startswith("link:"):
+        samples: List[str] = []
+        for line in io.StringIO(raw_text):
+            line = line.strip()
+            if not line:
+                continue
+            lower = line.lower()
+            if lower.startswith("title:"):
+                text = line[6:].strip()
+                if len(titles) < max_items:
+                    titles.append(text)
+            elif lower.startswith("link:"):
                 # ignore links for now
                 continue
             else:
-                # fallback: treat as snippet
-                snippets.append(line)
-
-        # Simple theme extraction via keyword counts
-        keywords = [
-            "shipping",
-            "refund",
-            "return",
-            "quality",
-            "support",
-            "price",
-            "performance",
-            "sustainability",
-            "design",
-        ]
-        counts = {k: 0 for k in keywords}
-        for s in snippets + titles:
-            sl = s.lower()
-            for k in keywords:
-                if k in sl:
-                    counts[k] += 1
-
-        # Build sorted theme list
-        themes = sorted([(k, v) for k, v in counts.items() if v > 0], key=lambda x: -x[1])
+                # "Snippet:" lines, or any other line treated as a snippet
+                text = line[8:].strip() if lower.startswith("snippet:") else line
+                if not seen.add(text):
+                    continue
+                if len(samples) < max_items:
+                    samples.append(text)
+            extractor.feed(text)
 
         bullets: List[str] = []
         # Add top themes
-        for k, v in themes[:max_items]:
-            bullets.append(f"{k.capitalize()}: mentioned {v} times in snippets")
+        for t in extractor.themes(max_items):
+            example = " ".join(t["example"].split())
+            if len(example) > EXAMPLE_CHARS:
+                example = example[:EXAMPLE_CHARS].rsplit(" ", 1)[0] + "..."
+            bullets.append(
+                f"{t['theme'].capitalize()}: {t['snippets']} of {extractor.docs} snippets "
+                f"({', '.join(t['forms'])}) e.g. \"{example}\""
+            )
 
         # If no themes, add top snippet highlights
         if not bullets:
-            sample_snips = snippets[:max_items]
-            for s in sample_snips:
+            for s in samples:
                 bullets.append(f"- {s}")
 
+        emergent = extractor.emergent_terms(max_items + 3)
+        if emergent:
+            bullets.append("Emergent terms: " + ", ".join(f"{term} ({df})" for term, _, df in emergent))
+
+        if seen.dropped:
+            bullets.append(f"({seen.dropped} near-duplicate snippets skipped)")
+
         summary = "\n".join(bullets)
-        return f"Summary:\n{summary}\n\nExtracted Titles:\n" + "; ".join(titles[:max_items])
+        return f"Summary:\n{summary}\n\nExtracted Titles:\n" + "; ".join(titles)
@@ -3,6 +3,8 @@ import os
 import requests
 from pydantic import BaseModel, Field
 from crewai.tools import BaseTool, EnvVar
+from prism_common.dedupe import dedupe_results
+from prism_common.serper import serper_search
 
 
 class SerperSearchInput(BaseModel):
@@ -67,14 +69,9 @@ class SerperSearchTool(BaseTool):
         if not api_key:
             return "SERPER_API_KEY is not set. Please set the environment variable to use SerperSearchTool."
 
-        headers = {"X-API-KEY": api_key, "Content-Type": "application/json"}
-        endpoint = "https://google.serper.dev/search"
-        payload = {"q": query}
-
         try:
-            resp = requests.post(endpoint, json=payload, headers=headers, timeout=20)
-            resp.raise_for_status()
-            data = resp.json()
+            # Shared search cache + pooled keep-alive client with connect/read deadlines
+            data = serper_search(query, api_key)
         except requests.HTTPError as he:
             code = getattr(he.response, "status_code", "unknown")
             return f"Serper API request failed: {he} (status={code})"
@@ -82,7 +79,8 @@ class SerperSearchTool(BaseTool):
             return f"Serper API request failed: {e}"
 
         snippets: List[str] = []
-        organic = data.get("organic") or data.get("results") or []
+        # Syndicated copies of one story would only repeat themselves in the prompt
+        organic = dedupe_results(data.get("organic") or data.get("results") or [])
 
         for item in organic[: max(1, num_results)]:
             title = item.get("title") or item.get("title_raw") or ""
@@ -0,0 +1,208 @@
+"""
+THEME ENGINE
+
+Single-pass theme extraction for search snippets, used by LocalSummarizer.
+
+- The theme lexicon (config/themes.yaml, or FEEDBACK_THEME_LEXICON) lists
+  synonyms and phrases per theme. It is compiled once into an Aho-Corasick
+  automaton over words, so every snippet is scanned once for all patterns,
+  however large the lexicon.
+- Words are lower-cased and lose their plural ending, on both sides of the
+  match ("refunds" hits "refund", "crashes" hits "crash").
+- Alongside the lexicon, unigrams and bigrams are counted for TF-IDF
+  (summed tf × log(1 + N / df)). Terms seen in at least two snippets and not
+  already in the lexicon are reported as emergent terms.
+- Input is fed line by line (``feed``), so memory depends on the vocabulary,
+  not on the input size. The term table is pruned of single-snippet terms
+  once it passes MAX_TERMS.
+"""
+
+import math
+import os
+import re
+from collections import Counter, defaultdict, deque
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import yaml
+
+LEXICON_ENV = "FEEDBACK_THEME_LEXICON"
+DEFAULT_LEXICON_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "config", "themes.yaml")
+
+MAX_TERMS = 50000
+MIN_EMERGENT_DF = 2
+
+_WORD = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+STOPWORDS = frozenset("""
+a about after all also am an and any are as at be been before being but by can could did do does
+for from get got had has have he her here his how i if in into is it its just like many may me
+more most my new no not now of on one only or our out over said she so some than that the their
+them then there these they this those to too up us very was we were what when which who why will
+with would you your com www http https html read review reviews customer customers company
+jan feb mar apr jun jul aug sep sept oct nov dec ago day days year years
+""".split())
+
+
+@lru_cache(maxsize=65536)
+def normalize(word: str) -> str:
+    """Lower-case word with its plural ending removed."""
+    if len(word) <= 3 or not word.endswith("s") or word.endswith(("ss", "us", "is")):
+        return word
+    if word.endswith("ies") and len(word) > 4:
+        return word[:-3] + "y"
+    if word.endswith(("ches", "shes", "sses", "xes")):
+        return word[:-2]
+    return word[:-1]
+
+
+def words(text: str) -> List[str]:
+    return [normalize(w) for w in _WORD.findall(text.lower())]
+
+
+# ============================================================
+# MULTI-PATTERN MATCHER
+# ============================================================
+
+class AhoCorasick:
+    """Aho-Corasick automaton over word sequences.
+
+    ``iter_matches(tokens)`` yields ``(start, end, value)`` for every pattern
+    occurrence in one left-to-right pass.
+    """
+
+    def __init__(self, patterns: Iterable[Tuple[Sequence[str], Any]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, Any]]] = [[]]
+
+        for pattern, value in patterns:
+            if not pattern:
+                continue
+            state = 0
+            for word in pattern:
+                nxt = self._goto[state].get(word)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][word] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = nxt
+            if (len(pattern), value) not in self._out[state]:
+                self._out[state].append((len(pattern), value))
+
+        # Breadth-first failure links; outputs of the fallback state are inherited
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for word, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and word not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(word, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def __len__(self) -> int:
+        return len(self._goto)
+
+    def iter_matches(self, tokens: Sequence[str]) -> Iterator[Tuple[int, int, Any]]:
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for i, word in enumerate(tokens):
+            while state and word not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(word, 0)
+            for length, value in out[state]:
+                yield i - length + 1, i + 1, value
+
+
+def load_theme_lexicon(path: Optional[str] = None) -> Dict[str, List[str]]:
+    path = path or os.getenv(LEXICON_ENV) or DEFAULT_LEXICON_PATH
+    with open(path) as f:
+        return {str(theme): [str(s) for s in synonyms] for theme, synonyms in (yaml.safe_load(f) or {}).items()}
+
+
+@lru_cache(maxsize=8)
+def compile_themes(path: Optional[str] = None) -> Tuple[AhoCorasick, frozenset]:
+    """Automaton over all synonyms (value = theme) plus the lexicon's own terms."""
+    lexicon = load_theme_lexicon(path)
+    patterns = [(tuple(words(s)), theme) for theme, synonyms in lexicon.items() for s in synonyms]
+    known = frozenset(" ".join(p) for p, _ in patterns) | frozenset(w for p, _ in patterns for w in p)
+    return AhoCorasick(patterns), known
+
+
+# ============================================================
+# STREAMING EXTRACTOR
+# ============================================================
+
+class ThemeExtractor:
+    """Feed snippets one at a time; read themes and emergent terms at any point."""
+
+    def __init__(self, lexicon_path: Optional[str] = None, max_terms: int = MAX_TERMS):
+        self.matcher, self.known = compile_themes(lexicon_path)
+        self.max_terms = max_terms
+        self.docs = 0
+        self.theme_docs: Counter = Counter()
+        self.theme_forms: Dict[str, Counter] = defaultdict(Counter)
+        self.examples: Dict[str, str] = {}
+        self.tf: Counter = Counter()
+        self.df: Counter = Counter()
+
+    def feed(self, text: str) -> None:
+        tokens = words(text)
+        if not tokens:
+            return
+        self.docs += 1
+
+        themes = set()
+        for start, end, theme in self.matcher.iter_matches(tokens):
+            themes.add(theme)
+            self.theme_forms[theme][" ".join(tokens[start:end])] += 1
+        for theme in themes:
+            self.theme_docs[theme] += 1
+            if theme not in self.examples or len(text) < len(self.examples[theme]):
+                self.examples[theme] = text
+
+        content = [t for t in tokens if len(t) > 2 and t not in STOPWORDS and not t.isdigit()]
+        terms = Counter(content)
+        terms.update(f"{a} {b}" for a, b in zip(content, content[1:]))
+        self.tf.update(terms)
+        self.df.update(terms.keys())
+        if len(self.df) > self.max_terms:
+            self.df = Counter({t: df for t, df in self.df.items() if df >= MIN_EMERGENT_DF})
+            self.tf = Counter({t: self.tf[t] for t in self.df})
+            # Mostly repeated terms left: raise the cap instead of pruning on every snippet
+            self.max_terms = max(self.max_terms, 2 * len(self.df))
+
+    def feed_many(self, texts: Iterable[str]) -> "ThemeExtractor":
+        for text in texts:
+            self.feed(text)
+        return self
+
+    def themes(self, top: int = 5) -> List[Dict[str, Any]]:
+        return [
+            {
+                "theme": theme,
+                "snippets": count,
+                "forms": [form for form, _ in self.theme_forms[theme].most_common(3)],
+                "example": self.examples[theme],
+            }
+            for theme, count in self.theme_docs.most_common(top)
+        ]
+
+    def emergent_terms(self, top: int = 8) -> List[Tuple[str, float, int]]:
+        """(term, tf-idf, snippets) for frequent terms outside the lexicon."""
+        scored = [
+            (term, self.tf[term] * math.log(1 + self.docs / df), df)
+            for term, df in self.df.items()
+            if df >= MIN_EMERGENT_DF and term not in self.known
+        ]
+        scored.sort(key=lambda x: -x[1])
+        # A word that only ever shows up inside one of the bigrams adds nothing
+        bigram_df: Dict[str, int] = {}
+        for term, _, df in scored:
+            for word in term.split() if " " in term else ():
+                bigram_df[word] = max(bigram_df.get(word, 0), df)
+        return [s for s in scored if bigram_df.get(s[0], 0) < s[2]][:top]
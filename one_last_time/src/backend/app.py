@@ -1,9 +1,18 @@
+import hashlib
+from datetime import datetime
 from fastapi import FastAPI, HTTPException, Header
 from fastapi.middleware.cors import CORSMiddleware
-from backend.schemas import WarSimulationRequest
-from war_simulation_agent.orchestrator import get_orchestrator
+from backend.schemas import WarSimulationRequest, WarSweepRequest
+from war_simulation_agent.orchestrator import get_orchestrator, load_company_context, templates
+from war_simulation_agent.retry_utils import DailyRateLimitError
+from war_simulation_agent.sweep import run_sweep
+from prism_common.jobs import get_job_registry
+from prism_common.jobs_api import accepted, async_requested, build_jobs_router
+from prism_common.llm_cache import bypass_llm_cache, no_cache_requested
+from prism_common.run_cache import cached_run
+from prism_common.run_context import RunContext
+from prism_common.streaming import stream_run
 import uvicorn
-import os
 
 app = FastAPI(
     title="Samsung War Simulation API",
@@ -20,8 +29,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Background runs: "Prefer: respond-async" on /simulate, then poll /jobs/{id}
+app.include_router(build_jobs_router())
+
+
 @app.post("/simulate")
-def run_war_simulation(payload: WarSimulationRequest, x_groq_api_key: str | None = Header(None, alias="X-Groq-Api-Key")):
+def run_war_simulation(
+    payload: WarSimulationRequest,
+    x_groq_api_key: str | None = Header(None, alias="X-Groq-Api-Key"),
+    cache_control: str | None = Header(None, alias="Cache-Control"),
+    prefer: str | None = Header(None, alias="Prefer"),
+):
     # Validate required fields
     if not payload.our_company or not payload.competitors:
         raise HTTPException(status_code=400, detail="our_company and competitors are required")
@@ -32,55 +50,131 @@ def run_war_simulation(payload: WarSimulationRequest, x_groq_api_key: str | None
         # Add a soft warning in the returned payload later via the response body (not an error)
         warning_note = f"Only {len(payload.competitors)} competitor(s) provided. Proceeding with available competitors."
 
-    old_key = os.environ.get("GROQ_API_KEY")
-    try:
-        if x_groq_api_key:
-            os.environ["GROQ_API_KEY"] = x_groq_api_key
+    # Request-scoped credentials: safe under concurrent requests
+    context = RunContext(groq_api_key=x_groq_api_key)
+
+    # "Cache-Control: no-cache" skips cached LLM answers (carried into background jobs too)
+    with bypass_llm_cache(no_cache_requested(cache_control)):
+        if async_requested(prefer):
+            return accepted(get_job_registry().submit("simulate", execute_simulation, payload, context))
+        return execute_simulation(payload, context)
+
+
+@app.post("/simulate/stream")
+def stream_war_simulation(
+    payload: WarSimulationRequest,
+    x_groq_api_key: str | None = Header(None, alias="X-Groq-Api-Key"),
+    cache_control: str | None = Header(None, alias="Cache-Control"),
+):
+    """Same run as /simulate, streamed as server-sent events (one per task start/completion)."""
+    if not payload.our_company or not payload.competitors:
+        raise HTTPException(status_code=400, detail="our_company and competitors are required")
+
+    context = RunContext(groq_api_key=x_groq_api_key)
+    with bypass_llm_cache(no_cache_requested(cache_control)):
+        return stream_run("simulate", execute_simulation, payload, context)
+
+
+@app.post("/simulate/sweep")
+def run_war_simulation_sweep(
+    payload: WarSweepRequest,
+    x_groq_api_key: str | None = Header(None, alias="X-Groq-Api-Key"),
+    cache_control: str | None = Header(None, alias="Cache-Control"),
+    prefer: str | None = Header(None, alias="Prefer"),
+):
+    """Run every price cut × market segment scenario and return one comparison table.
+
+    Large grids take a while: send "Prefer: respond-async" and poll /jobs/{id}.
+    """
+    if not payload.our_company or not payload.competitors:
+        raise HTTPException(status_code=400, detail="our_company and competitors are required")
+    if not payload.price_cuts or not payload.market_segments:
+        raise HTTPException(status_code=400, detail="price_cuts and market_segments must not be empty")
 
-        orchestrator = get_orchestrator(verbose=False)
+    context = RunContext(groq_api_key=x_groq_api_key)
+    with bypass_llm_cache(no_cache_requested(cache_control)):
+        if async_requested(prefer):
+            return accepted(get_job_registry().submit("sweep", execute_sweep, payload, context))
+        return execute_sweep(payload, context)
 
+
+def execute_sweep(payload: WarSweepRequest, context: RunContext):
+    """Run one scenario sweep and build the /simulate/sweep response body."""
+    return run_sweep(
+        company=payload.our_company.strip(),
+        competitors=payload.competitors,
+        price_cuts=payload.price_cuts,
+        market_segments=payload.market_segments,
+        context=context,
+    )
+
+
+def execute_simulation(payload: WarSimulationRequest, context: RunContext):
+    """Run one simulation (or reuse a recent one) and build the /simulate response body."""
+    try:
         # Auto-fill competitive_scenario using our_company
         competitive_scenario = f"{payload.our_company}'s competitor analysis"
+        company_context = load_company_context(payload.our_company.strip())
 
-        result = orchestrator.run(
-            competitive_scenario=competitive_scenario,
-            competitors=payload.competitors,
-            market_segment=payload.market_segment,
-            company=payload.our_company
+        # Identical requests within the TTL reuse the last run; stale ones refresh in
+        # the background, and an exhausted daily quota serves the last good result
+        return cached_run(
+            "war_simulation",
+            {
+                "company": payload.our_company,
+                "competitors": payload.competitors,
+                "market_segment": payload.market_segment,
+                "scenario": competitive_scenario,
+                "company_context": hashlib.sha256(company_context.encode("utf-8")).hexdigest()[:12],
+            },
+            lambda: simulate(payload, competitive_scenario, company_context, context),
+            version=templates.version,
+            fallback_errors=(DailyRateLimitError,),
         )
 
-        # ✅ NEW: Extract text strings from CrewOutput object
-        # Get the final summary (last agent's output)
-        final_output = str(result.raw) if hasattr(result, 'raw') else str(result)
-        
-        # Extract individual agent outputs
-        agent_outputs = {}
-        if hasattr(result, 'tasks_output') and result.tasks_output:
-            for task in result.tasks_output:
-                # Get agent name (role) and their output
-                agent_name = task.agent if isinstance(task.agent, str) else str(task.agent)
-                agent_output = str(task.raw) if hasattr(task, 'raw') else str(task.output)
-                agent_outputs[agent_name] = agent_output
-
-        # Return structured response matching comp_analysis format
-        return {
-            "status": "success",
-            "execution_time": str(orchestrator.execution_time),
-            "final_output": final_output,        # ✅ Extracted text string
-            "agent_outputs": agent_outputs       # ✅ Dictionary of agent outputs
-        }
-
     except Exception as e:
         msg = str(e)
         if "Invalid API key" in msg or "Invalid API Key" in msg or "invalid_api_key" in msg:
             raise HTTPException(status_code=401, detail="Invalid Groq API key provided")
         raise HTTPException(status_code=500, detail=msg)
-    finally:
-        # Restore previous env var
-        if old_key is None:
-            os.environ.pop("GROQ_API_KEY", None)
-        else:
-            os.environ["GROQ_API_KEY"] = old_key
+
+
+def simulate(payload: WarSimulationRequest, competitive_scenario: str, company_context: str, context: RunContext):
+    """Run the orchestrator and flatten its CrewOutput into the response body."""
+    orchestrator = get_orchestrator(verbose=False)
+
+    # Timed here, per run: the orchestrator singleton keeps no per-run state
+    start_time = datetime.now()
+    result = orchestrator.run(
+        competitive_scenario=competitive_scenario,
+        competitors=payload.competitors,
+        market_segment=payload.market_segment,
+        company=payload.our_company,
+        company_context=company_context,
+        context=context,
+    )
+    execution_time = datetime.now() - start_time
+
+    # ✅ NEW: Extract text strings from CrewOutput object
+    # Get the final summary (last agent's output)
+    final_output = str(result.raw) if hasattr(result, 'raw') else str(result)
+
+    # Extract individual agent outputs
+    agent_outputs = {}
+    if hasattr(result, 'tasks_output') and result.tasks_output:
+        for task in result.tasks_output:
+            # Get agent name (role) and their output
+            agent_name = task.agent if isinstance(task.agent, str) else str(task.agent)
+            agent_output = str(task.raw) if hasattr(task, 'raw') else str(task.output)
+            agent_outputs[agent_name] = agent_output
+
+    # Return structured response matching comp_analysis format
+    return {
+        "status": "success",
+        "execution_time": str(execution_time),
+        "final_output": final_output,        # ✅ Extracted text string
+        "agent_outputs": agent_outputs       # ✅ Dictionary of agent outputs
+    }
 # ✅ FIX PORT IN CODE
 if __name__ == "__main__":
     uvicorn.run(
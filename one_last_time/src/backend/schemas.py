@@ -5,3 +5,10 @@ class WarSimulationRequest(BaseModel):
     our_company: str
     competitors: List[str]
     market_segment: Optional[str] = "india"
+
+
+class WarSweepRequest(BaseModel):
+    our_company: str
+    competitors: List[str]
+    price_cuts: List[float] = [3, 5, 8, 12]
+    market_segments: List[str] = ["india"]
@@ -2,10 +2,18 @@
 API Key Manager for Multi-Key Support
 
 Allows different crews to use different Groq API keys.
+
+Keys are resolved here and passed to the crew through a RunContext
+(prism_common.run_context); os.environ is never modified.
+
+Every configured key (GROQ_API_KEY, GROQ_API_KEY_<NAME>, GROQ_API_KEYS)
+forms one pool (prism_common.key_pool): agents are spread across it and a
+key that hits its daily limit is swapped out mid-run instead of failing.
 """
 import os
-from contextlib import contextmanager
-from typing import Optional
+from typing import Dict, Iterable, Optional
+
+from prism_common.key_pool import get_key_pool
 
 
 def get_api_key_for_crew(crew_name: str = "DEFAULT") -> Optional[str]:
@@ -26,32 +34,19 @@ def get_api_key_for_crew(crew_name: str = "DEFAULT") -> Optional[str]:
     return os.environ.get("GROQ_API_KEY")
 
 
-@contextmanager
-def set_groq_api_key(api_key: Optional[str]):
+def assign_api_keys(agent_names: Iterable[str]) -> Dict[str, str]:
     """
-    Context manager to temporarily set GROQ_API_KEY environment variable.
-    
-    Usage:
-        with set_groq_api_key("your-key"):
-            # Code that uses GROQ_API_KEY
-            pass
-    """
-    old_key = os.environ.get("GROQ_API_KEY")
-    old_model = os.environ.get("MODEL")
-    
-    try:
-        if api_key:
-            os.environ["GROQ_API_KEY"] = api_key
-        yield
-    finally:
-        # Restore original values
-        if old_key is not None:
-            os.environ["GROQ_API_KEY"] = old_key
-        elif "GROQ_API_KEY" in os.environ:
-            del os.environ["GROQ_API_KEY"]
-        
-        if old_model is not None:
-            os.environ["MODEL"] = old_model
-        elif "MODEL" in os.environ:
-            del os.environ["MODEL"]
+    Give each agent its own key where possible.
 
+    Priority per agent:
+    1. Agent-specific env var (GROQ_API_KEY_GAME_THEORY_AGENT, ...)
+    2. Round-robin over the healthy keys in the pool
+    """
+    agent_names = list(agent_names)
+    explicit = {
+        name: os.environ[f"GROQ_API_KEY_{name.upper()}"]
+        for name in agent_names
+        if os.environ.get(f"GROQ_API_KEY_{name.upper()}")
+    }
+    pooled = get_key_pool().assign([name for name in agent_names if name not in explicit])
+    return {**pooled, **explicit}
@@ -7,7 +7,7 @@ This file is the ONLY file that CrewAI executes when you run:
 It runs the Unified War Simulation Crew
 """
 
-from war_simulation_agent.orchestrator import get_orchestrator
+from war_simulation_agent.orchestrator import get_orchestrator, price_cut_scenario
 
 
 def crew():
@@ -41,10 +41,7 @@ def crew():
     if len(competitors) != 3:
         raise RuntimeError("WARSIM_COMPETITORS must contain exactly 3 competitor names, comma-separated.")
 
-    competitive_scenario = (
-        "A key competitor announces an 8% price cut in the market. "
-        f"Simulate {company}'s optimal competitive response across pricing, product strategy, and go-to-market execution."
-    )
+    competitive_scenario = price_cut_scenario(company)
 
     return orchestrator.run(
         competitive_scenario=competitive_scenario,
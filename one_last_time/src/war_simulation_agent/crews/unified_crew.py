@@ -6,12 +6,23 @@ Agents:
 - Game Theory Agent: Simulates moves & counter-moves
 - Market Impact Agent: Revenue, churn, adoption
 - Risk Analyzer: Finds worst-case scenarios
+
+Fan-out mode (``competitor_crew`` + ``merge_crew``): the game-theory and
+market-impact tasks run once per competitor, each pass in its own crew with
+its own agent instances, and one risk pass merges all of them. Prompts stay
+the size of a single competitor however many are simulated.
 """
 
 from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task
 from crewai.agents.agent_builder.base_agent import BaseAgent
-from typing import List
+from typing import Dict, List, Optional
+
+from prism_common.llm_cache import cached_llm
+from war_simulation_agent.tools.equilibrium_solver import EquilibriumSolverTool
+from war_simulation_agent.tools.market_impact_simulator import MarketImpactSimulatorTool
+from war_simulation_agent.tools.stress_test import StressTestTool
+from prism_common.run_context import DEFAULT_CONTEXT, RunContext
 
 
 @CrewBase
@@ -24,30 +35,56 @@ class UnifiedWarSimulationCrew:
     agents: List[BaseAgent]
     tasks: List[Task]
 
+    AGENT_NAMES = ('game_theory_agent', 'market_impact_agent', 'risk_analyzer')
+
+    # Local compute tools per agent: the numbers come from NumPy, the LLM interprets them
+    AGENT_TOOLS = {
+        'game_theory_agent': (EquilibriumSolverTool,),
+        'market_impact_agent': (MarketImpactSimulatorTool,),
+        'risk_analyzer': (StressTestTool,),
+    }
+
+    def __init__(self, context: Optional[RunContext] = None, agent_api_keys: Optional[Dict[str, str]] = None):
+        # Per-run credentials/model; never read from or written to os.environ here
+        self.context = context or DEFAULT_CONTEXT
+        # Server-side key per agent (ignored when the request brought its own key)
+        self.agent_api_keys = agent_api_keys or {}
+
+    def _llm(self, agent_name: str):
+        """Build the agent's LLM from its YAML settings, with response caching"""
+        cfg = self.agents_config[agent_name]  # type: ignore[index]
+        return cached_llm(
+            model=self.context.model_or(cfg['llm']),
+            api_key=self.context.groq_api_key or self.agent_api_keys.get(agent_name) or self.context.api_key_or_env(),
+            temperature=cfg.get('temperature'),
+            max_tokens=cfg.get('max_tokens'),
+            top_p=cfg.get('top_p'),
+        )
+
+    def _new_agent(self, agent_name: str) -> Agent:
+        """A fresh agent instance (concurrent passes must not share one)"""
+        return Agent(
+            config=self.agents_config[agent_name],  # type: ignore[index]
+            llm=self._llm(agent_name),
+            tools=[tool() for tool in self.AGENT_TOOLS.get(agent_name, ())],
+            verbose=True
+        )
+
     # War Simulation Agents
     @agent
     def game_theory_agent(self) -> Agent:
         """Simulates competitive moves and counter-moves using game theory"""
-        return Agent(
-            config=self.agents_config['game_theory_agent'],  # type: ignore[index]
-            verbose=True
-        )
+        return self._new_agent('game_theory_agent')
 
     @agent
     def market_impact_agent(self) -> Agent:
         """Analyzes market impact: revenue, churn, adoption metrics"""
-        return Agent(
-            config=self.agents_config['market_impact_agent'],  # type: ignore[index]
-            verbose=True
-        )
+        return self._new_agent('market_impact_agent')
 
     @agent
     def risk_analyzer(self) -> Agent:
         """Identifies worst-case scenarios and risk mitigation strategies"""
-        return Agent(
-            config=self.agents_config['risk_analyzer'],  # type: ignore[index]
-            verbose=True
-        )
+        return self._new_agent('risk_analyzer')
 
     # War Simulation Tasks
     @task
@@ -81,3 +118,39 @@ class UnifiedWarSimulationCrew:
             verbose=True,
         )
 
+
+    # Fan-out mode
+    def _scoped_task(self, task_name: str, scope_name: str, agent: Agent, **kwargs) -> Task:
+        """The YAML task with a scope note appended, bound to ``agent``"""
+        cfg = self.tasks_config[task_name]  # type: ignore[index]
+        scope = self.tasks_config[scope_name]['description']  # type: ignore[index]
+        return Task(
+            config=cfg,
+            description=f"{cfg['description']}\n{scope}",
+            agent=agent,
+            **kwargs,
+        )
+
+    def competitor_crew(self) -> Crew:
+        """Game-theory + market-impact pass for one competitor (input: ``competitor``)"""
+        game_theory = self._new_agent('game_theory_agent')
+        market_impact = self._new_agent('market_impact_agent')
+        return Crew(
+            agents=[game_theory, market_impact],
+            tasks=[
+                self._scoped_task('simulate_competitive_moves', 'competitor_pass', game_theory),
+                self._scoped_task('analyze_market_impact', 'competitor_pass', market_impact),
+            ],
+            process=Process.sequential,
+            verbose=True,
+        )
+
+    def merge_crew(self, pass_tasks: List[Task]) -> Crew:
+        """One risk pass over every competitor pass (their tasks are its context)"""
+        risk = self._new_agent('risk_analyzer')
+        return Crew(
+            agents=[risk],
+            tasks=[self._scoped_task('risk_assessment', 'merge_pass', risk, context=pass_tasks)],
+            process=Process.sequential,
+            verbose=True,
+        )
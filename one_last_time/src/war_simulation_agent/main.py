@@ -12,7 +12,7 @@ if sys.platform == "win32":
     except (AttributeError, ValueError):
         pass
 
-from war_simulation_agent.orchestrator import get_orchestrator
+from war_simulation_agent.orchestrator import get_orchestrator, price_cut_scenario
 
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 
@@ -51,10 +51,7 @@ def run():
         raw = input("Enter 3 competitors: ").strip()
         competitors = [c.strip() for c in raw.split(",") if c.strip()]
 
-    competitive_scenario = (
-        f"A key competitor announces an 8% price cut in the market. Simulate {company}'s optimal response "
-        "across pricing, product strategy, and go-to-market execution."
-    )
+    competitive_scenario = price_cut_scenario(company)
 
     orchestrator = get_orchestrator(verbose=True)
 
@@ -1,10 +1,25 @@
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 from pathlib import Path
+import concurrent.futures
+import contextvars
+
+from crewai.crews.crew_output import CrewOutput
+from crewai.tasks.task_output import TaskOutput
 
 from war_simulation_agent.crews.unified_crew import UnifiedWarSimulationCrew
 from war_simulation_agent.retry_utils import run_with_rate_limit_retry, DailyRateLimitError
-from war_simulation_agent.api_key_manager import set_groq_api_key, get_api_key_for_crew
+from war_simulation_agent.api_key_manager import assign_api_keys, get_api_key_for_crew
+from prism_common.checkpoints import checkpoint_crew, get_checkpoint_store
+from prism_common.crew_templates import CrewTemplates
+from prism_common.dag import parallel_enabled
+from prism_common.llm_cache import cache_bypassed
+from prism_common.run_context import DEFAULT_CONTEXT, RunContext
+from prism_common.streaming import watch_crew
+
+
+# Agent/task YAML of the unified crew (``templates.version`` keys cached runs)
+templates = CrewTemplates(Path(__file__).resolve().parent / "config")
 
 
 # ==========================================================
@@ -28,6 +43,33 @@ def load_company_context(company: str) -> str:
     return ""
 
 
+def price_cut_scenario(company: str, price_cut: float = 8) -> str:
+    """The standard scenario: a key competitor cuts prices by ``price_cut`` percent."""
+    return (
+        f"A key competitor announces a price cut of {price_cut:g}% in the market. "
+        f"Simulate {company}'s optimal competitive response across pricing, product strategy, and go-to-market execution."
+    )
+
+
+# ==========================================================
+# FAN-OUT RESULT MERGING
+# ==========================================================
+# Fan-out runs from this many competitors up (PRISM_PARALLEL_TASKS=0 turns it off)
+FAN_OUT_MIN_COMPETITORS = 2
+
+
+def _combine_pass_outputs(competitors: List[str], outputs: List[TaskOutput]) -> TaskOutput:
+    """One agent's per-competitor answers as a single task output, one section each."""
+    first = outputs[0]
+    return TaskOutput(
+        description=first.description,
+        name=first.name,
+        expected_output=first.expected_output,
+        agent=first.agent,
+        raw="\n\n".join(f"## {competitor}\n{output.raw}" for competitor, output in zip(competitors, outputs)),
+    )
+
+
 # ==========================================================
 # CREW ORCHESTRATOR
 # ==========================================================
@@ -38,9 +80,9 @@ class CrewOrchestrator:
     """
 
     def __init__(self, verbose: bool = True):
+        # Stateless across runs: the orchestrator is a process-wide singleton,
+        # so per-run results and timings are returned, never stored on self
         self.verbose = verbose
-        self.results: Dict[str, Any] = {}
-        self.execution_time: Dict[str, Any] = {}
 
     def run(
         self,
@@ -49,9 +91,30 @@ class CrewOrchestrator:
         market_segment: Optional[str] = None,
         company: Optional[str] = None,
         company_context: Optional[str] = None,
+        context: Optional[RunContext] = None,
+        fan_out: Optional[bool] = None,
+        crew: Optional[UnifiedWarSimulationCrew] = None,
     ) -> Dict[str, Any]:
         """
         Run the unified war simulation crew
+
+        ``context`` carries the caller's Groq key/model; when it has no key
+        each agent gets its own key from the host's key pool, falling back
+        to the crew default (GROQ_API_KEY_<CREW> / GROQ_API_KEY).
+
+        ``fan_out`` runs one game-theory + market-impact pass per competitor
+        concurrently, then one merge + risk pass. Default: on for
+        FAN_OUT_MIN_COMPETITORS or more competitors unless
+        PRISM_PARALLEL_TASKS=0. The result has the same shape either way.
+
+        ``crew`` is a crew built by the caller, e.g. a scenario sweep that
+        resolves keys once for all of its cells.
+
+        Every finished task is checkpointed under this run's inputs
+        (``prism_common.checkpoints``): a rate-limit retry, or the same run
+        started again after a DailyRateLimitError or a restart, resumes at
+        the first unfinished task. Checkpoints are dropped once the run
+        succeeds.
         """
 
         company = (company or "Company").strip()
@@ -76,24 +139,34 @@ class CrewOrchestrator:
             "market_segment": market_segment or "india",
         }
 
-        crew = UnifiedWarSimulationCrew()
-        
-        # Use API key (default GROQ_API_KEY)
-        api_key = get_api_key_for_crew()
+        crew = crew or self.build_crew(context)
+
+        if fan_out is None:
+            fan_out = parallel_enabled() and len(competitors) >= FAN_OUT_MIN_COMPETITORS
+
+        # Fan-out and sequential runs checkpoint different task layouts
+        checkpoints = get_checkpoint_store()
+        run_id = checkpoints.run_id(
+            "war_simulation_fan_out" if fan_out else "war_simulation", inputs, version=templates.version
+        )
+        if cache_bypassed():
+            # "Cache-Control: no-cache" asks for fresh answers, not resumed ones
+            checkpoints.clear(run_id)
 
         try:
-            with set_groq_api_key(api_key):
+            if fan_out:
+                result = self._run_fan_out(crew, inputs, competitors, run_id)
+            else:
+                # Each retry resumes at the first task without a checkpoint
                 result = run_with_rate_limit_retry(
-                    lambda: crew.crew().kickoff(inputs=inputs),
+                    lambda: checkpoint_crew(watch_crew(crew.crew()), run_id).kickoff(inputs=inputs),
                     max_retries=10,
                     base_wait=15.0,
                 )
-
-            self.execution_time = datetime.now() - start_time
-            self.results = result
+            checkpoints.clear(run_id)
 
             if self.verbose:
-                print(f"[OK] War Simulation completed in {self.execution_time}")
+                print(f"[OK] War Simulation completed in {datetime.now() - start_time}")
 
             return result
         except DailyRateLimitError as e:
@@ -102,6 +175,53 @@ class CrewOrchestrator:
             raise
 
 
+    def build_crew(self, context: Optional[RunContext] = None) -> UnifiedWarSimulationCrew:
+        """Resolve keys once and hand them to the crew (no os.environ swapping)"""
+        context = context or DEFAULT_CONTEXT
+        agent_api_keys = {} if context.groq_api_key else assign_api_keys(UnifiedWarSimulationCrew.AGENT_NAMES)
+        if not agent_api_keys:
+            context = context.with_overrides(groq_api_key=context.groq_api_key or get_api_key_for_crew())
+        return UnifiedWarSimulationCrew(context=context, agent_api_keys=agent_api_keys)
+
+    def _run_fan_out(self, crew: UnifiedWarSimulationCrew, inputs: Dict[str, Any], competitors: List[str], run_id: str) -> CrewOutput:
+        """Per-competitor passes at once, then one merge + risk pass over all of them"""
+
+        def run_pass(competitor: str):
+            # Checkpointed per competitor, so a failed pass never repeats the others
+            pass_crew = checkpoint_crew(watch_crew(crew.competitor_crew(), scope=competitor), run_id, scope=competitor)
+            output = run_with_rate_limit_retry(
+                lambda: pass_crew.kickoff(inputs={**inputs, "competitor": competitor}),
+                max_retries=10,
+                base_wait=15.0,
+            )
+            return pass_crew.tasks, output
+
+        # Each worker gets a copy of the caller's context (cache bypass, job cancellation)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(competitors)) as executor:
+            futures = [executor.submit(contextvars.copy_context().run, run_pass, c) for c in competitors]
+            passes = [future.result() for future in futures]
+
+        merge_crew = checkpoint_crew(watch_crew(crew.merge_crew([task for tasks, _ in passes for task in tasks])), run_id, scope="merge")
+        merged = run_with_rate_limit_retry(
+            lambda: merge_crew.kickoff(inputs=inputs),
+            max_retries=10,
+            base_wait=15.0,
+        )
+
+        # Same shape as the sequential crew: one output per agent, risk last
+        pass_outputs = [output.tasks_output for _, output in passes]
+        tasks_output = [
+            _combine_pass_outputs(competitors, [outputs[i] for outputs in pass_outputs])
+            for i in range(len(pass_outputs[0]))
+        ] + list(merged.tasks_output)
+
+        token_usage = merged.token_usage
+        for _, output in passes:
+            token_usage.add_usage_metrics(output.token_usage)
+
+        return CrewOutput(raw=merged.raw, tasks_output=tasks_output, token_usage=token_usage)
+
+
 # ==========================================================
 # SINGLETON ACCESSOR
 # ==========================================================
@@ -0,0 +1,170 @@
+"""
+SCENARIO SWEEP ENGINE
+
+Runs the war simulation over a grid of scenarios — price cuts × market
+segments — and returns one comparative table.
+
+- Cells run concurrently (WARSIM_SWEEP_WORKERS at a time, default 4); every
+  LLM call still waits on the shared RPM/TPM limiter, so the sweep spends the
+  same budget as running the cells one by one, just without idle gaps.
+- Inputs shared by every cell are prepared once: the company context file
+  and the agents' key assignment. Each cell gets its own crew instance
+  (crew tasks hold per-run state and cannot be shared between cells).
+- A failed cell is reported in its row; the other cells still finish.
+
+CLI:
+    python -m war_simulation_agent.sweep --company Samsung \\
+        --competitors Apple,Xiaomi,OnePlus --price-cuts 3,5,8,12 --segments india,urban
+"""
+
+import argparse
+import concurrent.futures
+import contextvars
+import os
+import re
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from itertools import product
+from typing import Any, Dict, List, Optional
+
+from war_simulation_agent.crews.unified_crew import UnifiedWarSimulationCrew
+from war_simulation_agent.orchestrator import get_orchestrator, load_company_context, price_cut_scenario
+from prism_common.jobs import JobCancelled
+from prism_common.run_context import RunContext
+
+DEFAULT_WORKERS = int(os.getenv("WARSIM_SWEEP_WORKERS", "4"))
+
+_RISK_LEVEL = re.compile(r"risk level\W*(high|medium|low)", re.IGNORECASE)
+
+
+@dataclass
+class SweepCell:
+    """One scenario of the grid and its outcome."""
+    price_cut: float
+    market_segment: str
+    status: str = "pending"
+    execution_time: Optional[str] = None
+    risk_level: Optional[str] = None
+    final_output: Optional[str] = None
+    agent_outputs: Optional[Dict[str, str]] = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _risk_level(agent_outputs: Dict[str, str]) -> Optional[str]:
+    # The market-impact brief ends with "Risk level (High / Medium / Low)"
+    for output in agent_outputs.values():
+        match = _RISK_LEVEL.search(output)
+        if match:
+            return match.group(1).capitalize()
+    return None
+
+
+def _headline(text: Optional[str], width: int = 100) -> str:
+    for line in (text or "").splitlines():
+        line = line.strip(" -*#\t")
+        if line:
+            return line if len(line) <= width else line[: width - 1] + "…"
+    return ""
+
+
+def comparison_table(cells: List[SweepCell]) -> str:
+    """Markdown table with one row per cell, ordered by segment then price cut."""
+    rows = [
+        "| Market segment | Price cut | Status | Risk level | Time | Headline |",
+        "|---|---|---|---|---|---|",
+    ]
+    for cell in sorted(cells, key=lambda c: (c.market_segment, c.price_cut)):
+        headline = _headline(cell.final_output) if cell.status == "success" else (cell.error or "")
+        rows.append(
+            f"| {cell.market_segment} | {cell.price_cut:g}% | {cell.status} | {cell.risk_level or '-'} "
+            f"| {cell.execution_time or '-'} | {headline.replace('|', '/')} |"
+        )
+    return "\n".join(rows)
+
+
+def run_sweep(
+    company: str,
+    competitors: List[str],
+    price_cuts: List[float],
+    market_segments: List[str],
+    context: Optional[RunContext] = None,
+    max_workers: Optional[int] = None,
+    verbose: bool = False,
+) -> Dict[str, Any]:
+    """Run every price cut × segment cell and return the cells plus a comparison table."""
+    orchestrator = get_orchestrator(verbose=verbose)
+
+    # Shared by every cell: computed once
+    company_context = load_company_context(company)
+    shared = orchestrator.build_crew(context)
+
+    cells = [SweepCell(price_cut=cut, market_segment=segment) for segment, cut in product(market_segments, price_cuts)]
+
+    def run_cell(cell: SweepCell) -> None:
+        start_time = datetime.now()
+        try:
+            result = orchestrator.run(
+                competitive_scenario=price_cut_scenario(company, cell.price_cut),
+                competitors=competitors,
+                market_segment=cell.market_segment,
+                company=company,
+                company_context=company_context,
+                context=context,
+                crew=UnifiedWarSimulationCrew(context=shared.context, agent_api_keys=shared.agent_api_keys),
+            )
+        except JobCancelled:
+            raise
+        except Exception as e:
+            cell.status = "failed"
+            cell.error = str(e)
+        else:
+            cell.status = "success"
+            cell.final_output = str(result.raw)
+            cell.agent_outputs = {str(t.agent).strip(): str(t.raw) for t in result.tasks_output}
+            cell.risk_level = _risk_level(cell.agent_outputs)
+        cell.execution_time = str(datetime.now() - start_time)
+
+    start_time = datetime.now()
+    # Each worker gets a copy of the caller's context (cache bypass, job cancellation)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers or DEFAULT_WORKERS) as executor:
+        futures = [executor.submit(contextvars.copy_context().run, run_cell, cell) for cell in cells]
+        for future in futures:
+            future.result()
+
+    return {
+        "status": "success" if any(c.status == "success" for c in cells) else "failed",
+        "execution_time": str(datetime.now() - start_time),
+        "cells": [cell.to_dict() for cell in cells],
+        "table": comparison_table(cells),
+    }
+
+
+def _number_list(raw: str) -> List[float]:
+    return [float(v.strip().rstrip("%")) for v in raw.split(",") if v.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the war simulation over a scenario grid")
+    parser.add_argument("--company", required=True, help="Focal company name (e.g. Samsung)")
+    parser.add_argument("--competitors", required=True, help="Comma-separated competitors (e.g. Apple,Xiaomi,OnePlus)")
+    parser.add_argument("--price-cuts", default="3,5,8,12", help="Comma-separated price cuts in percent")
+    parser.add_argument("--segments", default="india", help="Comma-separated market segments")
+    parser.add_argument("--workers", type=int, default=None, help="Cells run at once (default WARSIM_SWEEP_WORKERS)")
+    args = parser.parse_args()
+
+    result = run_sweep(
+        company=args.company.strip(),
+        competitors=[c.strip() for c in args.competitors.split(",") if c.strip()],
+        price_cuts=_number_list(args.price_cuts),
+        market_segments=[s.strip() for s in args.segments.split(",") if s.strip()],
+        max_workers=args.workers,
+    )
+    print(result["table"])
+    print(f"\nCompleted {len(result['cells'])} scenarios in {result['execution_time']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+"""
+GAME-THEORY EQUILIBRIUM SOLVER
+
+Exact answers for the game theory agent instead of free-text reasoning.
+
+Payoffs are arrays of shape (players, m_1, ..., m_N): entry [i, s_1, ..., s_N]
+is player i's payoff when every player j plays move s_j. Solvers work on any
+such array:
+- ``dominant_strategies``   strictly / weakly dominant move per player
+- ``pure_nash``             every profile where no player gains by deviating
+- ``mixed_nash_2p``         all equilibria of a two-player game (support enumeration)
+- ``fictitious_play``       approximate mixed equilibrium for N players, with its regret
+
+``price_game`` builds the payoff array for a focal company against N
+competitors whose moves are price changes: shares follow a logit demand with
+an outside option, payoff is profit per 100 units of market
+(share × unit margin). A 4-player game with 5 moves each (625 profiles)
+solves in a few milliseconds; fictitious play, needed only when no pure
+equilibrium exists, stops as soon as its regret is negligible. The array
+grows as players × movesᴺ, so games are capped at MAX_PLAYERS players and
+MAX_MOVES moves (6 × 7⁶ ≈ 700k payoffs).
+"""
+
+from itertools import combinations
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
+
+import numpy as np
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
+
+TOL = 1e-9
+MAX_PLAYERS = 6
+MAX_MOVES = 7
+
+
+# ==========================================================
+# PAYOFF CONSTRUCTION
+# ==========================================================
+def price_game(
+    moves: Sequence[float],
+    shares: Sequence[float],
+    margins: Sequence[float],
+    price_sensitivity: float = 6.0,
+) -> np.ndarray:
+    """Payoff array for players choosing a price change (percent) from ``moves``."""
+    n = len(shares)
+    shares = np.asarray(shares, dtype=float)
+    margins = np.asarray(margins, dtype=float)
+    outside = max(1.0 - shares.sum(), 0.05)
+
+    # change[i, s_1..s_N] = player i's price change in that profile
+    grids = np.meshgrid(*([np.asarray(moves, dtype=float) / 100] * n), indexing="ij")
+    change = np.stack(grids)
+    expand = (slice(None),) + (None,) * n
+
+    attraction = shares[expand] * np.exp(-price_sensitivity * change)
+    new_share = attraction / (outside + attraction.sum(axis=0))
+    # Price 1 + change, unit cost 1 - margin
+    unit_margin = margins[expand] + change
+    return new_share * unit_margin * 100
+
+
+# ==========================================================
+# SOLVERS
+# ==========================================================
+def _by_own_move(payoffs: np.ndarray, player: int) -> np.ndarray:
+    """Player's payoffs as (own moves × opponent profiles)."""
+    own = np.moveaxis(payoffs[player], player, 0)
+    return own.reshape(own.shape[0], -1)
+
+
+def dominant_strategies(payoffs: np.ndarray) -> List[Dict[str, Optional[int]]]:
+    """Per player: index of a strictly and of a weakly dominant move (or None)."""
+    result = []
+    for player in range(payoffs.shape[0]):
+        p = _by_own_move(payoffs, player)
+        diff = p[:, None, :] - p[None, :, :]  # [s, t, profile] = payoff(s) - payoff(t)
+        others = ~np.eye(p.shape[0], dtype=bool)
+        weakly = np.all((diff >= -TOL) | ~others[:, :, None], axis=(1, 2))
+        weakly &= np.all(np.any(diff > TOL, axis=2) | ~others, axis=1)
+        strictly = np.all((diff > TOL) | ~others[:, :, None], axis=(1, 2))
+        result.append({
+            "strict": int(np.argmax(strictly)) if strictly.any() else None,
+            "weak": int(np.argmax(weakly)) if weakly.any() else None,
+        })
+    return result
+
+
+def pure_nash(payoffs: np.ndarray) -> List[Tuple[int, ...]]:
+    """All pure-strategy Nash equilibria as move-index profiles."""
+    stable = np.ones(payoffs.shape[1:], dtype=bool)
+    for player in range(payoffs.shape[0]):
+        stable &= payoffs[player] >= payoffs[player].max(axis=player, keepdims=True) - TOL
+    return [tuple(int(i) for i in idx) for idx in np.argwhere(stable)]
+
+
+def mixed_nash_2p(a: np.ndarray, b: np.ndarray) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """All equilibria of a non-degenerate bimatrix game (row payoffs ``a``, column payoffs ``b``).
+
+    Support enumeration: for each support size k the indifference systems of
+    every support pair are solved in one batched ``np.linalg.solve``.
+    """
+    m, n = a.shape
+    found: List[Tuple[np.ndarray, np.ndarray]] = []
+    for k in range(1, min(m, n) + 1):
+        rows = np.array(list(combinations(range(m), k)))
+        cols = np.array(list(combinations(range(n), k)))
+        ri = np.repeat(np.arange(len(rows)), len(cols))
+        ci = np.tile(np.arange(len(cols)), len(rows))
+        I, J = rows[ri], cols[ci]  # (pairs, k)
+
+        def solve(payoff: np.ndarray, own: np.ndarray, other: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+            # Mix over `other` making every move in `own` equally good: [M 1; 1 0][x; -v] = [0; 1]
+            sub = payoff[own[:, :, None], other[:, None, :]]
+            size = len(own)
+            system = np.zeros((size, k + 1, k + 1))
+            system[:, :k, :k] = sub
+            system[:, :k, k] = -1.0
+            system[:, k, :k] = 1.0
+            rhs = np.zeros((size, k + 1))
+            rhs[:, k] = 1.0
+            ok = np.abs(np.linalg.det(system)) > TOL
+            sol = np.full((size, k + 1), np.nan)
+            sol[ok] = np.linalg.solve(system[ok], rhs[ok][..., None])[..., 0]
+            return sol[:, :k], sol[:, k]
+
+        q, v = solve(a, I, J)      # column mix over J, row player's value
+        p, w = solve(b.T, J, I)    # row mix over I, column player's value
+
+        for idx in np.flatnonzero(np.all(q >= -TOL, axis=1) & np.all(p >= -TOL, axis=1)):
+            x = np.zeros(m)
+            y = np.zeros(n)
+            x[I[idx]] = p[idx]
+            y[J[idx]] = q[idx]
+            # No profitable deviation outside the supports
+            if (a @ y).max() <= v[idx] + 1e-7 and (x @ b).max() <= w[idx] + 1e-7:
+                if not any(np.allclose(x, fx) and np.allclose(y, fy) for fx, fy in found):
+                    found.append((x, y))
+    return found
+
+
+def _expected_payoffs(payoffs: np.ndarray, mixes: List[np.ndarray], player: int) -> np.ndarray:
+    """Player's payoff for each own move when the others play ``mixes``."""
+    values = payoffs[player]
+    # Contract opponents from the last axis down so axis numbers stay valid
+    for other in reversed(range(len(mixes))):
+        if other != player:
+            values = np.tensordot(values, mixes[other], axes=([other], [0]))
+    return values
+
+
+def _regret(payoffs: np.ndarray, mixes: List[np.ndarray]) -> float:
+    """Largest gain any player could get by deviating from ``mixes``."""
+    gains = []
+    for player in range(payoffs.shape[0]):
+        values = _expected_payoffs(payoffs, mixes, player)
+        gains.append(float(values.max() - values @ mixes[player]))
+    return max(gains)
+
+
+def fictitious_play(
+    payoffs: np.ndarray, iterations: int = 2000, tol: float = 1e-3, check_every: int = 100
+) -> Tuple[List[np.ndarray], float]:
+    """Approximate mixed equilibrium for N players; returns mixes and max regret (epsilon).
+
+    Stops early once the regret is below ``tol`` × the payoff range.
+    """
+    n = payoffs.shape[0]
+    scale = float(np.ptp(payoffs)) or 1.0
+    counts = [np.ones(size) for size in payoffs.shape[1:]]
+    for step in range(1, iterations + 1):
+        mixes = [c / c.sum() for c in counts]
+        for player in range(n):
+            counts[player][np.argmax(_expected_payoffs(payoffs, mixes, player))] += 1
+        if step % check_every == 0 and _regret(payoffs, [c / c.sum() for c in counts]) < tol * scale:
+            break
+    mixes = [c / c.sum() for c in counts]
+    return mixes, _regret(payoffs, mixes)
+
+
+# ==========================================================
+# REPORT
+# ==========================================================
+def solve_price_game(
+    players: Sequence[str],
+    moves: Sequence[float] = (0.0, -5.0, -10.0),
+    shares: Optional[Sequence[float]] = None,
+    margins: Optional[Sequence[float]] = None,
+    price_sensitivity: float = 6.0,
+) -> Dict[str, Any]:
+    """Build and solve the price game; first player is the focal company."""
+    n = len(players)
+    # A repeated move would show up as duplicate equilibria
+    moves = list(dict.fromkeys(float(m) for m in moves))
+    if not 1 <= n <= MAX_PLAYERS:
+        raise ValueError(f"need 1 to {MAX_PLAYERS} players, got {n}")
+    if not 1 <= len(moves) <= MAX_MOVES:
+        raise ValueError(f"need 1 to {MAX_MOVES} moves, got {len(moves)}")
+    shares = list(shares) if shares else [0.6 / n] * n
+    margins = list(margins) if margins else [0.3] * n
+    if len(shares) != n or len(margins) != n:
+        raise ValueError("shares and margins need one value per player")
+
+    payoffs = price_game(moves, shares, margins, price_sensitivity)
+    labels = [f"{m:+g}%" if m else "hold" for m in moves]
+
+    def profile(idx: Sequence[int]) -> Dict[str, str]:
+        return {players[i]: labels[s] for i, s in enumerate(idx)}
+
+    dominant = dominant_strategies(payoffs)
+    equilibria = pure_nash(payoffs)
+    epsilon = 0.0
+    if n == 2:
+        mixed = [[x, y] for x, y in mixed_nash_2p(payoffs[0], payoffs[1])]
+    elif equilibria:
+        # A pure equilibrium is already a (degenerate) mixed one
+        mixed = []
+    else:
+        mixes, epsilon = fictitious_play(payoffs)
+        mixed = [mixes]
+
+    # Focal company's best reply when every competitor holds (only if holding is a move)
+    best_reply = None
+    if 0 in moves:
+        focal_vs_hold = payoffs[(0, slice(None)) + (moves.index(0),) * (n - 1)]
+        best_reply = labels[int(np.argmax(focal_vs_hold))]
+
+    return {
+        "players": list(players),
+        "moves": labels,
+        "dominant": {
+            players[i]: {k: (labels[v] if v is not None else None) for k, v in d.items()}
+            for i, d in enumerate(dominant)
+        },
+        "pure_nash": [
+            {"profile": profile(idx), "payoffs": [round(float(payoffs[(i,) + idx]), 2) for i in range(n)]}
+            for idx in equilibria
+        ],
+        "mixed_nash": [
+            {players[i]: {labels[s]: round(float(p), 3) for s, p in enumerate(mix) if p > 1e-3} for i, mix in enumerate(eq)}
+            for eq in mixed
+        ],
+        "mixed_epsilon": epsilon,
+        "focal_best_reply_if_competitors_hold": best_reply,
+    }
+
+
+def format_equilibria(result: Dict[str, Any]) -> str:
+    """Compact text for the agent."""
+    lines = [f"Price game: {', '.join(result['players'])} | moves: {', '.join(result['moves'])}"]
+    for player, d in result["dominant"].items():
+        best = d["strict"] and f"{d['strict']} (strict)" or d["weak"] and f"{d['weak']} (weak)" or "none"
+        lines.append(f"Dominant move for {player}: {best}")
+    if result["pure_nash"]:
+        for eq in result["pure_nash"]:
+            moves = ", ".join(f"{p} {m}" for p, m in eq["profile"].items())
+            lines.append(f"Pure Nash: {moves} | payoffs {eq['payoffs']}")
+    else:
+        lines.append("Pure Nash: none")
+    label = "Mixed Nash" if result["mixed_epsilon"] == 0 else f"Mixed Nash (approx., epsilon {result['mixed_epsilon']:.3f})"
+    # Two-player results list every equilibrium, pure ones included; skip those already shown
+    mixed = [eq for eq in result["mixed_nash"] if any(len(mix) > 1 for mix in eq.values())]
+    for eq in mixed:
+        lines.append(f"{label}: " + "; ".join(
+            f"{p} " + ", ".join(f"{m} {prob:.0%}" for m, prob in mix.items()) for p, mix in eq.items()
+        ))
+    if result["focal_best_reply_if_competitors_hold"] is not None:
+        lines.append(f"{result['players'][0]} best reply if all competitors hold: {result['focal_best_reply_if_competitors_hold']}")
+    return "\n".join(lines)
+
+
+class EquilibriumSolverInput(BaseModel):
+    """Input schema for EquilibriumSolverTool."""
+    players: List[str] = Field(..., min_length=1, max_length=MAX_PLAYERS, description="Focal company first, then each competitor.")
+    moves: List[float] = Field([0.0, -5.0, -10.0], min_length=1, max_length=MAX_MOVES, description="Price moves available to every player, in percent (0 = hold, -8 = 8% cut).")
+    shares: Optional[List[float]] = Field(None, description="Current market share per player as fractions, same order as players.")
+    margins: Optional[List[float]] = Field(None, description="Current unit margin per player as fractions (0.3 = 30%), same order as players.")
+    price_sensitivity: float = Field(6.0, description="How strongly buyers switch on price (logit coefficient).")
+
+
+class EquilibriumSolverTool(BaseTool):
+    name: str = "Equilibrium Solver"
+    description: str = (
+        "Solves the pricing game between the focal company and its competitors: dominant moves, "
+        "pure and mixed Nash equilibria and the focal company's best reply. Use its answer instead "
+        "of reasoning about equilibria yourself."
+    )
+    args_schema: Type[BaseModel] = EquilibriumSolverInput
+
+    def _run(self, **kwargs: Any) -> str:
+        try:
+            return format_equilibria(solve_price_game(**kwargs))
+        except (ValueError, ZeroDivisionError) as e:
+            return f"Equilibrium Solver: invalid input ({e})"
@@ -0,0 +1,167 @@
+"""
+RISK STRESS TESTING
+
+VaR / CVaR engine for the risk analyzer: worst cases come from sampled
+scenarios, not from the LLM's imagination.
+
+Each shock factor (competitor price cut, supply shock, demand drop, ...) is a
+percentage with a mean, a standard deviation and an ``impact``: profit lost,
+in percent, per one-point shock. Factors are correlated through a correlation
+matrix (Cholesky factor; a matrix that is not positive semi-definite is
+projected to the nearest one) and fat-tailed through a Student-t mix
+(``tail_df``; ``None`` for normal shocks).
+
+Loss of a scenario = Σ impact_k × shock_k, in percent of profit. Reported:
+expected loss, VaR and CVaR at each confidence level, the probability of
+losing more than ``loss_threshold``, each factor's share of the tail, and the
+worst-k scenarios with their factor values. 50,000 scenarios over a handful
+of factors take about 20 ms.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Type
+
+import numpy as np
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
+
+DEFAULT_FACTORS = [
+    {"name": "competitor_price_cut", "mean_pct": 5.0, "std_pct": 3.0, "impact": 0.8},
+    {"name": "supply_shock", "mean_pct": 0.0, "std_pct": 5.0, "impact": 0.5},
+    {"name": "demand_drop", "mean_pct": 2.0, "std_pct": 4.0, "impact": 1.0},
+]
+# competitor price cuts and demand drops tend to come together
+DEFAULT_CORRELATIONS = [
+    [1.0, 0.0, 0.5],
+    [0.0, 1.0, 0.2],
+    [0.5, 0.2, 1.0],
+]
+
+
+def _cholesky(corr: np.ndarray) -> np.ndarray:
+    try:
+        return np.linalg.cholesky(corr)
+    except np.linalg.LinAlgError:
+        # Nearest PSD matrix: clip negative eigenvalues, rescale to unit diagonal
+        values, vectors = np.linalg.eigh(corr)
+        fixed = vectors @ np.diag(np.clip(values, 1e-8, None)) @ vectors.T
+        d = np.sqrt(np.diag(fixed))
+        return np.linalg.cholesky(fixed / np.outer(d, d))
+
+
+def stress_test(
+    factors: Optional[Sequence[Dict[str, Any]]] = None,
+    correlations: Optional[Sequence[Sequence[float]]] = None,
+    confidence: Sequence[float] = (0.95, 0.99),
+    tail_df: Optional[float] = 5.0,
+    loss_threshold: float = 10.0,
+    worst_k: int = 5,
+    n_samples: int = 50000,
+    seed: Optional[int] = 42,
+) -> Dict[str, Any]:
+    """Sample correlated shock scenarios and return tail-risk metrics."""
+    factors = list(factors or DEFAULT_FACTORS)
+    k = len(factors)
+    if correlations is None:
+        correlations = DEFAULT_CORRELATIONS if factors == DEFAULT_FACTORS else np.eye(k)
+    corr = np.asarray(correlations, dtype=float)
+    if corr.shape != (k, k):
+        raise ValueError(f"correlations must be a {k}x{k} matrix (one row per factor)")
+    # Cholesky reads only the lower triangle and the diagonal scales the volatilities
+    if not np.allclose(corr, corr.T):
+        raise ValueError("correlations must be a symmetric matrix")
+    if not np.allclose(np.diag(corr), 1.0):
+        raise ValueError("correlations must have 1.0 on the diagonal")
+
+    names = [f["name"] for f in factors]
+    mean = np.array([f["mean_pct"] for f in factors], dtype=float)
+    std = np.array([f["std_pct"] for f in factors], dtype=float)
+    impact = np.array([f["impact"] for f in factors], dtype=float)
+
+    rng = np.random.default_rng(seed)
+    z = rng.standard_normal((n_samples, k)) @ _cholesky(corr).T
+    if tail_df:
+        # Multivariate t: one shared chi-square draw per scenario fattens joint tails
+        z *= np.sqrt((tail_df - 2) / rng.chisquare(tail_df, (n_samples, 1)))
+    shocks = mean + std * z
+    contributions = shocks * impact
+    loss = contributions.sum(axis=1)
+
+    levels = {}
+    for c in confidence:
+        var = float(np.quantile(loss, c))
+        tail = loss >= var
+        levels[f"{c:.0%}"] = {"var": var, "cvar": float(loss[tail].mean())}
+
+    # Factor shares of the loss in the worst (1 - max confidence) tail
+    tail = loss >= np.quantile(loss, max(confidence))
+    tail_share = contributions[tail].mean(axis=0) / loss[tail].mean()
+
+    worst_k = min(max(worst_k, 1), n_samples)
+    worst = np.argpartition(loss, -worst_k)[-worst_k:]
+    worst = worst[np.argsort(loss[worst])[::-1]]
+
+    return {
+        "samples": n_samples,
+        "expected_loss": float(loss.mean()),
+        "levels": levels,
+        "prob_loss_above_threshold": float((loss > loss_threshold).mean()),
+        "loss_threshold": loss_threshold,
+        "tail_share": dict(zip(names, tail_share.round(3).tolist())),
+        "worst_scenarios": [
+            {"loss": float(loss[i]), "shocks": dict(zip(names, shocks[i].round(2).tolist()))}
+            for i in worst
+        ],
+    }
+
+
+def format_stress_test(result: Dict[str, Any]) -> str:
+    """Compact text for the agent."""
+    lines = [
+        f"Stress test ({result['samples']} correlated scenarios; loss = % of profit)",
+        f"Expected loss: {result['expected_loss']:.2f}%",
+    ]
+    lines += [f"VaR {level}: {m['var']:.2f}% | CVaR {level}: {m['cvar']:.2f}%" for level, m in result["levels"].items()]
+    lines.append(f"P(loss > {result['loss_threshold']:g}%): {result['prob_loss_above_threshold']:.1%}")
+    lines.append("Tail loss drivers: " + ", ".join(f"{n} {s:.0%}" for n, s in result["tail_share"].items()))
+    lines.append("Worst scenarios:")
+    for i, s in enumerate(result["worst_scenarios"], 1):
+        shocks = ", ".join(f"{n} {v:+.1f}%" for n, v in s["shocks"].items())
+        lines.append(f"  {i}. loss {s['loss']:.1f}% ({shocks})")
+    return "\n".join(lines)
+
+
+class ShockFactor(BaseModel):
+    name: str = Field(..., description="Factor name, e.g. competitor_price_cut, supply_shock, demand_drop.")
+    mean_pct: float = Field(..., description="Expected shock size in percent.")
+    std_pct: float = Field(..., description="Standard deviation of the shock in percent.")
+    impact: float = Field(..., description="Profit lost (percent) per 1-point shock.")
+
+
+class StressTestInput(BaseModel):
+    """Input schema for StressTestTool."""
+    factors: Optional[List[ShockFactor]] = Field(
+        None, description="Shock factors; omit for competitor price cut, supply shock and demand drop defaults."
+    )
+    correlations: Optional[List[List[float]]] = Field(
+        None, description="Correlation matrix between factors, one row per factor in the same order."
+    )
+    loss_threshold: float = Field(10.0, description="Report the probability of losing more than this percent of profit.")
+    worst_k: int = Field(5, ge=1, le=20, description="Number of worst scenarios to list.")
+
+
+class StressTestTool(BaseTool):
+    name: str = "Risk Stress Test"
+    description: str = (
+        "Samples correlated shock scenarios (price cuts, supply shocks, demand drops) and returns "
+        "expected loss, VaR and CVaR at 95%/99%, the factors driving the tail and the worst scenarios. "
+        "Base severity and probability on these numbers."
+    )
+    args_schema: Type[BaseModel] = StressTestInput
+
+    def _run(self, factors: Optional[List[Any]] = None, **kwargs: Any) -> str:
+        if factors:
+            factors = [f.model_dump() if isinstance(f, BaseModel) else dict(f) for f in factors]
+        try:
+            return format_stress_test(stress_test(factors=factors, **kwargs))
+        except (KeyError, ValueError) as e:
+            return f"Risk Stress Test: invalid input ({e})"
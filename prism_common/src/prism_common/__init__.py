@@ -0,0 +1,7 @@
+"""
+PRISM COMMON
+
+Runtime utilities shared by every crew in this repository
+(comp_analysis, customer_intelligence, digital_twin, feed_back_crew,
+one_last_time).
+"""
@@ -0,0 +1,160 @@
+"""
+DISK CACHE
+
+Small SQLite-backed key/value store with a per-entry TTL and an LRU
+size cap. One database file can be shared by every backend process on
+the host (SQLite handles the cross-process locking), which is what lets
+the crews reuse each other's results.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+def default_cache_dir() -> Path:
+    """Root directory for all PRISM caches.
+
+    Override with PRISM_CACHE_DIR; defaults to ~/.cache/prism.
+    """
+    root = os.environ.get("PRISM_CACHE_DIR")
+    if root:
+        return Path(root).expanduser()
+    return Path.home() / ".cache" / "prism"
+
+
+class DiskCache:
+    """
+    Persistent TTL + LRU cache.
+
+    Values must be JSON-serialisable. Expired entries are treated as misses
+    and removed lazily; once the table grows past ``max_entries`` the least
+    recently used rows are evicted.
+    """
+
+    def __init__(self, path: Path, default_ttl: float = 3600.0, max_entries: int = 1000):
+        self.path = Path(path)
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._stats: Dict[str, int] = {
+            "hits": 0,
+            "misses": 0,
+            "expired": 0,
+            "stores": 0,
+            "evictions": 0,
+        }
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries(last_access)"
+            )
+            self._conn.commit()
+
+    # ------------------ READ ------------------
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+
+            value, expires_at = row
+            if expires_at <= now:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._conn.commit()
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+                return None
+
+            self._conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self._stats["hits"] += 1
+
+        return json.loads(value)
+
+    # ------------------ WRITE ------------------
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        now = time.time()
+        ttl = self.default_ttl if ttl is None else ttl
+        payload = json.dumps(value, ensure_ascii=False)
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, created_at, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, payload, now, now + ttl, now),
+            )
+            self._stats["stores"] += 1
+            self._evict(now)
+            self._conn.commit()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def delete_prefix(self, prefix: str) -> int:
+        """Delete every key starting with ``prefix``; returns how many rows went."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM entries WHERE substr(key, 1, ?) = ?", (len(prefix), prefix)
+            )
+            self._conn.commit()
+        return cursor.rowcount
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        # Drop expired rows first, then trim least-recently-used rows over the cap
+        self._conn.execute("DELETE FROM entries WHERE expires_at <= ?", (now,))
+
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM entries WHERE key IN "
+                "(SELECT key FROM entries ORDER BY last_access ASC LIMIT ?)",
+                (overflow,),
+            )
+            self._stats["evictions"] += overflow
+
+    # ------------------ STATS ------------------
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for this process plus the current table size."""
+        with self._lock:
+            (size,) = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()
+            stats: Dict[str, Any] = dict(self._stats)
+
+        lookups = stats["hits"] + stats["misses"]
+        stats["entries"] = size
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        return stats
@@ -0,0 +1,162 @@
+"""
+TASK CHECKPOINTS
+
+Every task output of a crew run is saved as soon as the task finishes. A
+retried or restarted run then resumes at the first unfinished task instead
+of repeating LLM work that already succeeded: a rate limit hit in the last
+task costs only the last task on the next attempt.
+
+    store = get_checkpoint_store()
+    run_id = store.run_id("war_simulation", inputs, version=templates.version)
+    output = checkpoint_crew(crew, run_id).kickoff(inputs=inputs)
+    store.clear(run_id)   # the whole run succeeded; nothing left to resume
+
+A run is identified by what it computes (crew name, inputs and config
+version), not by who asked. A retry, a restart of the backend, or the same
+request sent again after a daily-quota error all find the same checkpoints.
+Tasks are keyed by ``scope`` plus their position and name in the crew, so
+the per-competitor crews of a fan-out run keep separate checkpoints.
+
+``checkpoint_crew`` wraps each task's ``execute_sync``. A task with a
+checkpoint returns the saved output without calling its agent. It still
+fires the task callback, so streamed runs report it as completed. Later
+tasks get it as context as usual. Async tasks and tasks with a Pydantic
+output are not checkpointed.
+
+Checkpoints live in a shared SQLite file (checkpoints.sqlite). Every backend
+process on the host can resume a run. ``bypass_llm_cache()``
+(``Cache-Control: no-cache``) is a request for fresh answers, so callers
+clear a run's checkpoints before starting it.
+
+Tuning (environment variables):
+- PRISM_CHECKPOINT_TTL       seconds a task checkpoint is kept (default 21600)
+- PRISM_CHECKPOINT_DISABLED  set to 1/true to always run every task
+"""
+
+import functools
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, Optional
+
+from prism_common.cache import DiskCache, default_cache_dir
+
+logger = logging.getLogger(__name__)
+
+
+class CheckpointStore:
+    """Task outputs per run in a pluggable backend; ``backend=None`` disables checkpoints."""
+
+    def __init__(self, backend: Optional[DiskCache], ttl: Optional[float] = None):
+        self.backend = backend
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._stats: Dict[str, int] = {"saved": 0, "resumed": 0, "cleared": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    def run_id(self, kind: str, fields: Dict[str, Any], version: str = "") -> str:
+        raw = json.dumps({"kind": kind, "version": version, "fields": fields}, sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+    def load(self, run_id: str, task_key: str) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+        return self.backend.get(f"{run_id}/{task_key}")
+
+    def save(self, run_id: str, task_key: str, output: Dict[str, Any]) -> None:
+        if self.enabled:
+            self.backend.set(f"{run_id}/{task_key}", output, ttl=self.ttl)
+            self._count("saved")
+
+    def clear(self, run_id: str) -> int:
+        """Drop every checkpoint of ``run_id``."""
+        if not self.enabled:
+            return 0
+        removed = self.backend.delete_prefix(f"{run_id}/")
+        if removed:
+            self._count("cleared")
+        return removed
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"enabled": self.enabled, **self._stats}
+
+
+# ==========================================================
+# CREW INTEGRATION
+# ==========================================================
+def _task_key(scope: str, index: int, task: Any) -> str:
+    return f"{scope}/{index}:{getattr(task, 'name', None) or ''}"
+
+
+def _checkpointed(task: Any, store: CheckpointStore, run_id: str, key: str) -> None:
+    """Route ``task.execute_sync`` through the checkpoint store."""
+    from crewai.tasks.task_output import TaskOutput
+
+    # Bound from the class, so wrapping a task again (crew retries) never nests
+    execute = functools.partial(type(task).execute_sync, task)
+
+    def execute_sync(agent=None, context=None, tools=None):
+        saved = store.load(run_id, key)
+        if saved is not None:
+            output = TaskOutput.model_validate(saved)
+            task.output = output
+            store._count("resumed")
+            logger.info("run %s: task %s resumed from checkpoint", run_id, key)
+            if task.callback is not None:
+                task.callback(output)
+            return output
+
+        output = execute(agent=agent, context=context, tools=tools)
+        if output.pydantic is None:
+            store.save(run_id, key, output.model_dump(mode="json", exclude={"pydantic", "messages"}))
+        return output
+
+    # Task is a pydantic model; bypass its field-only __setattr__
+    object.__setattr__(task, "execute_sync", execute_sync)
+
+
+def checkpoint_crew(crew: Any, run_id: str, scope: str = "", store: Optional[CheckpointStore] = None) -> Any:
+    """Make ``crew`` save each task's output under ``run_id`` and reuse saved ones."""
+    store = store or get_checkpoint_store()
+    if not store.enabled:
+        return crew
+    for index, task in enumerate(crew.tasks):
+        _checkpointed(task, store, run_id, _task_key(scope, index, task))
+    return crew
+
+
+# ==========================================================
+# SINGLETON ACCESSOR
+# ==========================================================
+_checkpoint_store: Optional[CheckpointStore] = None
+_checkpoint_store_lock = threading.Lock()
+
+
+def set_checkpoint_store(store: CheckpointStore) -> None:
+    """Install a custom store (e.g. another backend) for every later ``checkpoint_crew``."""
+    global _checkpoint_store
+    with _checkpoint_store_lock:
+        _checkpoint_store = store
+
+
+def get_checkpoint_store() -> CheckpointStore:
+    global _checkpoint_store
+    with _checkpoint_store_lock:
+        if _checkpoint_store is None:
+            if os.environ.get("PRISM_CHECKPOINT_DISABLED", "").strip().lower() in ("1", "true", "yes", "on"):
+                _checkpoint_store = CheckpointStore(None)
+            else:
+                ttl = float(os.environ.get("PRISM_CHECKPOINT_TTL", 6 * 3600))
+                backend = DiskCache(default_cache_dir() / "checkpoints.sqlite", default_ttl=ttl, max_entries=2000)
+                _checkpoint_store = CheckpointStore(backend, ttl=ttl)
+        return _checkpoint_store
@@ -0,0 +1,138 @@
+"""
+CREW TEMPLATES
+
+Agent and task YAML is parsed once per process and kept as read-only
+templates. Each run gets its own mutable copy to build Agents and Tasks
+from, so no configuration object is shared between concurrent runs.
+
+    templates = CrewTemplates(CONFIG_DIR)
+    agents = {name: Agent(**templates.agent(name), llm=llm) for name in templates.agents}
+    description = templates.tasks["roadmap_task"]["description"]
+
+CrewBase crews read their YAML through ``load_yaml``; decorate the class
+with ``@use_templates`` (listed above ``@CrewBase``) so every instance gets a copy
+of the parsed template instead of re-reading the files.
+
+Templates are keyed by path, modification time and size. Editing a YAML
+file is picked up by the next run without a restart. ``version`` is a short
+digest of the files, e.g. for keying cached run results.
+
+Why not reuse built Agents and Tasks? They are per-run objects: tasks keep
+their output, agents keep their executor, and crewai memoizes both per crew
+instance. Building them from a parsed template is cheaper than
+``Agent.copy()``, and parsing the YAML was most of the per-run setup cost.
+"""
+
+import hashlib
+import threading
+from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Union
+
+import yaml
+
+PathLike = Union[str, Path]
+
+_stats_lock = threading.Lock()
+_stats: Dict[str, int] = {"parses": 0, "copies": 0}
+
+
+def freeze(value: Any) -> Any:
+    """Read-only view of parsed YAML: mappings become MappingProxyType, lists tuples."""
+    if isinstance(value, Mapping):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Fresh mutable copy of a frozen template (dicts and lists, as yaml.safe_load returns)."""
+    if isinstance(value, Mapping):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(v) for v in value]
+    return value
+
+
+@lru_cache(maxsize=64)
+def _parse(path: str, mtime_ns: int, size: int) -> Mapping[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        content = yaml.safe_load(f)
+    with _stats_lock:
+        _stats["parses"] += 1
+    return freeze(content if isinstance(content, dict) else {})
+
+
+def load_template(path: PathLike) -> Mapping[str, Any]:
+    """Parsed, read-only YAML mapping; parsed again only when the file changes."""
+    path = Path(path).resolve()
+    st = path.stat()
+    return _parse(str(path), st.st_mtime_ns, st.st_size)
+
+
+def load_config(path: PathLike) -> Dict[str, Any]:
+    """Mutable copy of the template at ``path`` (drop-in for ``yaml.safe_load``)."""
+    config = thaw(load_template(path))
+    with _stats_lock:
+        _stats["copies"] += 1
+    return config
+
+
+@lru_cache(maxsize=64)
+def _digest(path: str, mtime_ns: int, size: int) -> str:
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def config_version(*paths: PathLike) -> str:
+    """Short digest of the given files' contents."""
+    h = hashlib.sha256()
+    for path in paths:
+        path = Path(path).resolve()
+        st = path.stat()
+        h.update(_digest(str(path), st.st_mtime_ns, st.st_size).encode())
+    return h.hexdigest()[:12]
+
+
+def template_stats() -> Dict[str, int]:
+    with _stats_lock:
+        return dict(_stats)
+
+
+class CrewTemplates:
+    """The agents.yaml / tasks.yaml pair of one crew."""
+
+    def __init__(self, config_dir: PathLike, agents_file: str = "agents.yaml", tasks_file: str = "tasks.yaml"):
+        self.agents_path = Path(config_dir) / agents_file
+        self.tasks_path = Path(config_dir) / tasks_file
+
+    @property
+    def agents(self) -> Mapping[str, Any]:
+        return load_template(self.agents_path)
+
+    @property
+    def tasks(self) -> Mapping[str, Any]:
+        return load_template(self.tasks_path)
+
+    @property
+    def version(self) -> str:
+        return config_version(self.agents_path, self.tasks_path)
+
+    def agent(self, name: str) -> Dict[str, Any]:
+        """Keyword arguments for one ``Agent``, owned by the caller."""
+        return thaw(self.agents[name])
+
+    def task(self, name: str) -> Dict[str, Any]:
+        """Keyword arguments for one ``Task``, owned by the caller."""
+        return thaw(self.tasks[name])
+
+
+def use_templates(cls: type) -> type:
+    """Class decorator for ``@CrewBase`` crews: configs come from the template cache.
+
+    CrewBase injects its own ``load_yaml`` when the class is created, so this
+    must be applied after it, i.e. listed above ``@CrewBase``.
+    """
+    cls.load_yaml = staticmethod(load_config)
+    return cls
@@ -0,0 +1,158 @@
+"""
+PARALLEL TASK EXECUTION
+
+Runs a crew's independent tasks concurrently instead of one after another.
+
+The dependency graph comes from each task's ``context`` — the task names a
+task lists under ``context:`` in tasks.yaml. A task without an explicit
+context depends on nothing. Tasks are grouped into levels (roots are level 0,
+everything else sits one level below its deepest dependency) and handed to
+crewai's sequential process in level order with ``async_execution`` set:
+
+- every task of a level runs concurrently with the rest of that level
+- a level that follows an async level starts with a synchronous task; crewai
+  waits for all pending tasks before a synchronous one, which makes it the
+  barrier that keeps dependencies ahead of their dependents
+- the crew's final task stays synchronous (crewai's own requirement)
+
+So a fan-out/join crew — five recon tasks feeding one synthesis — runs the
+five at once, and the synthesis starts as soon as the last of them is done.
+
+crewai needs the last task synchronous, so a crew whose tasks are *all*
+independent would still run its last task on its own. ``kickoff_concurrently``
+covers that shape: every task runs as a one-task crew, a level at a time (all
+at once when nothing declares a context), and the outputs are gathered into
+one ``CrewOutput`` shaped like a sequential kickoff (``raw`` is the last
+task's answer, ``tasks_output`` keeps the task order). A task's context tasks
+have finished, and hold their output, before its own crew starts.
+
+Concurrent tasks still share one RPM/TPM budget: every LLM call goes through
+``cached_llm``, which waits on the shared rate limiter. Each task thread runs
+in a copy of the caller's context (job cancellation, cache bypass, event
+stream), which crewai's own async threads would otherwise drop.
+
+Tuning (environment variables):
+- PRISM_PARALLEL_TASKS  set to 0/false to run crews strictly in order (default on)
+"""
+
+import concurrent.futures
+import contextvars
+import os
+import threading
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional
+
+
+def parallel_enabled(parallel: Optional[bool] = None) -> bool:
+    """Resolve a crew's ``parallel`` argument, falling back to PRISM_PARALLEL_TASKS."""
+    if parallel is not None:
+        return parallel
+    return os.getenv("PRISM_PARALLEL_TASKS", "1").lower() not in ("0", "false", "no")
+
+
+def _dependencies(task: Any) -> List[Any]:
+    # crewai uses a sentinel (not a list) for "no explicit context"
+    context = getattr(task, "context", None)
+    return list(context) if isinstance(context, list) else []
+
+
+def task_levels(tasks: List[Any]) -> Dict[int, int]:
+    """Map id(task) -> dependency level; context tasks outside ``tasks`` are ignored."""
+    known = {id(task) for task in tasks}
+    levels: Dict[int, int] = {}
+    visiting: set = set()
+
+    def level(task: Any) -> int:
+        key = id(task)
+        if key in levels:
+            return levels[key]
+        if key in visiting:
+            raise ValueError(f"Task dependency cycle at: {getattr(task, 'name', None) or task.description[:60]}")
+        visiting.add(key)
+        deps = [d for d in _dependencies(task) if id(d) in known]
+        levels[key] = 1 + max(map(level, deps)) if deps else 0
+        visiting.discard(key)
+        return levels[key]
+
+    for task in tasks:
+        level(task)
+    return levels
+
+
+def _execute_async_in_context(task: Any) -> None:
+    """Make crewai's per-task worker thread inherit the caller's context variables."""
+
+    def execute_async(agent=None, context=None, tools=None) -> Future:
+        future: Future = Future()
+        threading.Thread(
+            daemon=True,
+            target=contextvars.copy_context().run,
+            args=(task._execute_task_async, agent, context, tools, future),
+        ).start()
+        return future
+
+    # Task is a pydantic model; bypass its field-only __setattr__
+    object.__setattr__(task, "execute_async", execute_async)
+
+
+def parallelize(tasks: List[Any]) -> List[Any]:
+    """Return ``tasks`` in dependency-level order, marked so independent ones run concurrently."""
+    if len(tasks) < 2:
+        return list(tasks)
+
+    levels = task_levels(tasks)
+    ordered = sorted(tasks, key=lambda task: levels[id(task)])  # stable within a level
+
+    previous_async = False
+    for index, task in enumerate(ordered):
+        starts_level = index == 0 or levels[id(ordered[index - 1])] != levels[id(task)]
+        is_last = index == len(ordered) - 1
+        run_async = not is_last and not (starts_level and previous_async)
+        task.async_execution = run_async
+        if run_async:
+            _execute_async_in_context(task)
+        previous_async = run_async
+    return ordered
+
+
+def kickoff_concurrently(crew: Any, inputs: Optional[Dict[str, Any]] = None) -> Any:
+    """Run a crew's tasks concurrently, level by level; same output shape as ``crew.kickoff``.
+
+    Tasks of one dependency level run at once; a level starts when the one
+    before it is done, so ``context`` outputs are in place. Falls back to a
+    plain kickoff when tasks share an agent (one agent cannot work on two
+    tasks at the same time).
+    """
+    from crewai import Crew
+    from crewai.crews.crew_output import CrewOutput
+    from crewai.types.usage_metrics import UsageMetrics
+
+    tasks = list(crew.tasks)
+    agents = [task.agent for task in tasks]
+    if len(tasks) < 2 or len({id(a) for a in agents}) != len(agents):
+        return crew.kickoff(inputs=inputs)
+    levels = task_levels(tasks)
+
+    def run(task: Any) -> Any:
+        # Context tasks outside this one-task crew are read from their .output
+        return Crew(agents=[task.agent], tasks=[task], verbose=crew.verbose).kickoff(inputs=inputs)
+
+    # Each worker gets a copy of the caller's context (cache bypass, job cancellation)
+    results: Dict[int, Any] = {}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(tasks)) as executor:
+        for level in sorted(set(levels.values())):
+            stage = [task for task in tasks if levels[id(task)] == level]
+            futures = {id(task): executor.submit(contextvars.copy_context().run, run, task) for task in stage}
+            results.update({key: future.result() for key, future in futures.items()})
+    outputs = [results[id(task)] for task in tasks]
+
+    usage = UsageMetrics()
+    for output in outputs:
+        usage.add_usage_metrics(output.token_usage)
+    return CrewOutput(
+        raw=outputs[-1].raw,
+        pydantic=outputs[-1].pydantic,
+        json_dict=outputs[-1].json_dict,
+        tasks_output=[task_output for output in outputs for task_output in output.tasks_output],
+        token_usage=usage,
+    )
@@ -0,0 +1,143 @@
+"""
+NEAR-DUPLICATE FILTER
+
+Drops syndicated and near-identical snippets before they reach a prompt.
+
+Each text becomes a set of word 3-shingles. Its MinHash signature is cut
+into LSH bands, so a new text is only compared with the earlier texts that
+share a band bucket: linear in the number of texts. The signature uses
+one-permutation hashing: each shingle hash is binned into one of NUM_PERM
+slots, and empty slots borrow from the next filled one. That costs one pass
+over the shingles instead of NUM_PERM.
+Candidates are confirmed with the exact Jaccard similarity of the shingle
+sets, which makes the threshold exact rather than an estimate. Earlier texts
+win, so search rank order is kept.
+
+Tuning (environment variables):
+- PRISM_DEDUPE_THRESHOLD  Jaccard similarity at which a text counts as a
+                          duplicate (default 0.7; 1.0 = identical wording only)
+- PRISM_DEDUPE_DISABLED   set to 1/true to keep every text
+"""
+
+import os
+import random
+import re
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+DEFAULT_THRESHOLD = 0.7
+SHINGLE_WORDS = 3
+NUM_PERM = 32
+
+_WORD_RE = re.compile(r"\w+")
+_MASK64 = (1 << 64) - 1
+_BIN_BITS = NUM_PERM.bit_length() - 1
+# Odd multiplier spreads str hashes over all 64 bits before binning
+_MIX = 0x9E3779B97F4A7C15
+# Per-distance masks tell a borrowed slot apart from the slot it borrowed from
+_BORROW = [random.Random(i).getrandbits(64) for i in range(NUM_PERM)]
+
+
+def _env_flag(name: str) -> bool:
+    return os.environ.get(name, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def dedupe_threshold(threshold: Optional[float] = None) -> Optional[float]:
+    """Effective threshold: argument, else PRISM_DEDUPE_THRESHOLD; None when disabled."""
+    if _env_flag("PRISM_DEDUPE_DISABLED"):
+        return None
+    if threshold is None:
+        try:
+            threshold = float(os.environ.get("PRISM_DEDUPE_THRESHOLD", DEFAULT_THRESHOLD))
+        except ValueError:
+            threshold = DEFAULT_THRESHOLD
+    return min(max(threshold, 0.0), 1.0)
+
+
+def _bands(threshold: float) -> Tuple[int, int]:
+    """(bands, rows) whose LSH S-curve turns just below ``threshold``.
+
+    Erring low trades a few extra exact comparisons for not missing pairs.
+    """
+    options = [(NUM_PERM // r, r) for r in range(1, NUM_PERM + 1) if NUM_PERM % r == 0]
+    below = [(b, r) for b, r in options if (1 / b) ** (1 / r) <= threshold]
+    if not below:
+        return options[0]
+    return max(below, key=lambda br: (1 / br[0]) ** (1 / br[1]))
+
+
+def shingles(text: str) -> FrozenSet[int]:
+    words = _WORD_RE.findall(text.casefold())
+    if len(words) <= SHINGLE_WORDS:
+        return frozenset([hash(" ".join(words))]) if words else frozenset()
+    return frozenset(hash(" ".join(words[i:i + SHINGLE_WORDS])) for i in range(len(words) - SHINGLE_WORDS + 1))
+
+
+def _signature(shingle_set: FrozenSet[int]) -> List[int]:
+    slots: List[Optional[int]] = [None] * NUM_PERM
+    for h in shingle_set:
+        h = (h * _MIX) & _MASK64
+        b, v = h & (NUM_PERM - 1), h >> _BIN_BITS
+        if slots[b] is None or v < slots[b]:
+            slots[b] = v
+    signature = list(slots)
+    for j in range(NUM_PERM):
+        if slots[j] is None:
+            k = 1
+            while slots[(j + k) % NUM_PERM] is None:
+                k += 1
+            signature[j] = slots[(j + k) % NUM_PERM] ^ _BORROW[k]
+    return signature  # type: ignore[return-value]
+
+
+class NearDuplicateFilter:
+    """Incremental filter: ``add(text)`` is False for a near duplicate of an earlier text."""
+
+    def __init__(self, threshold: Optional[float] = None):
+        self.threshold = dedupe_threshold(threshold)
+        self.bands, self.rows = _bands(self.threshold) if self.threshold is not None else (0, 0)
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = {}
+        self._kept: List[FrozenSet[int]] = []
+        self.dropped = 0
+
+    def add(self, text: str) -> bool:
+        if self.threshold is None:
+            return True
+        shingle_set = shingles(text)
+        if not shingle_set:
+            return True
+
+        signature = _signature(shingle_set)
+        keys = [(b, tuple(signature[b * self.rows:(b + 1) * self.rows])) for b in range(self.bands)]
+
+        candidates = {i for key in keys for i in self._buckets.get(key, ())}
+        for i in candidates:
+            other = self._kept[i]
+            if len(shingle_set & other) >= self.threshold * len(shingle_set | other):
+                self.dropped += 1
+                return False
+
+        index = len(self._kept)
+        self._kept.append(shingle_set)
+        for key in keys:
+            self._buckets.setdefault(key, []).append(index)
+        return True
+
+
+def dedupe_texts(texts: Iterable[str], threshold: Optional[float] = None) -> List[str]:
+    """Texts with near duplicates of earlier ones removed."""
+    seen = NearDuplicateFilter(threshold)
+    return [t for t in texts if seen.add(t)]
+
+
+def _result_text(item: Dict[str, Any]) -> str:
+    return f"{item.get('title') or ''} {item.get('snippet') or item.get('description') or ''}"
+
+
+def dedupe_results(
+    items: Iterable[Dict[str, Any]],
+    threshold: Optional[float] = None,
+    text: Callable[[Dict[str, Any]], str] = _result_text,
+) -> List[Dict[str, Any]]:
+    """Search results (``organic`` items) whose title + snippet is not a near duplicate of an earlier one."""
+    seen = NearDuplicateFilter(threshold)
+    return [item for item in items if seen.add(text(item))]
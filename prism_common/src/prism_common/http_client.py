@@ -0,0 +1,236 @@
+"""
+SHARED HTTP CLIENT
+
+Pooled, keep-alive HTTP clients for outbound API calls (Serper today).
+
+- One ``requests.Session`` per process keeps TLS connections open and pools
+  them, instead of a fresh handshake on every ``requests.post``.
+- Every request gets a connect and a read deadline, so a hung socket can no
+  longer pin a worker thread.
+- Idempotent requests are retried on connection errors, timeouts, 429 and
+  5xx responses, with capped exponential backoff and full jitter.
+- ``AsyncHttpClient`` offers the same policy on top of ``httpx`` for callers
+  running on an event loop.
+
+Tuning (environment variables):
+- PRISM_HTTP_CONNECT_TIMEOUT  seconds to establish a connection (default 5)
+- PRISM_HTTP_READ_TIMEOUT     seconds to wait for response bytes (default 20)
+- PRISM_HTTP_MAX_RETRIES      retries after the first attempt (default 2)
+- PRISM_HTTP_POOL_SIZE        keep-alive connections per host (default 32)
+"""
+
+import asyncio
+import os
+import random
+import threading
+import time
+import weakref
+from typing import Any, Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+def _retry_after_seconds(headers: Any) -> Optional[float]:
+    value = headers.get("Retry-After") if headers is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    """Capped exponential backoff with full jitter."""
+
+    def __init__(self, max_retries: int = 2, backoff_base: float = 0.5, backoff_cap: float = 8.0):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+
+    def should_retry(self, method: str, idempotent: Optional[bool], attempt: int) -> bool:
+        if attempt >= self.max_retries:
+            return False
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+        return idempotent
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        # Respect a server-provided Retry-After, but never wait past the cap
+        if retry_after is not None:
+            return min(retry_after, self.backoff_cap)
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+# ==========================================================
+# SYNC CLIENT
+# ==========================================================
+class HttpClient:
+    """Thread-safe pooled client shared by every tool in the process."""
+
+    def __init__(
+        self,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 20.0,
+        retry: Optional[RetryPolicy] = None,
+        pool_size: int = 32,
+    ):
+        self.timeout: Tuple[float, float] = (connect_timeout, read_timeout)
+        self.retry = retry or RetryPolicy()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        idempotent: Optional[bool] = None,
+        timeout: Optional[Any] = None,
+        **kwargs: Any,
+    ) -> requests.Response:
+        """Send a request, retrying transient failures when it is safe to do so.
+
+        ``idempotent`` overrides the method-based default, e.g. for read-only
+        POST APIs such as Serper search. The last response is returned even
+        if its status is retryable; call ``raise_for_status()`` as usual.
+        """
+        attempt = 0
+        while True:
+            try:
+                response = self.session.request(method, url, timeout=timeout or self.timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if not self.retry.should_retry(method, idempotent, attempt):
+                    raise
+                time.sleep(self.retry.delay(attempt))
+                attempt += 1
+                continue
+
+            if response.status_code in RETRY_STATUSES and self.retry.should_retry(method, idempotent, attempt):
+                wait = self.retry.delay(attempt, _retry_after_seconds(response.headers))
+                response.close()
+                time.sleep(wait)
+                attempt += 1
+                continue
+
+            return response
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def close(self) -> None:
+        self.session.close()
+
+
+# ==========================================================
+# ASYNC CLIENT
+# ==========================================================
+class AsyncHttpClient:
+    """``httpx.AsyncClient`` wrapper with the same timeouts and retry policy."""
+
+    def __init__(
+        self,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 20.0,
+        retry: Optional[RetryPolicy] = None,
+        pool_size: int = 32,
+    ):
+        import httpx
+
+        self._httpx = httpx
+        self.retry = retry or RetryPolicy()
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+        )
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        idempotent: Optional[bool] = None,
+        **kwargs: Any,
+    ):
+        attempt = 0
+        while True:
+            try:
+                response = await self.client.request(method, url, **kwargs)
+            except (self._httpx.TransportError, self._httpx.TimeoutException):
+                if not self.retry.should_retry(method, idempotent, attempt):
+                    raise
+                await asyncio.sleep(self.retry.delay(attempt))
+                attempt += 1
+                continue
+
+            if response.status_code in RETRY_STATUSES and self.retry.should_retry(method, idempotent, attempt):
+                wait = self.retry.delay(attempt, _retry_after_seconds(response.headers))
+                await response.aclose()
+                await asyncio.sleep(wait)
+                attempt += 1
+                continue
+
+            return response
+
+    async def get(self, url: str, **kwargs: Any):
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs: Any):
+        return await self.request("POST", url, **kwargs)
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+# ==========================================================
+# SINGLETON ACCESSORS
+# ==========================================================
+def _client_settings() -> Dict[str, Any]:
+    return {
+        "connect_timeout": _env_float("PRISM_HTTP_CONNECT_TIMEOUT", 5.0),
+        "read_timeout": _env_float("PRISM_HTTP_READ_TIMEOUT", 20.0),
+        "retry": RetryPolicy(max_retries=int(_env_float("PRISM_HTTP_MAX_RETRIES", 2))),
+        "pool_size": int(_env_float("PRISM_HTTP_POOL_SIZE", 32)),
+    }
+
+
+_http_client: Optional[HttpClient] = None
+_http_client_lock = threading.Lock()
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncHttpClient]" = weakref.WeakKeyDictionary()
+
+
+def get_http_client() -> HttpClient:
+    global _http_client
+    with _http_client_lock:
+        if _http_client is None:
+            _http_client = HttpClient(**_client_settings())
+        return _http_client
+
+
+def get_async_http_client() -> AsyncHttpClient:
+    """Return the async client bound to the running event loop.
+
+    httpx connection pools cannot be shared across loops, so one client is
+    kept per loop.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = AsyncHttpClient(**_client_settings())
+        _async_clients[loop] = client
+    return client
@@ -0,0 +1,181 @@
+"""
+JOB REGISTRY
+
+Background execution for long crew runs. ``submit`` returns a ``Job``
+immediately; a bounded worker pool runs it with its own arguments (and its
+own ``RunContext``), so overlapping runs never share mutable state. Jobs can
+be polled, listed and cancelled.
+
+Cancellation is cooperative: a queued job is dropped before it starts, and a
+running job stops at its next LLM call (``cached_llm`` calls
+``raise_if_cancelled``), since a crew cannot be interrupted mid-request.
+
+Context variables set by the caller (e.g. ``bypass_llm_cache``) are copied
+into the worker at submit time.
+
+Tuning (environment variables):
+- PRISM_JOB_WORKERS   concurrent runs per backend process (default 2)
+- PRISM_JOB_HISTORY   finished jobs kept for polling (default 200)
+"""
+
+import contextvars
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class JobCancelled(Exception):
+    """Raised inside a job's worker once the job has been cancelled."""
+
+
+@dataclass
+class Job:
+    """One submitted run and everything a client can poll about it."""
+
+    id: str
+    kind: str
+    status: str = QUEUED
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Any = None
+    error: Optional[str] = None
+    error_status: Optional[int] = None
+    cancel_event: threading.Event = field(default_factory=threading.Event, repr=False)
+    future: Optional[Future] = field(default=None, repr=False)
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self.cancel_event.is_set()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-safe summary (without the result payload)."""
+        end = self.finished_at or time.time()
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "execution_time": round(end - self.started_at, 3) if self.started_at else None,
+            "cancel_requested": self.cancel_requested,
+            "error": self.error,
+        }
+
+
+_current_job: ContextVar[Optional[Job]] = ContextVar("prism_current_job", default=None)
+
+
+def current_job() -> Optional[Job]:
+    """The job whose worker is running this code, if any."""
+    return _current_job.get()
+
+
+def raise_if_cancelled() -> None:
+    """Stop the current job's work if a client cancelled it."""
+    job = _current_job.get()
+    if job is not None and job.cancel_requested:
+        raise JobCancelled(f"Job {job.id} was cancelled")
+
+
+class JobRegistry:
+    """Bounded worker pool plus an in-memory index of submitted jobs."""
+
+    def __init__(self, max_workers: int = 2, max_history: int = 200):
+        self.max_history = max_history
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prism-job")
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Job:
+        job = Job(id=uuid.uuid4().hex, kind=kind)
+        ctx = contextvars.copy_context()
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        job.future = self._executor.submit(ctx.run, self._execute, job, fn, args, kwargs)
+        return job
+
+    def _execute(self, job: Job, fn: Callable[..., Any], args: tuple, kwargs: dict) -> None:
+        if job.cancel_requested:
+            # Cancelled after the worker picked it up but before it started
+            job.status, job.finished_at = CANCELLED, time.time()
+            return
+        _current_job.set(job)
+        job.status, job.started_at = RUNNING, time.time()
+        try:
+            result = fn(*args, **kwargs)
+        except JobCancelled:
+            job.status = CANCELLED
+        except Exception as e:
+            job.status = CANCELLED if job.cancel_requested else FAILED
+            # HTTPException-style errors keep their status code and detail
+            job.error = str(getattr(e, "detail", None) or e)
+            job.error_status = getattr(e, "status_code", 500)
+        else:
+            if job.cancel_requested:
+                job.status = CANCELLED
+            else:
+                job.status, job.result = SUCCEEDED, result
+        finally:
+            job.finished_at = time.time()
+
+    def _prune(self) -> None:
+        finished = [j for j in self._jobs.values() if j.status in FINISHED]
+        overflow = len(finished) - self.max_history
+        for job in sorted(finished, key=lambda j: j.finished_at or 0)[:max(0, overflow)]:
+            del self._jobs[job.id]
+
+    # ------------------ QUERIES ------------------
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self, kind: Optional[str] = None, status: Optional[str] = None) -> List[Job]:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        jobs = [j for j in jobs if (kind is None or j.kind == kind) and (status is None or j.status == status)]
+        return sorted(jobs, key=lambda j: j.submitted_at, reverse=True)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Request cancellation; returns the job (or None if unknown)."""
+        job = self.get(job_id)
+        if job is None or job.status in FINISHED:
+            return job
+        job.cancel_event.set()
+        if job.future is not None and job.future.cancel():
+            # Never started: finish it here
+            job.status, job.finished_at = CANCELLED, time.time()
+        return job
+
+
+# ==========================================================
+# SINGLETON ACCESSOR
+# ==========================================================
+_job_registry: Optional[JobRegistry] = None
+_job_registry_lock = threading.Lock()
+
+
+def get_job_registry() -> JobRegistry:
+    global _job_registry
+    with _job_registry_lock:
+        if _job_registry is None:
+            _job_registry = JobRegistry(
+                max_workers=int(os.environ.get("PRISM_JOB_WORKERS", 2)),
+                max_history=int(os.environ.get("PRISM_JOB_HISTORY", 200)),
+            )
+        return _job_registry
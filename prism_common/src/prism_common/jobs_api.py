@@ -0,0 +1,70 @@
+"""
+JOB ENDPOINTS
+
+FastAPI wiring for ``prism_common.jobs``, shared by every crew backend:
+
+    GET    /jobs                  list jobs (?kind=, ?status=)
+    GET    /jobs/{job_id}         status of one job
+    GET    /jobs/{job_id}/result  the run's normal response body once it succeeded
+    DELETE /jobs/{job_id}         cancel a queued or running job
+
+Run endpoints opt in per request with the standard ``Prefer: respond-async``
+header: the run is queued and the endpoint answers ``202 Accepted`` with
+the job id and a ``Location`` header instead of holding the connection open.
+"""
+
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse
+
+from prism_common.jobs import CANCELLED, FAILED, SUCCEEDED, Job, JobRegistry, get_job_registry
+
+
+def async_requested(prefer: Optional[str]) -> bool:
+    """True when an HTTP ``Prefer`` header asks for asynchronous processing."""
+    return "respond-async" in (prefer or "").lower()
+
+
+def accepted(job: Job) -> JSONResponse:
+    """``202 Accepted`` response pointing the client at the job."""
+    body = {**job.to_dict(), "status_url": f"/jobs/{job.id}", "result_url": f"/jobs/{job.id}/result"}
+    return JSONResponse(status_code=202, content=body, headers={"Location": f"/jobs/{job.id}"})
+
+
+def build_jobs_router(registry: Optional[JobRegistry] = None) -> APIRouter:
+    registry = registry or get_job_registry()
+    router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+    def _get(job_id: str) -> Job:
+        job = registry.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+        return job
+
+    @router.get("")
+    def list_jobs(kind: Optional[str] = None, status: Optional[str] = None):
+        return {"jobs": [job.to_dict() for job in registry.list(kind=kind, status=status)]}
+
+    @router.get("/{job_id}")
+    def job_status(job_id: str):
+        return _get(job_id).to_dict()
+
+    @router.get("/{job_id}/result")
+    def job_result(job_id: str):
+        job = _get(job_id)
+        if job.status == SUCCEEDED:
+            return job.result
+        if job.status == FAILED:
+            raise HTTPException(status_code=job.error_status or 500, detail=job.error)
+        if job.status == CANCELLED:
+            raise HTTPException(status_code=410, detail=f"Job {job_id} was cancelled")
+        # Still queued/running: tell the client to keep polling
+        return JSONResponse(status_code=202, content=job.to_dict(), headers={"Retry-After": "5"})
+
+    @router.delete("/{job_id}")
+    def cancel_job(job_id: str):
+        _get(job_id)
+        return registry.cancel(job_id).to_dict()
+
+    return router
@@ -0,0 +1,176 @@
+"""
+GROQ KEY POOL
+
+Every Groq key configured on the host, with quota-aware selection:
+
+- Discovery: ``GROQ_API_KEY``, any ``GROQ_API_KEY_<NAME>`` and the
+  comma-separated ``GROQ_API_KEYS`` list (duplicates collapse).
+- Balancing: ``pick()`` keeps the preferred key while it has headroom,
+  otherwise moves the request to the key with the most tokens left this
+  minute (read from the shared rate limiter) and today (learned from
+  usage and from TPD error messages). ``assign()`` spreads named workers,
+  e.g. the war-sim agents, across keys round-robin.
+- Failover: a "tokens per day" error marks the key exhausted until its
+  advertised reset (or midnight UTC). The mark is also written to the rate
+  limiter's shared state, so every backend on the host stops using the key.
+
+Keys that a client sends with a request are never pooled; only keys found
+in the environment are balanced or swapped.
+"""
+
+import os
+import re
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from prism_common.rate_limiter import RateLimiter, get_rate_limiter, key_id, parse_retry_after
+
+_DAILY_RE = re.compile(r"TPD|RPD|tokens per day|requests per day", re.IGNORECASE)
+_LIMIT_RE = re.compile(r"Limit\s+(\d[\d,]*)", re.IGNORECASE)
+_USED_RE = re.compile(r"Used\s+(\d[\d,]*)", re.IGNORECASE)
+
+
+def discover_keys(prefix: str = "GROQ_API_KEY") -> List[str]:
+    """All distinct keys configured in the environment, default key first."""
+    keys: List[str] = []
+    if os.environ.get(prefix):
+        keys.append(os.environ[prefix])
+    for name in sorted(os.environ):
+        if name.startswith(f"{prefix}_") and os.environ[name]:
+            keys.append(os.environ[name])
+    keys.extend(k.strip() for k in os.environ.get(f"{prefix}S", "").split(",") if k.strip())
+    return list(dict.fromkeys(keys))
+
+
+def is_daily_limit(message: str) -> bool:
+    """True for Groq's per-day quota errors (retrying the same key will not help)."""
+    return bool(_DAILY_RE.search(message or ""))
+
+
+def _seconds_until_utc_midnight() -> float:
+    now = datetime.now(timezone.utc)
+    midnight = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return (midnight - now).total_seconds()
+
+
+class KeyPool:
+    """Quota-aware selection and failover across several API keys."""
+
+    def __init__(self, keys: Iterable[str], rate_limiter: Optional[RateLimiter] = None):
+        self.keys = list(dict.fromkeys(k for k in keys if k))
+        self.rate_limiter = rate_limiter
+        self._lock = threading.Lock()
+        # Per-key daily view: learned limit, tokens used since startup, exhaustion time
+        self._daily: Dict[str, Dict[str, Any]] = {
+            key_id(k): {"limit": None, "used": 0, "exhausted_until": 0.0} for k in self.keys
+        }
+        self._next = 0
+
+    def owns(self, api_key: Optional[str]) -> bool:
+        return bool(api_key) and api_key in self.keys
+
+    # ------------------ HEADROOM ------------------
+
+    def _exhausted(self, api_key: str) -> bool:
+        now = datetime.now(timezone.utc).timestamp()
+        if self._daily[key_id(api_key)]["exhausted_until"] > now:
+            return True
+        # Another backend may have hit the daily limit on this key
+        return self.rate_limiter is not None and self.rate_limiter.snapshot(api_key)["exhausted_for"] > 0
+
+    def _headroom(self, api_key: str) -> float:
+        """Tokens this key can still spend now; 0 when blocked or exhausted."""
+        if self._exhausted(api_key):
+            return 0.0
+
+        minute = float("inf")
+        if self.rate_limiter is not None:
+            snap = self.rate_limiter.snapshot(api_key)
+            if snap["blocked_for"] > 0 or snap["requests"] < 1:
+                return 0.0
+            minute = snap["tokens"]
+
+        daily = self._daily[key_id(api_key)]
+        day = float("inf")
+        if daily["limit"]:
+            day = max(0.0, daily["limit"] - daily["used"])
+        return min(minute, day)
+
+    def healthy(self) -> List[str]:
+        """Keys not known to be out of daily quota."""
+        return [k for k in self.keys if not self._exhausted(k)]
+
+    # ------------------ SELECTION ------------------
+
+    def pick(self, preferred: Optional[str] = None, tokens: int = 0, exclude: Iterable[str] = ()) -> Optional[str]:
+        """Key to use for a call of ``tokens``; None when every key is exhausted."""
+        excluded = set(exclude)
+        candidates = [k for k in self.healthy() if k not in excluded]
+        if not candidates:
+            return None
+        if preferred in candidates and self._headroom(preferred) >= tokens:
+            return preferred
+        return max(candidates, key=self._headroom)
+
+    def assign(self, names: Iterable[str]) -> Dict[str, str]:
+        """Spread ``names`` across healthy keys round-robin (one key each while keys last)."""
+        names = list(names)
+        keys = self.healthy() or self.keys
+        if not keys:
+            return {}
+        with self._lock:
+            start = self._next
+            self._next = (self._next + len(names)) % len(keys)
+        return {name: keys[(start + i) % len(keys)] for i, name in enumerate(names)}
+
+    # ------------------ FEEDBACK ------------------
+
+    def record_usage(self, api_key: Optional[str], tokens: int) -> None:
+        if not self.owns(api_key) or tokens <= 0:
+            return
+        with self._lock:
+            self._daily[key_id(api_key)]["used"] += tokens
+
+    def record_error(self, api_key: Optional[str], error: BaseException) -> bool:
+        """Learn from a failed call; return True if the key was taken out for the day."""
+        message = str(error)
+        if not self.owns(api_key) or not is_daily_limit(message):
+            return False
+
+        reset_in = parse_retry_after(message) or _seconds_until_utc_midnight()
+        with self._lock:
+            daily = self._daily[key_id(api_key)]
+            limit, used = _LIMIT_RE.search(message), _USED_RE.search(message)
+            if limit:
+                daily["limit"] = int(limit.group(1).replace(",", ""))
+            if used:
+                daily["used"] = int(used.group(1).replace(",", ""))
+            daily["exhausted_until"] = datetime.now(timezone.utc).timestamp() + reset_in
+
+        # Shared with the other backends through the limiter's SQLite state
+        if self.rate_limiter is not None:
+            self.rate_limiter.mark_exhausted(api_key, reset_in)
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            key_id(k): {**self._daily[key_id(k)], "headroom": self._headroom(k)}
+            for k in self.keys
+        }
+
+
+# ==========================================================
+# SINGLETON ACCESSOR
+# ==========================================================
+_key_pool: Optional[KeyPool] = None
+_key_pool_lock = threading.Lock()
+
+
+def get_key_pool() -> KeyPool:
+    """Process-wide pool of the Groq keys found in the environment."""
+    global _key_pool
+    with _key_pool_lock:
+        if _key_pool is None:
+            _key_pool = KeyPool(discover_keys(), rate_limiter=get_rate_limiter())
+        return _key_pool
@@ -0,0 +1,367 @@
+"""
+LLM RESPONSE CACHE
+
+Exact-match cache for crew LLM calls. Re-running a crew for the same
+company and competitors produces byte-identical prompts, so the second run
+can be answered from disk instead of Groq.
+
+Usage — swap ``LLM(...)`` for ``cached_llm(...)`` with the same arguments:
+
+    llm = cached_llm(model="groq/llama-3.1-8b-instant", temperature=0.3)
+
+Keys cover the model, endpoint, sampling parameters and the normalized
+message list. Calls that execute native function-calling tools or parse into
+a response model are never cached.
+
+Answers that do miss the cache first wait on the shared rate limiter
+(``prism_common.rate_limiter``) so the call fits the key's RPM/TPM budget;
+cache hits never touch the budget. When the LLM was built with one of the
+host's pooled keys (``prism_common.key_pool``), each call may move to a key
+with more headroom, and a daily-quota error fails over to the next key.
+
+Per-request bypass: wrap the run in ``with bypass_llm_cache():``. Cached
+answers are then ignored, and fresh answers still refresh the cache. The
+backends do this when a client sends ``Cache-Control: no-cache``.
+
+Tuning (environment variables):
+- LLM_CACHE_TTL          seconds an answer stays valid (default 86400 = 24h)
+- LLM_CACHE_MAX_ENTRIES  LRU size cap (default 2000)
+- LLM_CACHE_DISABLED     set to 1/true to turn the cache off
+"""
+
+import hashlib
+import json
+import os
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional, Protocol
+
+from prism_common.cache import DiskCache, default_cache_dir
+from prism_common.jobs import raise_if_cancelled
+from prism_common.key_pool import KeyPool, get_key_pool
+from prism_common.rate_limiter import RateLimiter, estimate_tokens, get_rate_limiter
+from prism_common.streaming import note_task_activity
+
+SAMPLING_PARAMS = (
+    "temperature",
+    "top_p",
+    "n",
+    "max_tokens",
+    "max_completion_tokens",
+    "presence_penalty",
+    "frequency_penalty",
+    "seed",
+    "stop",
+    "reasoning_effort",
+)
+
+_bypass: ContextVar[bool] = ContextVar("prism_llm_cache_bypass", default=False)
+
+
+@contextmanager
+def bypass_llm_cache(active: bool = True) -> Iterator[None]:
+    """Skip cached answers for LLM calls made inside this block.
+
+    Context variables do not cross into ``ThreadPoolExecutor`` workers on
+    their own; submit work with ``contextvars.copy_context().run``.
+    """
+    token = _bypass.set(active)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+def cache_bypassed() -> bool:
+    """True inside a ``bypass_llm_cache()`` block (other caches honour it too)."""
+    return _bypass.get()
+
+
+def no_cache_requested(cache_control: Optional[str]) -> bool:
+    """True when an HTTP ``Cache-Control`` header asks for a fresh answer."""
+    return "no-cache" in (cache_control or "").lower()
+
+
+class CacheBackend(Protocol):
+    """Anything with DiskCache's get/set signature can back the LLM cache."""
+
+    def get(self, key: str) -> Optional[Any]: ...
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None: ...
+
+
+def _normalize_messages(messages: Any) -> Any:
+    if isinstance(messages, str):
+        messages = [{"role": "user", "content": messages}]
+
+    normalized = []
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, str):
+            # Trailing whitespace and line endings never change the answer
+            content = "\n".join(line.rstrip() for line in content.replace("\r\n", "\n").split("\n")).strip()
+        normalized.append({"role": message.get("role"), "content": content})
+    return normalized
+
+
+class LLMResponseCache:
+    """Keys, stores and looks up LLM answers in a pluggable backend."""
+
+    def __init__(self, backend: Optional[CacheBackend], ttl: Optional[float] = None):
+        self.backend = backend
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._stats: Dict[str, int] = {"hits": 0, "misses": 0, "bypassed": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    def key_for(self, llm: Any, messages: Any, tools: Any = None) -> str:
+        params = {name: getattr(llm, name, None) for name in SAMPLING_PARAMS}
+        raw = json.dumps(
+            {
+                "model": getattr(llm, "model", None),
+                "endpoint": getattr(llm, "base_url", None) or getattr(llm, "api_base", None),
+                "params": params,
+                "messages": _normalize_messages(messages),
+                "tools": sorted(str(t.get("name", t)) if isinstance(t, dict) else str(t) for t in tools or []),
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def lookup(self, key: str) -> Optional[str]:
+        if _bypass.get():
+            self._count("bypassed")
+            return None
+        value = self.backend.get(key)
+        self._count("hits" if value is not None else "misses")
+        return value
+
+    def store(self, key: str, value: Any) -> None:
+        # Only plain, non-empty text answers are worth replaying
+        if isinstance(value, str) and value.strip():
+            self.backend.set(key, value, ttl=self.ttl)
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"enabled": self.enabled, **self._stats}
+
+
+# ==========================================================
+# LLM INTEGRATION
+# ==========================================================
+_caching_classes: Dict[type, type] = {}
+_usage_lock = threading.Lock()
+
+
+def _caching_class(base: type) -> type:
+    """Subclass of crewai's concrete LLM class whose ``call``/``acall`` go through the cache."""
+    cls = _caching_classes.get(base)
+    if cls is not None:
+        return cls
+
+    class CachedLLM(base):  # type: ignore[misc, valid-type]
+        _response_cache: Optional[LLMResponseCache] = None
+        _rate_limiter: Optional[RateLimiter] = None
+        _key_pool: Optional[KeyPool] = None
+
+        def _cache_key(self, messages, tools, available_functions, response_model) -> Optional[str]:
+            cache = self._response_cache
+            if cache is None or available_functions or response_model is not None:
+                return None
+            return cache.key_for(self, messages, tools)
+
+        def _estimate(self, messages) -> int:
+            return estimate_tokens(messages, getattr(self, "max_tokens", None))
+
+        # ------------------ KEY POOL ------------------
+
+        def _for_call(self, api_key: str):
+            """Per-call view of this LLM bound to ``api_key``, with its own usage counters.
+
+            One LLM instance serves every task of a crew, some of them at once,
+            so a call never changes the shared instance's key or SDK clients.
+            """
+            llm = object.__new__(type(self))
+            llm.__dict__.update(self.__dict__)
+            llm._token_usage = {name: 0 for name in getattr(self, "_token_usage", {})}
+            if api_key != self.api_key:
+                llm.api_key = api_key
+                # Native providers hold SDK clients bound to the old key
+                for attr in ("client", "async_client"):
+                    client = getattr(llm, attr, None)
+                    if client is not None and hasattr(client, "with_options"):
+                        setattr(llm, attr, client.with_options(api_key=api_key))
+            return llm
+
+        def _pick_key(self, tokens: int) -> str:
+            pool = self._key_pool
+            if pool is not None and pool.owns(self.api_key):
+                return pool.pick(preferred=self.api_key, tokens=tokens) or self.api_key
+            return self.api_key
+
+        def _fail_over(self, api_key: str, error: Exception, tokens: int) -> Optional[str]:
+            """Another pooled key after a daily-quota error on ``api_key``; None when none is left."""
+            pool = self._key_pool
+            if pool is None or not pool.record_error(api_key, error):
+                return None
+            return pool.pick(tokens=tokens)
+
+        def _settle(self, llm: Any, api_key: str, usage: Dict[str, Any]) -> None:
+            """Charge the call's own tokens to its key and add them to the instance totals."""
+            spent = llm._token_usage
+            usage["tokens"] = int(spent.get("total_tokens", 0) or 0)
+            if spent:
+                with _usage_lock:
+                    for name, value in spent.items():
+                        self._token_usage[name] = self._token_usage.get(name, 0) + value
+            if self._key_pool is not None:
+                self._key_pool.record_usage(api_key, usage["tokens"])
+
+        # ------------------ CALLS ------------------
+
+        def _metered_call(self, messages, **kwargs):
+            tokens = self._estimate(messages)
+            api_key = self._pick_key(tokens)
+            while True:
+                llm = self._for_call(api_key)
+                try:
+                    with self._rate_limiter.reserve(api_key, tokens) as usage:
+                        try:
+                            return base.call(llm, messages, **kwargs)
+                        finally:
+                            self._settle(llm, api_key, usage)
+                except Exception as e:
+                    api_key = self._fail_over(api_key, e, tokens)
+                    if api_key is None:
+                        raise
+
+        async def _ametered_call(self, messages, **kwargs):
+            tokens = self._estimate(messages)
+            api_key = self._pick_key(tokens)
+            while True:
+                llm = self._for_call(api_key)
+                try:
+                    async with self._rate_limiter.areserve(api_key, tokens) as usage:
+                        try:
+                            return await base.acall(llm, messages, **kwargs)
+                        finally:
+                            self._settle(llm, api_key, usage)
+                except Exception as e:
+                    api_key = self._fail_over(api_key, e, tokens)
+                    if api_key is None:
+                        raise
+
+        def call(self, messages, tools=None, callbacks=None, available_functions=None,
+                 from_task=None, from_agent=None, response_model=None):
+            # A cancelled background job stops at its next LLM call
+            raise_if_cancelled()
+            note_task_activity(from_task)
+            key = self._cache_key(messages, tools, available_functions, response_model)
+            if key is not None:
+                cached = self._response_cache.lookup(key)
+                if cached is not None:
+                    return cached
+
+            kwargs = dict(tools=tools, callbacks=callbacks, available_functions=available_functions,
+                          from_task=from_task, from_agent=from_agent, response_model=response_model)
+            if self._rate_limiter is None:
+                result = super().call(messages, **kwargs)
+            else:
+                result = self._metered_call(messages, **kwargs)
+
+            if key is not None:
+                self._response_cache.store(key, result)
+            return result
+
+        async def acall(self, messages, tools=None, callbacks=None, available_functions=None,
+                        from_task=None, from_agent=None, response_model=None):
+            # A cancelled background job stops at its next LLM call
+            raise_if_cancelled()
+            note_task_activity(from_task)
+            key = self._cache_key(messages, tools, available_functions, response_model)
+            if key is not None:
+                cached = self._response_cache.lookup(key)
+                if cached is not None:
+                    return cached
+
+            kwargs = dict(tools=tools, callbacks=callbacks, available_functions=available_functions,
+                          from_task=from_task, from_agent=from_agent, response_model=response_model)
+            if self._rate_limiter is None:
+                result = await super().acall(messages, **kwargs)
+            else:
+                result = await self._ametered_call(messages, **kwargs)
+
+            if key is not None:
+                self._response_cache.store(key, result)
+            return result
+
+    CachedLLM.__name__ = CachedLLM.__qualname__ = f"Cached{base.__name__}"
+    _caching_classes[base] = CachedLLM
+    return CachedLLM
+
+
+def cached_llm(
+    cache: Optional[LLMResponseCache] = None,
+    rate_limiter: Optional[RateLimiter] = None,
+    **llm_kwargs: Any,
+):
+    """Drop-in replacement for ``crewai.LLM(**llm_kwargs)`` with response caching
+    and the shared rate limiter.
+
+    ``crewai.LLM`` is a factory that may return a native provider class
+    (e.g. OpenAI-compatible endpoints), so both are layered onto whatever
+    instance it produces rather than onto a fixed subclass.
+    """
+    from crewai import LLM
+
+    llm = LLM(**llm_kwargs)
+    cache = cache or get_llm_cache()
+    rate_limiter = rate_limiter or get_rate_limiter()
+    if not cache.enabled and rate_limiter is None:
+        return llm
+
+    llm.__class__ = _caching_class(type(llm))
+    llm._response_cache = cache if cache.enabled else None
+    llm._rate_limiter = rate_limiter
+    llm._key_pool = get_key_pool() if rate_limiter is not None else None
+    return llm
+
+
+# ==========================================================
+# SINGLETON ACCESSOR
+# ==========================================================
+_llm_cache: Optional[LLMResponseCache] = None
+_llm_cache_lock = threading.Lock()
+
+
+def set_llm_cache(cache: LLMResponseCache) -> None:
+    """Install a custom cache (e.g. another backend) for every later ``cached_llm``."""
+    global _llm_cache
+    with _llm_cache_lock:
+        _llm_cache = cache
+
+
+def get_llm_cache() -> LLMResponseCache:
+    global _llm_cache
+    with _llm_cache_lock:
+        if _llm_cache is None:
+            if os.environ.get("LLM_CACHE_DISABLED", "").strip().lower() in ("1", "true", "yes", "on"):
+                _llm_cache = LLMResponseCache(None)
+            else:
+                ttl = float(os.environ.get("LLM_CACHE_TTL", 24 * 3600))
+                backend = DiskCache(
+                    default_cache_dir() / "llm.sqlite",
+                    default_ttl=ttl,
+                    max_entries=int(os.environ.get("LLM_CACHE_MAX_ENTRIES", 2000)),
+                )
+                _llm_cache = LLMResponseCache(backend, ttl=ttl)
+        return _llm_cache
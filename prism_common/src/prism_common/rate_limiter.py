@@ -0,0 +1,283 @@
+"""
+SHARED RATE LIMITER
+
+Proactive token-bucket limiter for Groq calls. Every API key gets two
+buckets, requests/minute and tokens/minute, stored in one SQLite file. All
+backends on the host (ports 8000-8003) therefore draw from the same budget.
+A call waits just long enough for both buckets to cover it, instead of
+firing, getting a 429 and sleeping 15-60 s in ``run_with_rate_limit_retry``.
+
+Tuning (environment variables):
+- GROQ_RPM_LIMIT        requests per minute per key (default 30)
+- GROQ_TPM_LIMIT        tokens per minute per key (default 6000)
+- RATE_LIMIT_DISABLED   set to 1/true to turn the limiter off
+"""
+
+import asyncio
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator, Optional
+
+from prism_common.cache import default_cache_dir
+
+_RETRY_IN_RE = re.compile(
+    r"try again in\s*(?:(\d+)h)?\s*(?:(\d+)m)?\s*([0-9]+(?:\.[0-9]+)?)\s*s", re.IGNORECASE
+)
+
+
+def key_id(api_key: Optional[str]) -> str:
+    """Stable, non-reversible identifier for an API key (raw keys never hit disk)."""
+    if not api_key:
+        return "default"
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+
+def estimate_tokens(messages: Any, max_tokens: Optional[int] = None) -> int:
+    """Rough prompt+completion estimate (~4 characters per token)."""
+    if isinstance(messages, str):
+        text = messages
+    else:
+        text = "".join(str(m.get("content", "")) for m in messages or [])
+    return len(text) // 4 + int(max_tokens or 512)
+
+
+def parse_retry_after(message: str) -> Optional[float]:
+    """Seconds from Groq's 'Please try again in 1m2.5s' style messages."""
+    match = _RETRY_IN_RE.search(message or "")
+    if not match:
+        return None
+    hours, minutes = int(match.group(1) or 0), int(match.group(2) or 0)
+    return hours * 3600 + minutes * 60 + float(match.group(3))
+
+
+class RateLimiter:
+    """Cross-process RPM + TPM token buckets keyed by API key."""
+
+    def __init__(self, path: Path, rpm: float = 30, tpm: float = 6000):
+        self.path = Path(path)
+        self.rpm = rpm
+        self.tpm = tpm
+        self._lock = threading.Lock()
+        self._stats: Dict[str, float] = {"acquired": 0, "waited": 0, "wait_seconds": 0.0, "penalties": 0}
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False, isolation_level=None)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS buckets (
+                    key_id TEXT PRIMARY KEY,
+                    requests REAL NOT NULL,
+                    tokens REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    blocked_until REAL NOT NULL DEFAULT 0,
+                    exhausted_until REAL NOT NULL DEFAULT 0
+                )
+                """
+            )
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(buckets)")}
+            if "exhausted_until" not in columns:
+                self._conn.execute("ALTER TABLE buckets ADD COLUMN exhausted_until REAL NOT NULL DEFAULT 0")
+
+    # ------------------ BUCKET MATH ------------------
+
+    def _try_take(self, kid: str, tokens: int) -> float:
+        """Atomically take one request + ``tokens``; return 0 on success or seconds to wait."""
+        now = time.time()
+        tokens = min(tokens, self.tpm)  # a single oversized call must still fit eventually
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT requests, tokens, updated_at, blocked_until FROM buckets WHERE key_id = ?", (kid,)
+                ).fetchone()
+                if row is None:
+                    requests_left, tokens_left, updated_at, blocked_until = self.rpm, self.tpm, now, 0.0
+                else:
+                    requests_left, tokens_left, updated_at, blocked_until = row
+
+                # Refill both buckets for the time elapsed since the last update
+                elapsed = max(0.0, now - updated_at)
+                requests_left = min(self.rpm, requests_left + elapsed * self.rpm / 60.0)
+                tokens_left = min(self.tpm, tokens_left + elapsed * self.tpm / 60.0)
+
+                if blocked_until > now:
+                    wait = blocked_until - now
+                elif requests_left >= 1 and tokens_left >= tokens:
+                    requests_left -= 1
+                    tokens_left -= tokens
+                    wait = 0.0
+                else:
+                    wait = max(
+                        (1 - requests_left) * 60.0 / self.rpm if requests_left < 1 else 0.0,
+                        (tokens - tokens_left) * 60.0 / self.tpm if tokens_left < tokens else 0.0,
+                    )
+
+                self._conn.execute(
+                    "INSERT INTO buckets (key_id, requests, tokens, updated_at, blocked_until) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT(key_id) DO UPDATE SET requests = excluded.requests, tokens = excluded.tokens, "
+                    "updated_at = excluded.updated_at",
+                    (kid, requests_left, tokens_left, now, blocked_until),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return wait
+
+    # ------------------ PUBLIC API ------------------
+
+    def snapshot(self, api_key: Optional[str]) -> Dict[str, float]:
+        """Current (refilled) budget for a key without taking anything from it."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT requests, tokens, updated_at, blocked_until, exhausted_until FROM buckets WHERE key_id = ?",
+                (key_id(api_key),),
+            ).fetchone()
+        if row is None:
+            return {"requests": self.rpm, "tokens": self.tpm, "blocked_for": 0.0, "exhausted_for": 0.0}
+        requests_left, tokens_left, updated_at, blocked_until, exhausted_until = row
+        elapsed = max(0.0, now - updated_at)
+        return {
+            "requests": min(self.rpm, requests_left + elapsed * self.rpm / 60.0),
+            "tokens": min(self.tpm, tokens_left + elapsed * self.tpm / 60.0),
+            "blocked_for": max(0.0, blocked_until - now),
+            "exhausted_for": max(0.0, exhausted_until - now),
+        }
+
+    def acquire(self, api_key: Optional[str], tokens: int) -> float:
+        """Block until the key's budget covers one request of ``tokens``; return seconds waited."""
+        kid = key_id(api_key)
+        waited = 0.0
+        while True:
+            wait = self._try_take(kid, tokens)
+            if wait <= 0:
+                break
+            # Small pad so we wake after the refill, not just before it
+            time.sleep(wait + 0.05)
+            waited += wait + 0.05
+        self._record_wait(waited)
+        return waited
+
+    async def aacquire(self, api_key: Optional[str], tokens: int) -> float:
+        """Event-loop variant of ``acquire``; sleeps without blocking the loop."""
+        kid = key_id(api_key)
+        waited = 0.0
+        while True:
+            wait = await asyncio.to_thread(self._try_take, kid, tokens)
+            if wait <= 0:
+                break
+            await asyncio.sleep(wait + 0.05)
+            waited += wait + 0.05
+        self._record_wait(waited)
+        return waited
+
+    def _record_wait(self, waited: float) -> None:
+        with self._lock:
+            self._stats["acquired"] += 1
+            if waited:
+                self._stats["waited"] += 1
+                self._stats["wait_seconds"] += waited
+
+    def adjust(self, api_key: Optional[str], delta_tokens: int) -> None:
+        """Correct the token bucket once real usage is known (positive = used more than estimated)."""
+        if not delta_tokens:
+            return
+        with self._lock:
+            self._conn.execute(
+                "UPDATE buckets SET tokens = MIN(?, tokens - ?) WHERE key_id = ?",
+                (self.tpm, delta_tokens, key_id(api_key)),
+            )
+
+    def penalize(self, api_key: Optional[str], seconds: float) -> None:
+        """Block the key for ``seconds`` across every process (after an unexpected 429)."""
+        until = time.time() + max(0.0, seconds)
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO buckets (key_id, requests, tokens, updated_at, blocked_until) VALUES (?, 0, 0, ?, ?) "
+                "ON CONFLICT(key_id) DO UPDATE SET requests = 0, updated_at = excluded.updated_at, "
+                "blocked_until = MAX(blocked_until, excluded.blocked_until)",
+                (key_id(api_key), time.time(), until),
+            )
+            self._stats["penalties"] += 1
+
+    def mark_exhausted(self, api_key: Optional[str], seconds: float) -> None:
+        """Record a daily-quota exhaustion for every process; ``acquire`` does not wait on it."""
+        until = time.time() + max(0.0, seconds)
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO buckets (key_id, requests, tokens, updated_at, exhausted_until) "
+                "VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(key_id) DO UPDATE SET exhausted_until = MAX(exhausted_until, excluded.exhausted_until)",
+                (key_id(api_key), self.rpm, self.tpm, time.time(), until),
+            )
+
+    def _settle(self, api_key: Optional[str], estimated_tokens: int, usage: Dict[str, Any]) -> None:
+        if usage["tokens"]:
+            self.adjust(api_key, int(usage["tokens"]) - estimated_tokens)
+
+    def _on_error(self, api_key: Optional[str], error: Exception) -> None:
+        # Per-minute limits reset within a minute; longer waits are daily quotas,
+        # which callers (e.g. the key pool) handle by switching keys instead
+        retry_after = parse_retry_after(str(error))
+        if retry_after is not None and retry_after <= 60:
+            self.penalize(api_key, retry_after)
+
+    @contextmanager
+    def reserve(self, api_key: Optional[str], estimated_tokens: int) -> Iterator[Dict[str, Any]]:
+        """Acquire budget for one call; set ``usage["tokens"]`` inside the block to settle up."""
+        self.acquire(api_key, estimated_tokens)
+        usage: Dict[str, Any] = {"tokens": None}
+        try:
+            yield usage
+        except Exception as e:
+            self._on_error(api_key, e)
+            raise
+        self._settle(api_key, estimated_tokens, usage)
+
+    @asynccontextmanager
+    async def areserve(self, api_key: Optional[str], estimated_tokens: int) -> AsyncIterator[Dict[str, Any]]:
+        """Async counterpart of ``reserve``."""
+        await self.aacquire(api_key, estimated_tokens)
+        usage: Dict[str, Any] = {"tokens": None}
+        try:
+            yield usage
+        except Exception as e:
+            self._on_error(api_key, e)
+            raise
+        self._settle(api_key, estimated_tokens, usage)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"enabled": True, "rpm": self.rpm, "tpm": self.tpm, **self._stats}
+
+
+# ==========================================================
+# SINGLETON ACCESSOR
+# ==========================================================
+_rate_limiter: Optional[RateLimiter] = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> Optional[RateLimiter]:
+    """Process-wide limiter backed by the host-wide SQLite file, or None when disabled."""
+    global _rate_limiter
+    if os.environ.get("RATE_LIMIT_DISABLED", "").strip().lower() in ("1", "true", "yes", "on"):
+        return None
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            _rate_limiter = RateLimiter(
+                default_cache_dir() / "ratelimit.sqlite",
+                rpm=float(os.environ.get("GROQ_RPM_LIMIT", 30)),
+                tpm=float(os.environ.get("GROQ_TPM_LIMIT", 6000)),
+            )
+        return _rate_limiter
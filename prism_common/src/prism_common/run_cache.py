@@ -0,0 +1,267 @@
+"""
+RUN RESULT CACHE
+
+Whole-run answers for the crew endpoints. A request identical to a recent
+one (same crew, company, competitors, segment, scenario, and crew config
+version) is answered without running the crew again. Dashboards mostly ask
+about the same few brands.
+
+    body = cached_run("twin", {"company": company}, lambda: run(company),
+                      version=templates.version)
+
+Lifecycle of a stored result (stale-while-revalidate):
+- fresh     younger than PRISM_RUN_CACHE_TTL: served as is
+- stale     up to PRISM_RUN_CACHE_STALE seconds past the TTL: served at
+            once while one background refresh recomputes it
+- expired   older than that: recomputed before answering
+The crew's daily Groq quota may be exhausted (``DailyRateLimitError``, or a
+"tokens per day" error from the provider). The last good result, of any
+age up to PRISM_RUN_CACHE_MAX_AGE, is then served instead of the error.
+
+Every answer carries a ``cache`` entry: ``{"status": "miss" | "fresh" |
+"stale", "age_seconds", ...}``. A stale answer also says why: ``refreshing``
+is set, or ``reason`` is "daily quota exhausted". Identical misses in one
+process wait for a single computation. Results live in a shared SQLite file,
+so every backend process on the host sees them.
+
+``bypass_llm_cache()`` (``Cache-Control: no-cache``) skips cached runs as
+well. The fresh result still replaces the stored one.
+
+Background refreshes run in an empty context: they report to no stream or
+job, and they are never cancelled with the request that triggered them.
+
+Tuning (environment variables):
+- PRISM_RUN_CACHE_TTL              seconds a result is fresh (default 3600)
+- PRISM_RUN_CACHE_STALE            seconds past the TTL a result is served while
+                                   it refreshes (default 86400)
+- PRISM_RUN_CACHE_MAX_AGE          seconds a result is kept as the quota
+                                   fallback (default 604800 = 7 days)
+- PRISM_RUN_CACHE_MAX_ENTRIES      LRU size cap (default 500)
+- PRISM_RUN_CACHE_REFRESH_WORKERS  background refreshes at once (default 1)
+- PRISM_RUN_CACHE_DISABLED         set to 1/true to always run the crew
+"""
+
+import contextvars
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple, Type
+
+from prism_common.cache import DiskCache, default_cache_dir
+from prism_common.key_pool import is_daily_limit
+from prism_common.llm_cache import cache_bypassed
+
+logger = logging.getLogger(__name__)
+
+QUOTA_REASON = "daily quota exhausted"
+
+
+def is_quota_error(error: BaseException, fallback_errors: Tuple[Type[BaseException], ...] = ()) -> bool:
+    """True when retrying now cannot succeed: a daily token/request quota is spent."""
+    return isinstance(error, fallback_errors) or is_daily_limit(str(error))
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return " ".join(value.split()).casefold()
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items()}
+    return value
+
+
+class RunCache:
+    """Stores, serves and refreshes whole-run results in a pluggable backend."""
+
+    def __init__(
+        self,
+        backend: Optional[DiskCache],
+        ttl: float = 3600.0,
+        stale: float = 86400.0,
+        refresh_workers: int = 1,
+    ):
+        self.backend = backend
+        self.ttl = ttl
+        self.stale = stale
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, List[Any]] = {}
+        self._refreshing: Set[str] = set()
+        self._refresher = ThreadPoolExecutor(max_workers=max(refresh_workers, 1), thread_name_prefix="prism-run-refresh")
+        self._stats: Dict[str, int] = {"fresh": 0, "stale": 0, "misses": 0, "fallbacks": 0, "refreshes": 0, "refresh_errors": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    def key_for(self, crew: str, fields: Dict[str, Any], version: str = "") -> str:
+        raw = json.dumps({"crew": crew, "version": version, "fields": _normalize(fields)}, sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    # ------------------ SERVE ------------------
+
+    def run(
+        self,
+        crew: str,
+        fields: Dict[str, Any],
+        compute: Callable[[], Dict[str, Any]],
+        version: str = "",
+        cacheable: Optional[Callable[[Dict[str, Any]], bool]] = None,
+        fallback_errors: Tuple[Type[BaseException], ...] = (),
+    ) -> Dict[str, Any]:
+        """``compute()``'s JSON-safe result dict, from the cache when possible, plus a ``cache`` entry.
+
+        ``cacheable`` rejects results that must not be replayed (e.g. partial
+        ones); ``fallback_errors`` are exception types that, like daily-quota
+        errors, are answered with the last good result.
+        """
+        if not self.enabled:
+            return compute()
+
+        key = self.key_for(crew, fields, version)
+        bypass = cache_bypassed()
+        entry = None if bypass else self.backend.get(key)
+        if entry is not None:
+            age = time.time() - entry["created_at"]
+            if age < self.ttl:
+                self._count("fresh")
+                return self._answer(entry, "fresh")
+            if age < self.ttl + self.stale:
+                self._count("stale")
+                self._refresh(key, compute, cacheable)
+                return self._answer(entry, "stale", refreshing=True)
+
+        with self._single_flight(key):
+            if not bypass:
+                # An identical request may have computed it while this one waited
+                entry = self.backend.get(key)
+                if entry is not None and time.time() - entry["created_at"] < self.ttl:
+                    self._count("fresh")
+                    return self._answer(entry, "fresh")
+            try:
+                value = compute()
+            except Exception as e:
+                if is_quota_error(e, fallback_errors):
+                    entry = self.backend.get(key)
+                    if entry is not None:
+                        logger.warning("%s: %s, serving the result from %.0fs ago", crew, QUOTA_REASON, time.time() - entry["created_at"])
+                        self._count("fallbacks")
+                        return self._answer(entry, "stale", reason=QUOTA_REASON)
+                raise
+            self._count("misses")
+            self._store(key, value, cacheable)
+            return {**value, "cache": {"status": "miss", "age_seconds": 0}}
+
+    def _answer(self, entry: Dict[str, Any], status: str, **extra: Any) -> Dict[str, Any]:
+        meta = {"status": status, "age_seconds": int(time.time() - entry["created_at"]), **extra}
+        return {**entry["value"], "cache": meta}
+
+    def _store(self, key: str, value: Dict[str, Any], cacheable: Optional[Callable[[Dict[str, Any]], bool]]) -> None:
+        if not isinstance(value, dict) or (cacheable is not None and not cacheable(value)):
+            return
+        try:
+            self.backend.set(key, {"value": value, "created_at": time.time()})
+        except (TypeError, ValueError) as e:
+            logger.warning("run result not stored (not JSON-serialisable): %s", e)
+
+    # ------------------ REFRESH ------------------
+
+    @contextmanager
+    def _single_flight(self, key: str) -> Iterator[None]:
+        with self._lock:
+            slot = self._inflight.setdefault(key, [threading.Lock(), 0])
+            slot[1] += 1
+        try:
+            with slot[0]:
+                yield
+        finally:
+            with self._lock:
+                slot[1] -= 1
+                if not slot[1]:
+                    del self._inflight[key]
+
+    def _refresh(self, key: str, compute: Callable[[], Dict[str, Any]], cacheable) -> None:
+        """Recompute ``key`` in the background unless a refresh of it is already running."""
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        self._refresher.submit(contextvars.Context().run, self._refresh_job, key, compute, cacheable)
+
+    def _refresh_job(self, key: str, compute: Callable[[], Dict[str, Any]], cacheable) -> None:
+        try:
+            with self._single_flight(key):
+                value = compute()
+            self._store(key, value, cacheable)
+            self._count("refreshes")
+        except Exception as e:
+            # The stale result stays; the next request past the TTL tries again
+            self._count("refresh_errors")
+            logger.warning("background refresh failed: %s", e)
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    # ------------------ STATS ------------------
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"enabled": self.enabled, "refreshing": len(self._refreshing), **self._stats}
+
+
+# ==========================================================
+# SINGLETON ACCESSOR
+# ==========================================================
+_run_cache: Optional[RunCache] = None
+_run_cache_lock = threading.Lock()
+
+
+def set_run_cache(cache: RunCache) -> None:
+    """Install a custom run cache (e.g. another backend or TTL) for every later ``cached_run``."""
+    global _run_cache
+    with _run_cache_lock:
+        _run_cache = cache
+
+
+def get_run_cache() -> RunCache:
+    global _run_cache
+    with _run_cache_lock:
+        if _run_cache is None:
+            if os.environ.get("PRISM_RUN_CACHE_DISABLED", "").strip().lower() in ("1", "true", "yes", "on"):
+                _run_cache = RunCache(None)
+            else:
+                ttl = float(os.environ.get("PRISM_RUN_CACHE_TTL", 3600))
+                stale = float(os.environ.get("PRISM_RUN_CACHE_STALE", 86400))
+                max_age = float(os.environ.get("PRISM_RUN_CACHE_MAX_AGE", 7 * 86400))
+                backend = DiskCache(
+                    default_cache_dir() / "runs.sqlite",
+                    default_ttl=max(max_age, ttl + stale),
+                    max_entries=int(os.environ.get("PRISM_RUN_CACHE_MAX_ENTRIES", 500)),
+                )
+                _run_cache = RunCache(
+                    backend,
+                    ttl=ttl,
+                    stale=stale,
+                    refresh_workers=int(os.environ.get("PRISM_RUN_CACHE_REFRESH_WORKERS", 1)),
+                )
+        return _run_cache
+
+
+def cached_run(
+    crew: str,
+    fields: Dict[str, Any],
+    compute: Callable[[], Dict[str, Any]],
+    version: str = "",
+    **kwargs: Any,
+) -> Dict[str, Any]:
+    """``get_run_cache().run(...)``: the run's result dict, cached per ``crew`` + ``fields`` + ``version``."""
+    return get_run_cache().run(crew, fields, compute, version=version, **kwargs)
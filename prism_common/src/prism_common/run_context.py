@@ -0,0 +1,41 @@
+"""
+RUN CONTEXT
+
+Request-scoped credentials and model choice for one crew run.
+
+Backends build a ``RunContext`` from the incoming request (e.g. the
+``X-Groq-Api-Key`` header) and pass it down to the crew, which hands the
+values straight to its ``LLM(...)`` construction. Nothing is written to
+``os.environ``, so concurrent requests in one process can each use their
+own key without overwriting each other.
+"""
+
+import os
+from dataclasses import dataclass, replace
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class RunContext:
+    """Immutable per-run settings; ``None`` fields fall back to the environment."""
+
+    groq_api_key: Optional[str] = None
+    model: Optional[str] = None
+
+    def api_key_or_env(self, env_var: str = "GROQ_API_KEY") -> Optional[str]:
+        """The request's key, else the process default from ``env_var``."""
+        return self.groq_api_key or os.environ.get(env_var)
+
+    def model_or(self, default: Optional[str] = None, env_var: Optional[str] = None) -> Optional[str]:
+        """The request's model, else ``env_var`` (when given), else ``default``."""
+        if self.model:
+            return self.model
+        if env_var and os.environ.get(env_var):
+            return os.environ[env_var]
+        return default
+
+    def with_overrides(self, **changes) -> "RunContext":
+        return replace(self, **{k: v for k, v in changes.items() if v is not None})
+
+
+DEFAULT_CONTEXT = RunContext()
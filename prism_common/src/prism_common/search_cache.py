@@ -0,0 +1,132 @@
+"""
+SERPER SEARCH CACHE
+
+Shared on-disk cache for google.serper.dev responses. Every crew points at
+the same SQLite file, so a brand searched by the twin crew is served from
+disk when the customer or feedback crew asks for it a few minutes later.
+
+Tuning (environment variables):
+- SERPER_CACHE_TTL          seconds an entry stays fresh (default 21600 = 6h)
+- SERPER_CACHE_MAX_ENTRIES  LRU size cap (default 5000)
+- SERPER_CACHE_DISABLED     set to 1/true to bypass the cache entirely
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import threading
+import unicodedata
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from prism_common.cache import DiskCache, default_cache_dir
+
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_EDGE_PUNCT = " \t\n\"'`.,;:!?"
+
+
+def normalize_query(query: str) -> str:
+    """Map trivially different spellings of a query to one canonical form.
+
+    Unicode is NFKC-folded, case is dropped, runs of whitespace collapse
+    to a single space and stray quotes/punctuation at the ends are removed,
+    so " Apple  Reviews?" and "apple reviews" share a cache entry.
+    """
+    text = unicodedata.normalize("NFKC", query or "")
+    text = _WHITESPACE_RE.sub(" ", text.casefold())
+    return text.strip(_EDGE_PUNCT)
+
+
+def cache_key(endpoint: str, payload: Dict[str, Any]) -> str:
+    """Stable key for a Serper request (endpoint + normalized payload)."""
+    normalized = dict(payload)
+    if "q" in normalized:
+        normalized["q"] = normalize_query(str(normalized["q"]))
+    raw = json.dumps({"endpoint": endpoint, "payload": normalized}, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _env_flag(name: str) -> bool:
+    return os.environ.get(name, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+class SearchCache:
+    """Read-through cache in front of a Serper fetch function."""
+
+    def __init__(self, store: Optional[DiskCache] = None, enabled: bool = True):
+        self.store = store
+        self.enabled = enabled and store is not None
+
+    def get_or_fetch(
+        self,
+        endpoint: str,
+        payload: Dict[str, Any],
+        fetch: Callable[[], Dict[str, Any]],
+        ttl: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Return the cached response for ``payload`` or call ``fetch`` and store it.
+
+        Only successful fetches are cached; exceptions from ``fetch``
+        propagate unchanged so each tool keeps its own error handling.
+        """
+        if not self.enabled:
+            return fetch()
+
+        key = cache_key(endpoint, payload)
+        cached = self.store.get(key)
+        if cached is not None:
+            return cached
+
+        data = fetch()
+        self.store.set(key, data, ttl=ttl)
+        return data
+
+    async def aget_or_fetch(
+        self,
+        endpoint: str,
+        payload: Dict[str, Any],
+        fetch: Callable[[], Awaitable[Dict[str, Any]]],
+        ttl: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Async counterpart of ``get_or_fetch``; SQLite I/O runs off the event loop."""
+        if not self.enabled:
+            return await fetch()
+
+        key = cache_key(endpoint, payload)
+        cached = await asyncio.to_thread(self.store.get, key)
+        if cached is not None:
+            return cached
+
+        data = await fetch()
+        await asyncio.to_thread(self.store.set, key, data, ttl)
+        return data
+
+    def stats(self) -> Dict[str, Any]:
+        if not self.enabled:
+            return {"enabled": False}
+        return {"enabled": True, **self.store.stats()}
+
+
+# ==========================================================
+# SINGLETON ACCESSOR
+# ==========================================================
+_search_cache: Optional[SearchCache] = None
+_search_cache_lock = threading.Lock()
+
+
+def get_search_cache() -> SearchCache:
+    global _search_cache
+    with _search_cache_lock:
+        if _search_cache is None:
+            if _env_flag("SERPER_CACHE_DISABLED"):
+                _search_cache = SearchCache(enabled=False)
+            else:
+                store = DiskCache(
+                    default_cache_dir() / "serper.sqlite",
+                    default_ttl=float(os.environ.get("SERPER_CACHE_TTL", 6 * 3600)),
+                    max_entries=int(os.environ.get("SERPER_CACHE_MAX_ENTRIES", 5000)),
+                )
+                _search_cache = SearchCache(store)
+        return _search_cache
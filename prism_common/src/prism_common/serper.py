@@ -0,0 +1,208 @@
+"""
+SERPER CLIENT
+
+Single entry point used by every crew's Serper tool. Responses go through
+the shared search cache, so repeated searches for the same brand are
+answered from disk instead of google.serper.dev, and misses go out over the
+shared keep-alive HTTP client with connect/read deadlines and retries.
+``serper_search_many`` fans a list of targeted queries out concurrently and
+merges them into one deduplicated result set (same link, then near-duplicate
+title + snippet; see prism_common.dedupe).
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Tuple
+
+from prism_common.dedupe import dedupe_results
+from prism_common.http_client import get_async_http_client, get_http_client
+from prism_common.search_cache import get_search_cache, normalize_query
+
+SERPER_SEARCH_URL = "https://google.serper.dev/search"
+# Covers the crews' batches of targeted queries (5-6) in one round trip
+MAX_CONCURRENCY = 8
+
+
+def _build_payload(query: str, num: Optional[int]) -> Dict[str, Any]:
+    payload: Dict[str, Any] = {"q": query}
+    if num is not None:
+        payload["num"] = num
+    return payload
+
+
+def serper_search(
+    query: str,
+    api_key: Optional[str],
+    num: Optional[int] = None,
+    timeout: Optional[Any] = None,
+    use_cache: bool = True,
+) -> Dict[str, Any]:
+    """Run a Serper web search and return the raw JSON response.
+
+    ``timeout`` overrides the client's (connect, read) deadlines. Raises
+    ``requests.HTTPError`` (or any other ``requests`` exception) on failure;
+    callers decide whether to surface or swallow it.
+    """
+    payload = _build_payload(query, num)
+
+    def fetch() -> Dict[str, Any]:
+        headers = {"X-API-KEY": api_key, "Content-Type": "application/json"}
+        # Search is read-only, so the POST is safe to retry
+        response = get_http_client().post(
+            SERPER_SEARCH_URL, headers=headers, json=payload, timeout=timeout, idempotent=True
+        )
+        response.raise_for_status()
+        return response.json()
+
+    if not use_cache:
+        return fetch()
+
+    return get_search_cache().get_or_fetch(SERPER_SEARCH_URL, payload, fetch)
+
+
+async def serper_search_async(
+    query: str,
+    api_key: Optional[str],
+    num: Optional[int] = None,
+    use_cache: bool = True,
+) -> Dict[str, Any]:
+    """Event-loop variant of ``serper_search``.
+
+    Raises ``httpx.HTTPStatusError`` (or another ``httpx`` exception) on failure.
+    """
+    payload = _build_payload(query, num)
+
+    async def fetch() -> Dict[str, Any]:
+        headers = {"X-API-KEY": api_key, "Content-Type": "application/json"}
+        client = get_async_http_client()
+        response = await client.post(SERPER_SEARCH_URL, headers=headers, json=payload, idempotent=True)
+        response.raise_for_status()
+        return response.json()
+
+    if not use_cache:
+        return await fetch()
+
+    return await get_search_cache().aget_or_fetch(SERPER_SEARCH_URL, payload, fetch)
+
+
+# ==========================================================
+# BATCHED FAN-OUT
+# ==========================================================
+def _result_key(item: Dict[str, Any]) -> str:
+    link = (item.get("link") or item.get("url") or "").strip().lower()
+    if link:
+        link = link.split("#", 1)[0].rstrip("/")
+        for prefix in ("https://", "http://", "www."):
+            if link.startswith(prefix):
+                link = link[len(prefix):]
+        return link
+    return normalize_query(f"{item.get('title', '')} {item.get('snippet', '')}")
+
+
+def merge_results(
+    responses: List[Tuple[str, Dict[str, Any]]],
+    max_results: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Merge several Serper responses into one deduplicated ``organic`` list.
+
+    Results are interleaved by rank (every query's #1, then every #2, ...)
+    so a ``max_results`` cap keeps the best hit of each query. Each item is
+    tagged with the ``query`` that produced it; duplicates (same link, or
+    same title+snippet when there is no link) keep their first occurrence.
+    Syndicated copies under other links are then dropped as near duplicates.
+    """
+    ranked = [
+        [dict(item, query=query) for item in (data.get("organic") or [])]
+        for query, data in responses
+    ]
+
+    merged: List[Dict[str, Any]] = []
+    seen = set()
+    depth = max((len(items) for items in ranked), default=0)
+    for rank in range(depth):
+        for items in ranked:
+            if rank >= len(items):
+                continue
+            key = _result_key(items[rank])
+            if key in seen:
+                continue
+            seen.add(key)
+            merged.append(items[rank])
+
+    merged = dedupe_results(merged)
+    if max_results is not None:
+        merged = merged[:max_results]
+    return {"queries": [query for query, _ in responses], "organic": merged}
+
+
+def serper_search_many(
+    queries: List[str],
+    api_key: Optional[str],
+    num: Optional[int] = None,
+    max_concurrency: int = MAX_CONCURRENCY,
+    max_results: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Run several targeted searches concurrently and merge the results.
+
+    At most ``max_concurrency`` requests are in flight; the default covers
+    the crews' query batches, so wall time stays close to a single round
+    trip. Larger batches take one round trip per ``max_concurrency``
+    queries. A failing query
+    is reported under ``errors`` instead of sinking the batch; if every
+    query fails the first exception is raised.
+    """
+    unique = list(dict.fromkeys(q for q in queries if q and q.strip()))
+    if not unique:
+        return {"queries": [], "organic": []}
+
+    responses: Dict[str, Dict[str, Any]] = {}
+    errors: Dict[str, Exception] = {}
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(unique)))) as executor:
+        futures = {executor.submit(serper_search, q, api_key, num): q for q in unique}
+        for future in as_completed(futures):
+            query = futures[future]
+            try:
+                responses[query] = future.result()
+            except Exception as e:
+                errors[query] = e
+
+    if not responses:
+        raise errors[unique[0]]
+
+    # Merge in the caller's query order, not completion order
+    merged = merge_results([(q, responses[q]) for q in unique if q in responses], max_results)
+    if errors:
+        merged["errors"] = {q: str(e) for q, e in errors.items()}
+    return merged
+
+
+async def serper_search_many_async(
+    queries: List[str],
+    api_key: Optional[str],
+    num: Optional[int] = None,
+    max_concurrency: int = MAX_CONCURRENCY,
+    max_results: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Event-loop variant of ``serper_search_many``."""
+    unique = list(dict.fromkeys(q for q in queries if q and q.strip()))
+    if not unique:
+        return {"queries": [], "organic": []}
+
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def bounded(query: str) -> Dict[str, Any]:
+        async with semaphore:
+            return await serper_search_async(query, api_key, num)
+
+    outcomes = await asyncio.gather(*(bounded(q) for q in unique), return_exceptions=True)
+
+    responses = [(q, r) for q, r in zip(unique, outcomes) if not isinstance(r, BaseException)]
+    errors = {q: r for q, r in zip(unique, outcomes) if isinstance(r, BaseException)}
+    if not responses:
+        raise errors[unique[0]]
+
+    merged = merge_results(responses, max_results)
+    if errors:
+        merged["errors"] = {q: str(e) for q, e in errors.items()}
+    return merged
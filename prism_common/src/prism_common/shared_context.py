@@ -0,0 +1,97 @@
+"""
+SHARED RUN CONTEXT
+
+Live data for a crew run is stored once, as named sections (one per search
+query or data source). Each task gets only the sections its role needs
+instead of a copy of the whole block.
+
+    shared = SharedContext(f"Live market intelligence for {company}")
+    shared.add("pricing", pricing_text)
+    shared.add("roadmap", roadmap_text)
+    description = base + shared.slice(["pricing"])
+    shared.report("twin")
+
+Slices are rendered once per distinct section list and reused, so tasks with
+the same needs share one string. ``slice(None)`` is the whole block.
+
+Instrumentation: every slice is measured against the full block (about 4
+characters per token, as in the rate limiter). ``stats()`` gives one run's
+numbers; ``report()`` logs them on the ``prism_common.shared_context`` logger
+and adds them to the process totals returned by ``shared_context_stats()``.
+"""
+
+import logging
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+_totals_lock = threading.Lock()
+_totals: Dict[str, int] = {"runs": 0, "tasks": 0, "sent_tokens": 0, "replicated_tokens": 0, "saved_tokens": 0}
+
+
+def _tokens(text: str) -> int:
+    return len(text) // 4
+
+
+class SharedContext:
+    """One run's live data, sliced per task."""
+
+    def __init__(self, title: str):
+        self.title = title
+        self.sections: Dict[str, str] = {}
+        self._rendered: Dict[Optional[Tuple[str, ...]], str] = {}
+        self._sent: List[int] = []
+
+    def add(self, name: str, text: str) -> None:
+        if text and text.strip():
+            self.sections[name] = text.strip()
+            self._rendered.clear()
+
+    def render(self, names: Optional[Sequence[str]] = None) -> str:
+        """The block restricted to ``names`` (all sections when None), in insertion order."""
+        key = tuple(names) if names is not None else None
+        text = self._rendered.get(key)
+        if text is None:
+            wanted = self.sections if names is None else [n for n in self.sections if n in names]
+            body = "\n\n".join(self.sections[n] for n in wanted)
+            text = f"\n\n{self.title}:\n{body}\n" if body else ""
+            self._rendered[key] = text
+        return text
+
+    def slice(self, names: Optional[Sequence[str]] = None) -> str:
+        """Text to append to one task's description; counted in the run's stats."""
+        text = self.render(names)
+        self._sent.append(_tokens(text))
+        return text
+
+    def stats(self) -> Dict[str, int]:
+        full = _tokens(self.render())
+        sent = sum(self._sent)
+        replicated = full * len(self._sent)
+        return {
+            "tasks": len(self._sent),
+            "full_tokens": full,
+            "sent_tokens": sent,
+            "replicated_tokens": replicated,
+            "saved_tokens": replicated - sent,
+        }
+
+    def report(self, label: str) -> Dict[str, int]:
+        """Log this run's savings and add them to the process totals."""
+        stats = self.stats()
+        with _totals_lock:
+            _totals["runs"] += 1
+            for name in ("tasks", "sent_tokens", "replicated_tokens", "saved_tokens"):
+                _totals[name] += stats[name]
+        logger.info(
+            "%s: shared context %d tokens, %d tasks got %d tokens of slices (%d saved vs. full copies)",
+            label, stats["full_tokens"], stats["tasks"], stats["sent_tokens"], stats["saved_tokens"],
+        )
+        return stats
+
+
+def shared_context_stats() -> Dict[str, int]:
+    """Process-wide totals over every reported run."""
+    with _totals_lock:
+        return dict(_totals)
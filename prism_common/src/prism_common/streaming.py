@@ -0,0 +1,241 @@
+"""
+RUN EVENT STREAMING
+
+Server-sent events for crew runs, so clients see each task's output as soon
+as that task finishes instead of waiting for the whole crew.
+
+Events (``event:`` name, JSON ``data:``):
+- run_started     {"job_id"}
+- task_started    {"task", "agent", "scope"}
+- task_completed  {"task", "agent", "scope", "output"}
+- run_finished    {"result"}  — the endpoint's normal response body
+- run_failed      {"error", "status"}
+
+Wiring: the backend calls ``stream_run(kind, execute_fn, ...)``, which runs the
+function as a background job with a ``RunEventStream`` installed in a
+context variable. Code that builds a crew wraps it in ``watch_crew(crew)``:
+a no-op for plain requests, and for streamed runs it chains a task callback
+(completion) onto every task. Starts are reported by ``cached_llm`` on a
+task's first LLM call (``note_task_activity``) and by crewai's
+``TaskStartedEvent``, whichever comes first; the bus alone can lag because it
+runs all handlers for an event in turn on its own threads. The stream
+de-duplicates and always sends a task's start before its completion.
+"""
+
+import json
+import queue
+import threading
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from prism_common.jobs import FINISHED, JobRegistry, current_job, get_job_registry
+
+HEARTBEAT_SECONDS = 15.0
+
+_current_stream: ContextVar[Optional["RunEventStream"]] = ContextVar("prism_event_stream", default=None)
+
+
+def _jsonable(value: Any) -> Any:
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    return value
+
+
+def _task_label(task: Any) -> str:
+    name = getattr(task, "name", None)
+    if name:
+        return str(name)
+    description = str(getattr(task, "description", "") or "").strip()
+    return description.splitlines()[0][:80] if description else "task"
+
+
+def _agent_label(agent: Any) -> Optional[str]:
+    if agent is None:
+        return None
+    return str(getattr(agent, "role", agent)).strip()
+
+
+class RunEventStream:
+    """Thread-safe event queue for one run, rendered as SSE."""
+
+    def __init__(self):
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._started: set = set()
+        self._completed: set = set()
+        self.closed = False
+
+    def emit(self, event: str, **data: Any) -> None:
+        self._queue.put({"event": event, "data": data})
+
+    # ------------------ TASK EVENTS ------------------
+
+    def task_started(self, task: Any, scope: Optional[str] = None) -> None:
+        key = id(task)
+        with self._lock:
+            # The bus may deliver a start after the completion; drop it
+            if key in self._started or key in self._completed:
+                return
+            self._started.add(key)
+        self.emit("task_started", task=_task_label(task), agent=_agent_label(task.agent), scope=scope)
+
+    def task_completed(self, task: Any, output: Any, scope: Optional[str] = None) -> None:
+        self.task_started(task, scope)
+        with self._lock:
+            # A retried run replays finished tasks from their checkpoints; report each once
+            if id(task) in self._completed:
+                return
+            self._completed.add(id(task))
+        self.emit(
+            "task_completed",
+            task=_task_label(task),
+            agent=_agent_label(getattr(output, "agent", None) or task.agent),
+            scope=scope,
+            output=str(getattr(output, "raw", output)),
+        )
+
+    def close(self) -> None:
+        self.closed = True
+        self._queue.put(None)
+
+    # ------------------ SSE RENDERING ------------------
+
+    def sse(self, is_done: Optional[Callable[[], bool]] = None) -> Iterator[str]:
+        """Yield SSE frames until the run ends; comment heartbeats keep proxies open."""
+        while True:
+            try:
+                item = self._queue.get(timeout=HEARTBEAT_SECONDS)
+            except queue.Empty:
+                # e.g. the job was cancelled before it ever started
+                if is_done is not None and is_done():
+                    return
+                yield ": keep-alive\n\n"
+                continue
+            if item is None:
+                return
+            payload = json.dumps(_jsonable(item["data"]), default=str)
+            yield f"event: {item['event']}\ndata: {payload}\n\n"
+
+
+# ==========================================================
+# CREW WIRING
+# ==========================================================
+# Task object -> (stream, scope) for runs being streamed right now
+_watched: Dict[int, Any] = {}
+_watched_lock = threading.Lock()
+_bus_handler_installed = False
+
+
+def _on_task_started(source: Any, event: Any) -> None:
+    task = getattr(event, "task", None) or source
+    with _watched_lock:
+        entry = _watched.get(id(task))
+    if entry is not None:
+        stream, scope = entry
+        stream.task_started(task, scope)
+
+
+def note_task_activity(task: Any) -> None:
+    """Mark a watched task as started (called synchronously on each of its LLM calls)."""
+    if task is None or _current_stream.get() is None:
+        return
+    _on_task_started(task, None)
+
+
+def _install_bus_handler() -> None:
+    global _bus_handler_installed
+    with _watched_lock:
+        if _bus_handler_installed:
+            return
+        _bus_handler_installed = True
+    try:
+        from crewai.events import crewai_event_bus
+        from crewai.events.types.task_events import TaskStartedEvent
+    except ImportError:
+        # No event bus: starts are still inferred from each task's completion
+        return
+    crewai_event_bus.register_handler(TaskStartedEvent, _on_task_started)
+
+
+def watch_crew(crew: Any, scope: Optional[str] = None) -> Any:
+    """Report the crew's task starts/completions to the current run's stream (if any).
+
+    Idempotent per task and stream: crewai memoizes tasks, so a retried run
+    watches the same tasks again and must not report them twice.
+    """
+    stream = _current_stream.get()
+    if stream is None:
+        return crew
+
+    _install_bus_handler()
+    for task in crew.tasks:
+        previous = task.callback
+        if getattr(previous, "_prism_stream", None) is stream:
+            continue
+
+        def callback(output, task=task, previous=previous):
+            stream.task_completed(task, output, scope)
+            if previous is not None:
+                previous(output)
+
+        callback._prism_stream = stream
+        task.callback = callback
+        with _watched_lock:
+            _watched[id(task)] = (stream, scope)
+    return crew
+
+
+def _unwatch(stream: RunEventStream) -> None:
+    with _watched_lock:
+        for key in [k for k, (s, _) in _watched.items() if s is stream]:
+            del _watched[key]
+
+
+def stream_run(
+    kind: str,
+    fn: Callable[..., Any],
+    *args: Any,
+    registry: Optional[JobRegistry] = None,
+    **kwargs: Any,
+):
+    """Run ``fn`` as a background job and return an SSE ``StreamingResponse`` of its events.
+
+    The job is cancelled if the client disconnects before it finishes.
+    """
+    from fastapi.responses import StreamingResponse
+
+    registry = registry or get_job_registry()
+    stream = RunEventStream()
+
+    def run() -> Any:
+        stream.emit("run_started", job_id=current_job().id)
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            stream.emit("run_failed", error=str(getattr(e, "detail", None) or e), status=getattr(e, "status_code", 500))
+            raise
+        else:
+            stream.emit("run_finished", result=_jsonable(result))
+            return result
+        finally:
+            _unwatch(stream)
+            stream.close()
+
+    token = _current_stream.set(stream)
+    try:
+        job = registry.submit(kind, run)
+    finally:
+        _current_stream.reset(token)
+
+    def frames() -> Iterator[str]:
+        try:
+            yield from stream.sse(is_done=lambda: job.status in FINISHED)
+        finally:
+            if not stream.closed:
+                registry.cancel(job.id)
+
+    return StreamingResponse(
+        frames(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "X-Job-Id": job.id},
+    )